@@ -0,0 +1,316 @@
+"""
+asyncio variant of the bot: AsyncTeleBot plus AsyncWorkUaParser.
+
+One process serves many concurrent searches and deliveries on a single event
+loop. Run with `python async_bot.py`; configuration comes from the same .env
+variables as tg_parser_bot.py.
+"""
+from typing import Awaitable, Callable, Dict
+import asyncio
+import copy
+import os
+
+import aiohttp
+from dotenv import load_dotenv
+from telebot import types
+from telebot.async_telebot import AsyncTeleBot
+
+from async_delivery import AsyncResultDispatcher, AsyncTelegramRateLimits
+from async_parser import AsyncWorkUaParser
+from category_index import DEFAULT_CATEGORIES, CategoryIndex
+from http_fetcher import HttpResumeFetcher
+from result_store import ResumeStore
+from session_store import MemorySessionStore
+
+# Button text -> (filter group, value, confirmation)
+FILTER_BUTTONS = {
+    "Пошук лише в заголовку": ('search_params', 'title_only', "Пошук лише в заголовку увімкнено."),
+    "Пошук з синонімами": ('search_params', 'with_synonyms', "Пошук з синонімами увімкнено."),
+    "Пошук будь-яке з слів": ('search_params', 'any_word', "Пошук будь-яке з слів увімкнено."),
+    "Повна зайнятість": ('employment', 'full_time', "Повна зайнятість обрана."),
+    "Неповна зайнятість": ('employment', 'part_time', "Неповна зайнятість обрана."),
+}
+
+# Menu button -> (prompt, buttons)
+FILTER_MENUS = {
+    "Параметри пошуку": ("Оберіть параметр пошуку:",
+                         ["Пошук лише в заголовку", "Пошук з синонімами", "Пошук будь-яке з слів"]),
+    "Тип зайнятості": ("Оберіть тип зайнятості:", ["Повна зайнятість", "Неповна зайнятість"]),
+}
+
+# Menu button -> (filter group, min prompt, max prompt, confirmation)
+RANGE_FILTERS = {
+    "Вік для пошуку": ('age', "Введіть мінімальний вік:", "Введіть максимальний вік:",
+                       "Діапазон віку встановлений"),
+    "Зарплата": ('salary', "Введіть мінімальну зарплату:", "Введіть максимальну зарплату:",
+                 "Діапазон зарплати встановлений"),
+}
+
+
+def create_bot(token: str, parser_class=AsyncWorkUaParser, categories=None,
+               max_searches: int = 50, **parser_options) -> AsyncTeleBot:
+    """
+    Build the async bot.
+
+    Args:
+        parser_class: AsyncWorkUaParser or a subclass (e.g. pointing at a fixture site)
+        categories: CategoryIndex for the menu and URL resolution
+        max_searches: searches that may run at the same time in this process
+        parser_options: passed to every parser
+    """
+    bot = AsyncTeleBot(token)
+    sessions = MemorySessionStore()
+    limits = AsyncTelegramRateLimits()
+    steps: Dict[int, Callable[[types.Message], Awaitable[None]]] = {}
+    running: Dict[int, asyncio.Task] = {}
+    # Created lazily so they bind to the loop the bot runs in
+    shared = {'session': None, 'slots': None}
+    bot.search_tasks = set()
+
+    def next_step(message: types.Message, handler):
+        steps[message.chat.id] = handler
+
+    async def http_session() -> aiohttp.ClientSession:
+        if shared['session'] is None:
+            shared['session'] = aiohttp.ClientSession(
+                headers=HttpResumeFetcher.HEADERS,
+                timeout=aiohttp.ClientTimeout(total=parser_class.WAIT_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=max(100, max_searches * 4)),
+            )
+        return shared['session']
+
+    def category_names():
+        if categories is not None:
+            return [cat['name'] for cat in categories.categories()]
+        return DEFAULT_CATEGORIES
+
+    async def send_filter_options(message):
+        keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+        keyboard.add(
+            types.KeyboardButton("Параметри пошуку"),
+            types.KeyboardButton("Тип зайнятості"),
+            types.KeyboardButton("Вік для пошуку")
+        )
+        keyboard.add(
+            types.KeyboardButton("Стать для пошуку"),
+            types.KeyboardButton("Зарплата"),
+            types.KeyboardButton("Освіта")
+        )
+        keyboard.add(types.KeyboardButton("Застосувати фільтри"))
+        await bot.send_message(message.chat.id, "Оберіть категорію фільтрації:", reply_markup=keyboard)
+
+    @bot.message_handler(func=lambda message: message.chat.id in steps and message.text is not None)
+    async def continue_step(message):
+        await steps.pop(message.chat.id)(message)
+
+    @bot.message_handler(commands=['start'])
+    async def send_welcome(message):
+        keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+        keyboard.add(types.KeyboardButton("work.ua"), types.KeyboardButton("rabota.us"))
+        await bot.send_message(message.chat.id, "Оберіть сайт для парсингу даних:", reply_markup=keyboard)
+
+    @bot.message_handler(func=lambda message: message.text in ["work.ua", "rabota.us"])
+    async def site_selection(message):
+        if message.text != "work.ua":
+            await bot.send_message(message.chat.id, "Функціонал для rabota.us поки не реалізований.")
+            return
+        sessions.reset(message.chat.id)
+        await bot.send_message(message.chat.id, "Введіть спеціальність для пошуку (наприклад, Python developer):")
+        next_step(message, get_specialty)
+
+    async def get_specialty(message):
+        sessions.get(message.chat.id).specialty = message.text
+        await bot.send_message(message.chat.id, "Введіть місто для пошуку (наприклад, Київ):")
+        next_step(message, get_location)
+
+    async def get_location(message):
+        session = sessions.get(message.chat.id)
+        session.location = message.text
+        await bot.send_message(message.chat.id, f"Спеціальність: {session.specialty}\nЛокація: {session.location}")
+        await send_category_options(message)
+
+    async def send_category_options(message):
+        menu = "".join(f"{idx + 1}. {name}\n" for idx, name in enumerate(category_names()))
+        await bot.send_message(
+            message.chat.id, "Будь ласка, оберіть категорію для пошуку кандидатів (вкажіть номер):\n\n" + menu
+        )
+        next_step(message, set_category)
+
+    async def set_category(message):
+        count = len(category_names())
+        try:
+            category = int(message.text)
+        except ValueError:
+            await bot.send_message(message.chat.id, "Будь ласка, введіть номер категорії.")
+            await send_category_options(message)
+            return
+        if not 1 <= category <= count:
+            await bot.send_message(message.chat.id, f"Будь ласка, оберіть номер категорії від 1 до {count}.")
+            await send_category_options(message)
+            return
+        sessions.get(message.chat.id).category = category
+        await bot.send_message(message.chat.id, f"Категорія встановлена: {category}")
+        await send_filter_options(message)
+
+    @bot.message_handler(func=lambda message: message.text in FILTER_MENUS)
+    async def filter_menu(message):
+        prompt, buttons = FILTER_MENUS[message.text]
+        keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+        keyboard.add(*(types.KeyboardButton(button) for button in buttons))
+        await bot.send_message(message.chat.id, prompt, reply_markup=keyboard)
+
+    @bot.message_handler(func=lambda message: message.text in FILTER_BUTTONS)
+    async def set_list_filter(message):
+        group, value, confirmation = FILTER_BUTTONS[message.text]
+        sessions.get(message.chat.id).add_filter(group, value)
+        await bot.send_message(message.chat.id, confirmation)
+        await send_filter_options(message)
+
+    @bot.message_handler(func=lambda message: message.text in RANGE_FILTERS)
+    async def filter_range(message):
+        group, min_prompt, max_prompt, confirmation = RANGE_FILTERS[message.text]
+
+        async def set_bound(bound_message, bound: str):
+            try:
+                sessions.get(bound_message.chat.id).filters[group][bound] = int(bound_message.text)
+                return True
+            except ValueError:
+                await bot.send_message(bound_message.chat.id, "Будь ласка, введіть числове значення.")
+                return False
+
+        async def set_min(min_message):
+            if await set_bound(min_message, 'from'):
+                await bot.send_message(min_message.chat.id, max_prompt)
+                next_step(min_message, set_max)
+
+        async def set_max(max_message):
+            if await set_bound(max_message, 'to'):
+                bounds = sessions.get(max_message.chat.id).filters[group]
+                await bot.send_message(max_message.chat.id,
+                                       f"{confirmation}: {bounds.get('from')} - {bounds['to']}")
+                await send_filter_options(max_message)
+
+        await bot.send_message(message.chat.id, min_prompt)
+        next_step(message, set_min)
+
+    @bot.message_handler(func=lambda message: message.text == "Стать для пошуку")
+    async def filter_gender(message):
+        keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+        keyboard.add(types.KeyboardButton("Чоловіча"), types.KeyboardButton("Жіноча"))
+        await bot.send_message(message.chat.id, "Оберіть стать:", reply_markup=keyboard)
+
+        async def set_gender(gender_message):
+            sessions.get(gender_message.chat.id).add_filter(
+                'gender', 'male' if gender_message.text == "Чоловіча" else 'female'
+            )
+            await bot.send_message(gender_message.chat.id, f"Стать обрана: {gender_message.text}")
+            await send_filter_options(gender_message)
+
+        next_step(message, set_gender)
+
+    @bot.message_handler(func=lambda message: message.text == "Освіта")
+    async def filter_education(message):
+        keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+        keyboard.add(types.KeyboardButton("Вища освіта"), types.KeyboardButton("Середня освіта"))
+        await bot.send_message(message.chat.id, "Оберіть рівень освіти:", reply_markup=keyboard)
+
+        async def set_education(education_message):
+            sessions.get(education_message.chat.id).add_filter(
+                'education', 'higher' if education_message.text == "Вища освіта" else 'secondary'
+            )
+            await bot.send_message(education_message.chat.id, f"Рівень освіти обраний: {education_message.text}")
+            await send_filter_options(education_message)
+
+        next_step(message, set_education)
+
+    @bot.message_handler(content_types=['voice', 'audio', 'video'])
+    async def unsupported_message(message):
+        await bot.send_message(message.chat.id, "Будь ласка, введіть текстове повідомлення.")
+
+    @bot.message_handler(commands=['cancel'])
+    async def cancel_search(message):
+        task = running.get(message.chat.id)
+        if task is None:
+            await bot.send_message(message.chat.id, "Немає активних пошуків.")
+            return
+        task.cancel()
+        await bot.send_message(message.chat.id, "Скасовуємо пошук.")
+
+    @bot.message_handler(func=lambda message: message.text == "Застосувати фільтри")
+    async def apply_filters(message):
+        chat_id = message.chat.id
+        session = sessions.get(chat_id)
+        if session.category is None:
+            await bot.send_message(chat_id, "Пошук не налаштований або застарів. Почніть з команди /start.")
+            return
+        if chat_id in running:
+            await bot.send_message(chat_id, "Попередній пошук ще виконується. Дочекайтеся його або скасуйте командою /cancel.")
+            return
+
+        task = asyncio.ensure_future(run_search(chat_id, copy.deepcopy(session)))
+        running[chat_id] = task
+        bot.search_tasks.add(task)
+        task.add_done_callback(lambda _: (running.pop(chat_id, None), bot.search_tasks.discard(task)))
+
+    async def run_search(chat_id: int, search):
+        await bot.send_message(chat_id, "Застосовуємо фільтри та починаємо фільтрацію...")
+        try:
+            if shared['slots'] is None:
+                shared['slots'] = asyncio.Semaphore(max_searches)
+            async with shared['slots']:
+                async with parser_class(session=await http_session(), categories=categories,
+                                        **parser_options) as parser, \
+                        AsyncResultDispatcher(bot, chat_id, limits) as dispatcher:
+                    await parser.select_category(search.category)
+                    parser.choose_profession(search.specialty)
+                    parser.choose_location(search.location)
+                    parser.apply_filters(search.filters)
+
+                    async for resume in parser.get_resumes_from_pages():
+                        await dispatcher.add(resume)
+
+            if not dispatcher.sent_count:
+                await bot.send_message(chat_id, "Не знайдено резюме по вказаним параметрам")
+            else:
+                await bot.send_message(chat_id, f"Пошук завершено, знайдено {dispatcher.sent_count} резюме.")
+        except asyncio.CancelledError:
+            await bot.send_message(chat_id, "Пошук скасовано.")
+        except Exception as e:
+            await bot.send_message(chat_id, f"Відбулася помилка при парсингу: {e}")
+
+    async def close():
+        for task in list(bot.search_tasks):
+            task.cancel()
+        if shared['session'] is not None:
+            await shared['session'].close()
+
+    bot.close_searches = close
+    return bot
+
+
+async def main():
+    load_dotenv()
+    token = os.getenv('API_TOKEN')
+    if token is None:
+        raise ValueError("API_TOKEN не знайден в .env файлі")
+
+    categories = CategoryIndex(os.getenv('CATEGORY_INDEX_PATH', 'categories.json'))
+    categories.categories()  # Warm up the index in the background if it is stale
+    bot = create_bot(
+        token,
+        categories=categories,
+        # Resumes are shared between searches in memory, as in tg_parser_bot
+        resume_cache=ResumeStore(),
+        workers=int(os.getenv('PARSER_WORKERS', '4')),
+        max_pages=int(os.getenv('PARSER_MAX_PAGES', '5')),
+        extraction=os.getenv('PARSER_EXTRACTION', 'listing'),
+        max_searches=int(os.getenv('SEARCH_EXECUTORS', '50')),
+    )
+    try:
+        await bot.infinity_polling()
+    finally:
+        await bot.close_searches()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
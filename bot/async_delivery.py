@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from telebot.asyncio_helper import ApiTelegramException
+
+from delivery import TelegramRateLimits
+from work_au_parser import ResumeData
+
+
+class AsyncTokenBucket:
+    """asyncio counterpart of TokenBucket"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def is_full(self) -> bool:
+        return self._tokens + (time.monotonic() - self._updated) * self.rate >= self.capacity
+
+
+class AsyncTelegramRateLimits:
+    """asyncio counterpart of TelegramRateLimits"""
+
+    def __init__(self):
+        self.global_bucket = AsyncTokenBucket(TelegramRateLimits.GLOBAL_RATE, TelegramRateLimits.GLOBAL_RATE)
+        self._chat_buckets: Dict[int, AsyncTokenBucket] = {}
+        self._swept = time.monotonic()
+
+    async def acquire(self, chat_id: int):
+        if time.monotonic() - self._swept >= TelegramRateLimits.SWEEP_INTERVAL:
+            # Drop the buckets of chats that went quiet, as TelegramRateLimits does
+            self._chat_buckets = {chat: bucket for chat, bucket in self._chat_buckets.items()
+                                  if not bucket.is_full()}
+            self._swept = time.monotonic()
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = AsyncTokenBucket(
+                TelegramRateLimits.CHAT_RATE, TelegramRateLimits.CHAT_BURST
+            )
+        await bucket.acquire()
+        await self.global_bucket.acquire()
+
+
+class AsyncResultDispatcher:
+    """asyncio counterpart of ResultDispatcher, for AsyncTeleBot"""
+
+    def __init__(self, bot, chat_id: int, limits: AsyncTelegramRateLimits,
+                 batch_size: int = 10, max_delay: float = 5.0):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.limits = limits
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.sent_count = 0
+        self._pending: List[ResumeData] = []
+        self._batch = 0
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.flush()
+
+    async def add(self, resume: ResumeData):
+        if not self._pending:
+            self._batch += 1
+            self._timer = asyncio.create_task(self._flush_stale(self._batch))
+        self._pending.append(resume)
+
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def _flush_stale(self, batch: int):
+        await asyncio.sleep(self.max_delay)
+        # The batch may have been sent, and a new one started, while this task slept
+        if batch != self._batch:
+            return
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logging.error(f"Could not send links to chat {self.chat_id}: {str(e)}")
+
+    async def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self._pending:
+                return
+
+            batch, self._pending = self._pending, []
+            if not await self.send("Посилання:\n" + "\n".join(resume.url for resume in batch)):
+                return
+            self.sent_count += len(batch)
+
+    async def send(self, text: str, retries: int = 3) -> bool:
+        """Send a message respecting rate limits and Telegram's retry_after hints; False if it gave up"""
+        for _ in range(retries):
+            await self.limits.acquire(self.chat_id)
+            try:
+                await self.bot.send_message(self.chat_id, text, disable_web_page_preview=True)
+                return True
+            except ApiTelegramException as e:
+                if e.error_code != 429:
+                    raise
+                retry_after = e.result_json.get('parameters', {}).get('retry_after', 1)
+                logging.warning(f"Telegram flood limit hit, retrying in {retry_after} s")
+                await asyncio.sleep(retry_after)
+        logging.error(f"Giving up sending message to chat {self.chat_id}")
+        return False
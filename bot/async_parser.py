@@ -0,0 +1,214 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import asyncio
+import logging
+import time
+
+import aiohttp
+from lxml import html as lxml_html
+
+from extraction import extract_from_tree
+from http_fetcher import HttpResumeFetcher
+from metrics import SearchMetrics
+from retry_policy import LatencyTracker, RetryPolicy
+from site_adapter import SiteAdapter
+from work_au_parser import ListingRow, ResumeData, RowResolutionMixin, WorkUaAdapter
+from worker_pool import ThroughputStats
+
+
+class AsyncHostRateLimiter:
+    """asyncio counterpart of HostRateLimiter"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+
+    async def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncWorkUaParser(RowResolutionMixin):
+    """
+    Browser-free asyncio parser with the same methods as WorkUaParser.
+
+    Every call that touches the network is a coroutine, and
+    get_resumes_from_pages is an async generator. Many parsers can share one
+    event loop (and one aiohttp session) without a thread per search.
+    Listing rows are resolved like in WorkUaParser: each resume is yielded
+    once per search, cached resumes skip their detail page, and failed ones
+    are retried after a backoff.
+    """
+
+    ADAPTER = WorkUaAdapter
+    WAIT_TIMEOUT = 10
+    EXTRACTION_MODES = ('listing', 'detail')
+
+    def __init__(self, workers: int = 4, requests_per_second: float = 5.0, max_pages: int = 5,
+                 extraction: str = 'listing', categories=None,
+                 session: Optional[aiohttp.ClientSession] = None, resume_cache=None,
+                 retry_policy: Optional[RetryPolicy] = None, metrics: Optional[SearchMetrics] = None,
+                 adapter: Optional[SiteAdapter] = None):
+        """
+        Args:
+            workers: how many resume pages are fetched at once
+            requests_per_second: per-host limit on started resume requests
+            max_pages: how many results pages get_resumes_from_pages walks
+            extraction: 'listing' or 'detail', see WorkUaParser
+            categories: CategoryIndex used to resolve category indices to URLs
+            session: shared aiohttp session; a private one is opened otherwise
+            resume_cache: ResumeCache or ResumeStore, see WorkUaParser
+            retry_policy: RetryPolicy whose attempts and backoff apply to failed resumes
+            metrics: SearchMetrics collecting this search's counters
+            adapter: SiteAdapter with the site's URLs and page layout, by default an
+                instance of the class's ADAPTER
+        """
+        if extraction not in self.EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode '{extraction}', expected one of {self.EXTRACTION_MODES}")
+
+        self.adapter = adapter or self.ADAPTER()
+        self.workers = workers
+        self.max_pages = max_pages
+        self.extraction = extraction
+        self.categories = categories
+        self.resume_cache = resume_cache
+        self.retry_policy = retry_policy or RetryPolicy(latency=LatencyTracker(initial=self.WAIT_TIMEOUT))
+        self.metrics = metrics or SearchMetrics()
+        self.rate_limiter = AsyncHostRateLimiter(requests_per_second)
+        self.stats = ThroughputStats()
+        self._init_row_resolution()
+
+        self.session = session
+        self._owns_session = session is None
+
+        self.category_url = None
+        self.profession = ""
+        self.location = ""
+        self.filters = {}
+
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=HttpResumeFetcher.HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.WAIT_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit_per_host=max(10, self.workers)),
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+
+    async def fetch_tree(self, url: str):
+        """Download a page and return the parsed lxml tree"""
+        async with self.session.get(url) as response:
+            response.raise_for_status()
+            text = await response.text()
+        return lxml_html.fromstring(text)
+
+    async def get_categories(self) -> List[Dict[str, str]]:
+        """Get all available resume categories"""
+        base_url = self.adapter.base_url
+        tree = await self.fetch_tree(base_url)
+        categories = extract_from_tree(tree, {'categories': self.adapter.category_spec}, base_url)['categories']
+        return self.adapter.categories_from(categories)
+
+    async def select_category(self, category_index: int):
+        """Select category by its index"""
+        url = self.categories.url_for(category_index) if self.categories is not None else None
+        if url is None:
+            categories = await self.get_categories()
+            if not 1 <= category_index <= len(categories):
+                raise ValueError(f"Category index should be between 1 and {len(categories)}")
+            url = categories[category_index - 1]["url"]
+        self.category_url = url
+
+    def choose_profession(self, profession: str):
+        self.profession = profession
+
+    def choose_location(self, location: str):
+        self.location = location
+
+    def build_search_url(self) -> str:
+        """Compile the current category, profession, city and filters into a search URL"""
+        if self.category_url is None:
+            raise ValueError("Category is not selected")
+        return self.adapter.search_url(self.category_url, self.profession, self.location, self.filters)
+
+    def apply_filters(self, filters: Dict):
+        self.filters = filters
+
+    async def get_results_page(self, url: str) -> Tuple[List[ListingRow], Optional[str]]:
+        """Get listing rows and the next page url (None on the last page) from a results page"""
+        tree = await self.fetch_tree(url)
+        return self.adapter.listing_rows(extract_from_tree(tree, self.adapter.results_page_specs, url))
+
+    async def get_resume(self, url: str) -> Optional[ResumeData]:
+        """Fetch a single resume page and extract its data"""
+        try:
+            await self.rate_limiter.wait(url)
+            tree = await self.fetch_tree(url)
+            fields = extract_from_tree(tree, {'resume': self.adapter.detail_spec}, url)['resume'][0]
+            return self.adapter.resume_from_detail(fields, url)
+        except Exception as e:
+            logging.error(f"Error parsing resume at {url}: {str(e)}")
+            return None
+
+    async def _resolve_rows(self, rows: List[ListingRow]) -> List[ResumeData]:
+        """Turn listing rows into resumes, in order, fetching detail pages only where needed"""
+        rows, found, missing = self._split_rows(rows)
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def fetch(url: str):
+            async with semaphore:
+                return await self.get_resume(url)
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(fetch(url) for url in missing))
+        fetched = [resume for resume in results if resume is not None]
+        return self._merge_fetched(rows, found, missing, fetched, time.monotonic() - started)
+
+    async def _retry_failed(self) -> List[ResumeData]:
+        """Fetch the re-queued resumes again after a backoff; those failing again are re-queued"""
+        if not self._retry_queue:
+            return []
+        rows, delay = self._next_retry_batch()
+        await asyncio.sleep(delay)
+        return await self._resolve_rows(rows)
+
+    async def get_resumes_from_pages(self, max_pages: Optional[int] = None) -> AsyncIterator[ResumeData]:
+        """Walk the results pages and yield resumes; the next page is prefetched meanwhile"""
+        max_pages = max_pages or self.max_pages
+        pending = asyncio.ensure_future(self.get_results_page(self.build_search_url()))
+        page = 1
+        try:
+            while pending is not None:
+                rows, next_url = await pending
+                pending = None
+                if next_url and page < max_pages:
+                    pending = asyncio.ensure_future(self.get_results_page(next_url))
+
+                started = time.monotonic()
+                resumes = await self._resolve_rows(rows)
+                self.stats.count += len(resumes)
+                self.stats.elapsed += time.monotonic() - started
+                for resume in resumes:
+                    yield resume
+
+                # Resumes that failed get another try before moving on;
+                # on the last page keep trying until they succeed or run out of attempts
+                while self._retry_queue:
+                    for resume in await self._retry_failed():
+                        yield resume
+                    if pending is not None:
+                        break
+                page += 1
+        finally:
+            if pending is not None:
+                pending.cancel()
@@ -0,0 +1,49 @@
+"""
+Report bytes transferred and page-load time per resume for each browser profile.
+
+Usage:
+    python bench_browser_profile.py --category 1 --resumes 10
+"""
+import argparse
+import json
+import time
+
+from browser_profile import PROFILES, page_metrics
+from work_au_parser import WorkUaParser
+
+
+def measure(profile_name: str, category: int, resumes: int) -> dict:
+    totals = {'bytes': 0, 'requests': 0, 'load_ms': 0.0, 'wall_ms': 0.0}
+    with WorkUaParser(profile=PROFILES[profile_name]) as parser:
+        parser.select_category(category)
+        rows, _ = parser._read_results_page()
+        urls = [row.url for row in rows[:resumes]]
+
+        for url in urls:
+            started = time.monotonic()
+            parser.driver.get(url)
+            totals['wall_ms'] += (time.monotonic() - started) * 1000
+            metrics = page_metrics(parser.driver)
+            totals['bytes'] += metrics['bytes']
+            totals['requests'] += metrics['requests']
+            totals['load_ms'] += metrics['load_ms'] or 0.0
+
+    count = len(urls) or 1
+    return {
+        'resumes': len(urls),
+        'bytes_per_resume': totals['bytes'] / count,
+        'requests_per_resume': totals['requests'] / count,
+        'load_ms_per_resume': totals['load_ms'] / count,
+        'wall_ms_per_resume': totals['wall_ms'] / count,
+    }
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--category', type=int, default=1)
+    arg_parser.add_argument('--resumes', type=int, default=10)
+    arg_parser.add_argument('--profiles', nargs='+', default=list(PROFILES))
+    args = arg_parser.parse_args()
+
+    report = {name: measure(name, args.category, args.resumes) for name in args.profiles}
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,152 @@
+"""
+Offline end-to-end benchmark of WorkUaParser against the local work.ua stand-in.
+
+Runs select_category -> apply_filters -> get_resumes_from_pages against a
+FixtureSite and reports wall time, WebDriver commands, peak RSS and resumes/s
+as JSON. Peak RSS is per process, so run one configuration per invocation and
+compare the saved reports.
+
+Usage:
+    python bench_offline.py --engine selenium --pages 3 --latency 0.05 --output run.json
+    python bench_offline.py --engine http --compare run.json
+    python bench_offline.py --record recordings/ --specialty "Python developer" --location Київ
+    python bench_offline.py --recordings recordings/ --specialty "Python developer" --location Київ
+"""
+from collections import Counter
+from contextlib import nullcontext
+import argparse
+import json
+import resource
+import sys
+import time
+
+from bench_webdriver_commands import count_commands
+from fixture_site import FixtureSite, PageRecorder
+from http_fetcher import HttpResumeFetcher
+from work_au_parser import WorkUaAdapter, WorkUaParser
+
+# Relative change above which a metric counts as a regression when comparing runs
+REGRESSION_THRESHOLD = 0.1
+# Metrics where a larger value is worse
+LOWER_IS_BETTER = ('wall_seconds', 'webdriver_commands', 'peak_rss_kb', 'peak_children_rss_kb')
+HIGHER_IS_BETTER = ('resumes_per_second',)
+
+
+class RecordingFetcher(HttpResumeFetcher):
+    """HttpResumeFetcher that hands every page it downloads to a PageRecorder"""
+
+    def __init__(self, recorder: PageRecorder, **kwargs):
+        super().__init__(**kwargs)
+        self.recorder = recorder
+
+    def fetch(self, url, params=None, attempts=None):
+        page = super().fetch(url, params=params, attempts=attempts)
+        self.recorder.save(url, page)
+        return page
+
+
+def run_search(parser: WorkUaParser, args) -> int:
+    parser.select_category(args.category)
+    parser.choose_profession(args.specialty)
+    parser.choose_location(args.location)
+    parser.apply_filters({})
+    return sum(1 for _ in parser.get_resumes_from_pages(args.pages))
+
+
+def record(args):
+    """Crawl one search on the live site with the http engine and save every page"""
+    recorder = PageRecorder(args.record)
+    with WorkUaParser(engine='http', extraction='detail', max_pages=args.pages) as parser:
+        parser.http.close()
+        parser.http = RecordingFetcher(recorder, timeout=parser.WAIT_TIMEOUT, policy=parser.retry_policy)
+        count = run_search(parser, args)
+    recorder.close()
+    print(f"Recorded {len(recorder.manifest)} pages ({count} resumes) to {args.record}")
+
+
+def run(args) -> dict:
+    with FixtureSite(pages=args.pages, resumes_per_page=args.resumes_per_page, latency=args.latency,
+                     incomplete_every=args.incomplete_every, recordings=args.recordings) as site:
+        adapter_class = type('FixtureAdapter', (WorkUaAdapter,), {'base_url': site.category_url})
+        parser_class = type('FixtureParser', (WorkUaParser,), {'ADAPTER': adapter_class})
+        commands = Counter()
+        started = time.monotonic()
+        with parser_class(engine=args.engine, workers=args.workers, max_pages=args.pages,
+                          extraction=args.extraction) as parser:
+            counting = count_commands(parser.driver) if parser.driver is not None else nullcontext(Counter())
+            with counting as counts:
+                resumes = run_search(parser, args)
+            commands.update(counts)
+        elapsed = time.monotonic() - started
+        site_requests = site.requests
+
+    return {
+        'config': {
+            'engine': args.engine,
+            'extraction': args.extraction,
+            'workers': args.workers,
+            'pages': args.pages,
+            'resumes_per_page': args.resumes_per_page,
+            'latency': args.latency,
+            'incomplete_every': args.incomplete_every,
+            'recordings': args.recordings,
+        },
+        'resumes': resumes,
+        'wall_seconds': elapsed,
+        'resumes_per_second': resumes / elapsed if elapsed else 0.0,
+        'webdriver_commands': sum(commands.values()),
+        'webdriver_commands_by_name': dict(commands.most_common()),
+        'site_requests': site_requests,
+        # ru_maxrss is in kilobytes on Linux; chromedriver and Chrome show up as children once reaped
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'peak_children_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def compare(report: dict, baseline: dict) -> list:
+    """Relative change of every tracked metric, flagging regressions beyond the threshold"""
+    changes = []
+    for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+        old, new = baseline.get(key), report.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = change > REGRESSION_THRESHOLD if key in LOWER_IS_BETTER else change < -REGRESSION_THRESHOLD
+        changes.append({'metric': key, 'baseline': old, 'current': new, 'change': change, 'regression': worse})
+    return changes
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--engine', choices=WorkUaParser.ENGINES, default='selenium')
+    arg_parser.add_argument('--extraction', choices=WorkUaParser.EXTRACTION_MODES, default='listing')
+    arg_parser.add_argument('--workers', type=int, default=4)
+    arg_parser.add_argument('--pages', type=int, default=3)
+    arg_parser.add_argument('--resumes-per-page', type=int, default=14)
+    arg_parser.add_argument('--latency', type=float, default=0.05)
+    arg_parser.add_argument('--incomplete-every', type=int, default=5)
+    arg_parser.add_argument('--category', type=int, default=1)
+    arg_parser.add_argument('--specialty', default="")
+    arg_parser.add_argument('--location', default="")
+    arg_parser.add_argument('--recordings', help="replay pages saved with --record instead of synthetic ones")
+    arg_parser.add_argument('--record', metavar='DIR', help="record the search from work.ua into DIR and exit")
+    arg_parser.add_argument('--output', help="also write the report to this JSON file")
+    arg_parser.add_argument('--compare', metavar='BASELINE', help="compare with a saved report")
+    args = arg_parser.parse_args()
+
+    if args.record:
+        record(args)
+        sys.exit(0)
+
+    report = run(args)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report['comparison'] = compare(report, json.load(f))
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    if any(change['regression'] for change in report.get('comparison', [])):
+        sys.exit(1)
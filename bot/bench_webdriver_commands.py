@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: WebDriver commands per search, per-element lookups vs batched extraction.
+
+Usage:
+    python bench_webdriver_commands.py --category 1 --resumes 10
+"""
+from collections import Counter
+from contextlib import contextmanager
+import argparse
+import json
+
+from selenium.webdriver.common.by import By
+
+from work_au_parser import WorkUaParser
+
+
+@contextmanager
+def count_commands(driver):
+    """Count every WebDriver command the driver sends, by command name"""
+    counts = Counter()
+    original = driver.execute
+
+    def execute(command, params=None):
+        counts[command] += 1
+        return original(command, params)
+
+    driver.execute = execute
+    try:
+        yield counts
+    finally:
+        del driver.execute
+
+
+def legacy_get_categories(parser: WorkUaParser):
+    """Category scraping as it was done before batched extraction: two commands per link"""
+    parser.driver.get(parser.adapter.base_url)
+    categories = parser.driver.find_elements(By.XPATH, "//li/a[starts-with(@href, '/resumes-')]")
+    return [
+        {"name": cat.text, "url": cat.get_attribute("href"), "index": idx + 1}
+        for idx, cat in enumerate(categories)
+    ]
+
+
+def legacy_extract_resume(parser: WorkUaParser):
+    """Resume extraction as it was done before batched extraction: a wait and a read per field"""
+    update_date = parser.wait_and_find_element(By.XPATH, "//time").get_attribute("datetime")
+    name = parser.wait_and_find_element(
+        By.XPATH, "//div[1]/div/div/h1[contains(@class, 'mt-0') and contains(@class, 'mb-0')]"
+    ).text
+    title = parser.wait_and_find_element(By.XPATH, "//div[1]/div/div/h2[1]").text
+    return update_date, name, title
+
+
+def run(category: int, resumes: int) -> dict:
+    report = {}
+    with WorkUaParser(extraction='detail') as parser:
+        with count_commands(parser.driver) as before:
+            legacy_get_categories(parser)
+        with count_commands(parser.driver) as after:
+            categories = parser.get_categories()
+        report['categories'] = {'before': sum(before.values()), 'after': sum(after.values())}
+
+        parser.driver.get(categories[category - 1]["url"])
+        rows, _ = parser._read_results_page()
+        urls = [row.url for row in rows[:resumes]]
+
+        before, after = Counter(), Counter()
+        for url in urls:
+            parser.driver.get(url)
+            with count_commands(parser.driver) as counts:
+                legacy_extract_resume(parser)
+            before.update(counts)
+            with count_commands(parser.driver) as counts:
+                parser._extract_resume(url)
+            after.update(counts)
+        report['resumes'] = {
+            'count': len(urls),
+            'before': sum(before.values()),
+            'after': sum(after.values()),
+        }
+
+    report['per_search'] = {
+        key: report['categories'][key] + report['resumes'][key] for key in ('before', 'after')
+    }
+    return report
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--category', type=int, default=1)
+    arg_parser.add_argument('--resumes', type=int, default=10)
+    args = arg_parser.parse_args()
+
+    print(json.dumps(run(args.category, args.resumes), indent=2))
@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from selenium import webdriver
+
+
+# Third-party hosts that work.ua pages pull ads, analytics and widgets from
+THIRD_PARTY_HOSTS = [
+    "googletagmanager.com",
+    "google-analytics.com",
+    "analytics.google.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "adservice.google.com",
+    "facebook.net",
+    "facebook.com",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "criteo.com",
+    "criteo.net",
+    "tiktok.com",
+    "yandex.ru",
+    "mc.yandex.ru",
+]
+
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif"]
+MEDIA_PATTERNS = ["*.mp4", "*.webm", "*.mp3", "*.ogg"]
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+CSS_PATTERNS = ["*.css"]
+
+# Transfer size and load time of the current page, from the Performance API
+PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const entry of resources) bytes += entry.transferSize;
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    load_ms: nav ? (nav.domContentLoadedEventEnd || nav.duration) - nav.startTime : null,
+};
+"""
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """How Chrome is started and which requests it is allowed to make"""
+    block_images: bool = False
+    block_media: bool = False
+    block_fonts: bool = False
+    block_css: bool = False
+    block_third_party: bool = False
+    page_load_strategy: str = 'normal'
+    extra_arguments: List[str] = field(default_factory=list)
+
+    @property
+    def blocked_url_patterns(self) -> List[str]:
+        patterns = []
+        if self.block_images:
+            patterns += IMAGE_PATTERNS
+        if self.block_media:
+            patterns += MEDIA_PATTERNS
+        if self.block_fonts:
+            patterns += FONT_PATTERNS
+        if self.block_css:
+            patterns += CSS_PATTERNS
+        if self.block_third_party:
+            patterns += [f"*://*.{host}/*" for host in THIRD_PARTY_HOSTS]
+            patterns += [f"*://{host}/*" for host in THIRD_PARTY_HOSTS]
+        return patterns
+
+    def chrome_options(self) -> webdriver.ChromeOptions:
+        options = webdriver.ChromeOptions()
+        options.add_argument('--start-maximized')
+        options.add_argument('--headless')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        for argument in self.extra_arguments:
+            options.add_argument(argument)
+
+        options.page_load_strategy = self.page_load_strategy
+        if self.block_images:
+            # Applies to every tab, including ones opened with window.open
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        return options
+
+    def apply(self, driver):
+        """Install request blocking in the driver's current tab through CDP"""
+        patterns = self.blocked_url_patterns
+        if patterns:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+DEFAULT_PROFILE = BrowserProfile()
+
+LEAN_PROFILE = BrowserProfile(
+    block_images=True,
+    block_media=True,
+    block_fonts=True,
+    block_css=True,
+    block_third_party=True,
+    page_load_strategy='eager',
+    extra_arguments=[
+        '--disable-extensions',
+        '--disable-background-networking',
+        '--disable-component-update',
+        '--disable-default-apps',
+        '--disable-sync',
+        '--no-first-run',
+        '--mute-audio',
+    ],
+)
+
+PROFILES: Dict[str, BrowserProfile] = {
+    'default': DEFAULT_PROFILE,
+    'lean': LEAN_PROFILE,
+}
+
+
+def page_metrics(driver) -> Dict:
+    """Bytes transferred, request count and load time of the driver's current page"""
+    return driver.execute_script(PAGE_METRICS_JS)
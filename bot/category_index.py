@@ -0,0 +1,146 @@
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+import time
+
+from work_au_parser import WorkUaParser
+
+
+# Used until the live list has been loaded once
+DEFAULT_CATEGORIES = [
+    "IT, комп'ютери, інтернет",
+    "Адміністрація, керівництво середньої ланки",
+    "Будівництво, архітектура",
+    "Бухгалтерія, аудит",
+    "Готельно-ресторанний бізнес, туризм",
+    "Дизайн, творчість",
+    "ЗМІ, видавництво, поліграфія",
+    "Краса, фітнес, спорт",
+    "Культура, музика, шоу-бізнес",
+    "Логістика, склад, ЗЕД",
+    "Маркетинг, реклама, PR",
+    "Медицина, фармацевтика",
+    "Нерухомість",
+    "Освіта, наука",
+    "Охорона, безпека",
+    "Продаж, закупівля",
+    "Робочі спеціальності, виробництво",
+    "Роздрібна торгівля",
+    "Секретаріат, діловодство, АГВ",
+    "Сільське господарство, агробізнес",
+    "Страхування",
+    "Сфера обслуговування",
+    "Телекомунікації та зв'язок",
+    "Топменеджмент, керівництво вищої ланки",
+    "Транспорт, автобізнес",
+    "Управління персоналом, HR",
+    "Фінанси, банк",
+    "Юриспруденція",
+    "Інші сфери діяльності",
+]
+
+
+def load_live_categories() -> List[Dict[str, str]]:
+    """Scrape the current category list from work.ua without a browser"""
+    with WorkUaParser(engine='http') as parser:
+        return parser.get_categories()
+
+
+class CategoryIndex:
+    """
+    Category list loaded once, persisted to disk and refreshed every `refresh_interval` seconds.
+
+    Resolves category indices to URLs without a page load and reports drift
+    when the live list no longer matches the cached one.
+    """
+
+    def __init__(self, path: str, refresh_interval: float = 24 * 3600,
+                 loader: Callable[[], List[Dict[str, str]]] = load_live_categories):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.loader = loader
+        self.drift: Dict[str, List[str]] = {'added': [], 'removed': []}
+
+        self._categories: List[Dict[str, str]] = [
+            {"name": name, "url": None, "index": idx + 1} for idx, name in enumerate(DEFAULT_CATEGORIES)
+        ]
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._last_attempt = 0.0
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            self._categories = data['categories']
+            self._fetched_at = data['fetched_at']
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self._fetched_at > self.refresh_interval
+
+    def categories(self) -> List[Dict[str, str]]:
+        """Current list; starts a background refresh when it is stale"""
+        if self.stale:
+            self.refresh_in_background()
+        return self._categories
+
+    def url_for(self, index: int) -> Optional[str]:
+        """URL of the category with the given 1-based index, None if it isn't known yet"""
+        categories = self.categories()
+        if not 1 <= index <= len(categories):
+            raise ValueError(f"Category index should be between 1 and {len(categories)}")
+        return categories[index - 1]["url"]
+
+    def menu_text(self) -> str:
+        return "".join(f"{cat['index']}. {cat['name']}\n" for cat in self.categories())
+
+    def refresh(self):
+        """Reload the live list, report drift and persist it"""
+        live = self.loader()
+        if not live:
+            logging.warning("Live category list is empty - keeping the cached one")
+            return
+
+        with self._lock:
+            # The built-in defaults have no URLs, so only their names can be compared
+            with_urls = all(cat["url"] for cat in self._categories)
+            old = {(cat["name"], cat["url"] if with_urls else None) for cat in self._categories}
+            new = {(cat["name"], cat["url"] if with_urls else None) for cat in live}
+            if old != new:
+                self.drift = {
+                    'added': sorted(name for name, _ in new - old),
+                    'removed': sorted(name for name, _ in old - new),
+                }
+                logging.warning(f"Category list drifted: {self.drift}")
+
+            self._categories = live
+            self._fetched_at = time.time()
+
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': self._fetched_at, 'categories': live}, f,
+                          ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def refresh_in_background(self, retry_interval: float = 300):
+        with self._lock:
+            if self._refreshing or time.time() - self._last_attempt < retry_interval:
+                return
+            self._refreshing = True
+            self._last_attempt = time.time()
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"Error refreshing categories: {str(e)}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
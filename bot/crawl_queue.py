@@ -0,0 +1,517 @@
+"""
+Shared queue of crawl tasks for running searches on separate worker processes.
+
+A search is split into tasks of a few results pages each. Workers (see
+crawl_worker.py) claim a task with a lease, crawl its pages and publish
+every resume; the bot reads the published resumes back and delivers them.
+
+Delivery is at least once: a task whose worker dies or stalls is claimed
+again when its lease runs out, and a failed task is retried up to
+`max_attempts` times. Publishing is idempotent, so a resume that a retried
+task (or an overlapping page) produces again is stored once per search.
+
+Backends: SQLite, for one machine and for tests, and Redis (needs
+`pip install redis`) for workers on several machines.
+"""
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator, List, Optional, Tuple
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from session_store import SearchSession
+from work_au_parser import ResumeData, url_hash
+
+
+@dataclass
+class CrawlTask:
+    """Pages `first_page` to `first_page + pages - 1` of one search"""
+    id: str
+    job_id: str
+    search: SearchSession
+    first_page: int
+    pages: int
+    attempts: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "CrawlTask":
+        data = json.loads(text)
+        data['search'] = SearchSession(**data['search'])
+        return cls(**data)
+
+
+def plan_tasks(job_id: str, search: SearchSession, max_pages: int, pages_per_task: int) -> List[CrawlTask]:
+    """
+    Split a search of up to `max_pages` results pages into tasks of `pages_per_task` pages.
+
+    The number of pages a search has is not known up front; the worker that
+    reaches the last page truncates the tasks planned past it.
+    """
+    return [
+        CrawlTask(f"{job_id}-{first_page}", job_id, search, first_page,
+                  min(pages_per_task, max_pages - first_page + 1))
+        for first_page in range(1, max_pages + 1, pages_per_task)
+    ]
+
+
+class CrawlQueue:
+    """
+    Interface of the queue backends.
+
+    Args:
+        lease: seconds a claimed task stays with its worker without a renew()
+        max_attempts: claims of a task before it is given up as failed
+    """
+
+    def __init__(self, lease: float = 300, max_attempts: int = 3):
+        self.lease = lease
+        self.max_attempts = max_attempts
+
+    def submit(self, tasks: List[CrawlTask]):
+        raise NotImplementedError
+
+    def claim(self) -> Optional[CrawlTask]:
+        """Take the oldest available task, or one whose lease ran out; None if there is none"""
+        raise NotImplementedError
+
+    def renew(self, task: CrawlTask):
+        """Extend the lease of a task that is still being worked on"""
+        raise NotImplementedError
+
+    def complete(self, task: CrawlTask):
+        """Mark a task done, unless it was claimed again since this attempt"""
+        raise NotImplementedError
+
+    def fail(self, task: CrawlTask, error: str):
+        """Release a task for another attempt, or give it up after max_attempts; ignored for a stale attempt"""
+        raise NotImplementedError
+
+    def publish(self, task: CrawlTask, resumes: List[ResumeData]):
+        """Store resumes of a task; resumes already stored for the search are ignored"""
+        raise NotImplementedError
+
+    def results(self, job_id: str, offset: int) -> Tuple[List[ResumeData], int]:
+        """Resumes of a search published after `offset`, and the offset to continue from"""
+        raise NotImplementedError
+
+    def finished(self, job_id: str) -> bool:
+        """True once every task of the search is completed or given up"""
+        raise NotImplementedError
+
+    def failed(self, job_id: str) -> List[CrawlTask]:
+        """Tasks of the search that were given up after max_attempts"""
+        raise NotImplementedError
+
+    def truncate(self, job_id: str, last_page: int):
+        """Cancel the tasks of a search that start after its last results page, claimed or not"""
+        raise NotImplementedError
+
+    def cancel(self, job_id: str):
+        """Drop the tasks of a search that no worker has claimed yet"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SqliteCrawlQueue(CrawlQueue):
+    """Queue in a SQLite file, shared by processes on one machine"""
+
+    def __init__(self, path: str, lease: float = 300, max_attempts: int = 3):
+        super().__init__(lease, max_attempts)
+        self._lock = threading.Lock()
+        # Autocommit mode, so claims can take the write lock with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id TEXT PRIMARY KEY, job_id TEXT NOT NULL, task TEXT NOT NULL, "
+            "state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, lease_until REAL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "job_id TEXT NOT NULL, url_hash INTEGER NOT NULL, data TEXT NOT NULL, "
+            "UNIQUE (job_id, url_hash))"
+        )
+
+    def _write_many(self, sql: str, rows: List[tuple]):
+        """Run an insert for many rows in one transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def submit(self, tasks: List[CrawlTask]):
+        now = time.time()
+        self._write_many(
+            "INSERT OR IGNORE INTO tasks (id, job_id, task, state, created) VALUES (?, ?, ?, 'queued', ?)",
+            [(task.id, task.job_id, task.to_json(), now) for task in tasks]
+        )
+
+    def claim(self) -> Optional[CrawlTask]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Tasks whose worker vanished on their last attempt are given up
+                self._conn.execute(
+                    "UPDATE tasks SET state = 'failed' "
+                    "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?", (now, self.max_attempts)
+                )
+                row = self._conn.execute(
+                    "SELECT id, task, attempts FROM tasks "
+                    "WHERE state = 'queued' OR (state = 'leased' AND lease_until < ?) "
+                    "ORDER BY created LIMIT 1", (now,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                task_id, data, attempts = row
+                self._conn.execute(
+                    "UPDATE tasks SET state = 'leased', attempts = ?, lease_until = ? WHERE id = ?",
+                    (attempts + 1, now + self.lease, task_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        task = CrawlTask.from_json(data)
+        task.attempts = attempts + 1
+        return task
+
+    def renew(self, task: CrawlTask):
+        # The attempt number fences off a worker whose task was claimed again after its lease ran out
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND state = 'leased' AND attempts = ?",
+                (time.time() + self.lease, task.id, task.attempts)
+            )
+
+    def complete(self, task: CrawlTask):
+        # Fenced like renew(), so a worker whose lease ran out cannot complete a task claimed again
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET state = 'done' WHERE id = ? AND state = 'leased' AND attempts = ?",
+                (task.id, task.attempts)
+            )
+
+    def fail(self, task: CrawlTask, error: str):
+        state = 'failed' if task.attempts >= self.max_attempts else 'queued'
+        logging.error(f"Crawl task {task.id} failed (attempt {task.attempts}): {error}")
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET state = ? WHERE id = ? AND state = 'leased' AND attempts = ?",
+                (state, task.id, task.attempts)
+            )
+
+    def publish(self, task: CrawlTask, resumes: List[ResumeData]):
+        self._write_many(
+            "INSERT OR IGNORE INTO results (job_id, url_hash, data) VALUES (?, ?, ?)",
+            [(task.job_id, url_hash(resume.url), json.dumps(resume.to_dict(), ensure_ascii=False))
+             for resume in resumes]
+        )
+
+    def results(self, job_id: str, offset: int) -> Tuple[List[ResumeData], int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, data FROM results WHERE job_id = ? AND rowid > ? ORDER BY rowid",
+                (job_id, offset)
+            ).fetchall()
+        if not rows:
+            return [], offset
+        return [ResumeData(**json.loads(data)) for _, data in rows], rows[-1][0]
+
+    def finished(self, job_id: str) -> bool:
+        with self._lock:
+            (pending,) = self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND state IN ('queued', 'leased')", (job_id,)
+            ).fetchone()
+        return pending == 0
+
+    def failed(self, job_id: str) -> List[CrawlTask]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task FROM tasks WHERE job_id = ? AND state = 'failed' ORDER BY created, id", (job_id,)
+            ).fetchall()
+        return [CrawlTask.from_json(data) for (data,) in rows]
+
+    def truncate(self, job_id: str, last_page: int):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET state = 'cancelled' WHERE job_id = ? AND state IN ('queued', 'leased') "
+                "AND json_extract(task, '$.first_page') > ?", (job_id, last_page)
+            )
+
+    def cancel(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET state = 'cancelled' WHERE job_id = ? AND state = 'queued'", (job_id,)
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+# Adds a resume to a search's results unless its URL hash is already there
+REDIS_PUBLISH = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[2], ARGV[2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+"""
+
+# Pushes tasks whose lease ran out back on the queue, or gives them up after max_attempts.
+# KEYS: queue, leases; ARGV: key prefix, now, max_attempts
+REDIS_REQUEUE_EXPIRED = """
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], 0, ARGV[2])) do
+    redis.call('ZREM', KEYS[2], id)
+    local data = redis.call('GET', ARGV[1] .. 'task:' .. id)
+    if data then
+        local job = cjson.decode(data)['job_id']
+        local attempts = tonumber(redis.call('HGET', ARGV[1] .. 'attempts:' .. job, id) or 0)
+        if attempts >= tonumber(ARGV[3]) then
+            redis.call('HSET', ARGV[1] .. 'job:' .. job, id, 'failed')
+        else
+            redis.call('RPUSH', KEYS[1], id)
+        end
+    end
+end
+"""
+
+# Pops the first task still wanted by its search, leases it and counts the attempt; returns {task, attempt}.
+# KEYS: queue, leases; ARGV: key prefix, lease deadline, ttl
+REDIS_CLAIM = """
+while true do
+    local id = redis.call('LPOP', KEYS[1])
+    if not id then
+        return false
+    end
+    local data = redis.call('GET', ARGV[1] .. 'task:' .. id)
+    if data then
+        local job = cjson.decode(data)['job_id']
+        local state = redis.call('HGET', ARGV[1] .. 'job:' .. job, id)
+        -- Skips tasks cancelled, or completed by a worker whose lease had run out
+        if state == 'queued' or state == 'leased' then
+            redis.call('ZADD', KEYS[2], ARGV[2], id)
+            local attempt = redis.call('HINCRBY', ARGV[1] .. 'attempts:' .. job, id, 1)
+            redis.call('EXPIRE', ARGV[1] .. 'attempts:' .. job, ARGV[3])
+            redis.call('HSET', ARGV[1] .. 'job:' .. job, id, 'leased')
+            return {data, attempt}
+        end
+    end
+end
+"""
+
+# Lets only the current holder of a task's lease change it: a worker whose
+# lease ran out and whose task was claimed again gets 0.
+# KEYS: job states, attempts, leases, queue; ARGV: task id, attempt, ...
+REDIS_FENCE = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= 'leased'
+        or tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or 0) ~= tonumber(ARGV[2]) then
+    return 0
+end
+"""
+
+# ARGV[3]: new lease deadline
+REDIS_RENEW = REDIS_FENCE + """
+redis.call('ZADD', KEYS[3], 'XX', ARGV[3], ARGV[1])
+return 1
+"""
+
+REDIS_COMPLETE = REDIS_FENCE + """
+redis.call('HSET', KEYS[1], ARGV[1], 'done')
+redis.call('ZREM', KEYS[3], ARGV[1])
+return 1
+"""
+
+# ARGV[3]: max_attempts. A task already pushed back by REDIS_REQUEUE_EXPIRED is left alone.
+REDIS_FAIL = REDIS_FENCE + """
+if redis.call('ZREM', KEYS[3], ARGV[1]) == 0 then
+    return 0
+end
+if tonumber(ARGV[2]) >= tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], ARGV[1], 'failed')
+else
+    redis.call('RPUSH', KEYS[4], ARGV[1])
+end
+return 1
+"""
+
+
+class RedisCrawlQueue(CrawlQueue):
+    """
+    Queue in Redis (or anything speaking its protocol), shared by workers on any number of machines.
+
+    Available task ids wait in a list; claimed ones are moved to a sorted
+    set scored by lease deadline, from which expired ones are pushed back.
+    Claiming, requeueing and every change of a leased task run as Lua
+    scripts, so a worker dying between two commands cannot lose a task.
+    Each search keeps a list of its resumes, with a set of their URL hashes
+    so a resume is appended once. A search's keys expire after `ttl` seconds.
+    """
+
+    PREFIX = "crawl:"
+
+    def __init__(self, url: str, lease: float = 300, max_attempts: int = 3, ttl: int = 24 * 3600):
+        super().__init__(lease, max_attempts)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("The Redis crawl queue needs redis: pip install redis")
+
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+        self._publish = self._redis.register_script(REDIS_PUBLISH)
+        self._requeue_expired_script = self._redis.register_script(REDIS_REQUEUE_EXPIRED)
+        self._claim = self._redis.register_script(REDIS_CLAIM)
+        self._renew = self._redis.register_script(REDIS_RENEW)
+        self._complete = self._redis.register_script(REDIS_COMPLETE)
+        self._fail = self._redis.register_script(REDIS_FAIL)
+        self._queue = self.PREFIX + "queue"
+        self._leases = self.PREFIX + "leases"
+
+    def _key(self, kind: str, key: str) -> str:
+        return f"{self.PREFIX}{kind}:{key}"
+
+    def submit(self, tasks: List[CrawlTask]):
+        pipe = self._redis.pipeline()
+        for task in tasks:
+            pipe.set(self._key('task', task.id), task.to_json(), ex=self.ttl)
+            pipe.hset(self._key('job', task.job_id), task.id, 'queued')
+            pipe.rpush(self._queue, task.id)
+        for job_id in {task.job_id for task in tasks}:
+            pipe.expire(self._key('job', job_id), self.ttl)
+        pipe.execute()
+
+    def _task_keys(self, task: CrawlTask) -> List[str]:
+        return [self._key('job', task.job_id), self._key('attempts', task.job_id), self._leases, self._queue]
+
+    def claim(self) -> Optional[CrawlTask]:
+        now = time.time()
+        self._requeue_expired_script(keys=[self._queue, self._leases], args=[self.PREFIX, now, self.max_attempts])
+        claimed = self._claim(keys=[self._queue, self._leases], args=[self.PREFIX, now + self.lease, self.ttl])
+        if not claimed:
+            return None
+        data, attempt = claimed
+        task = CrawlTask.from_json(data)
+        task.attempts = int(attempt)
+        return task
+
+    def renew(self, task: CrawlTask):
+        self._renew(keys=self._task_keys(task), args=[task.id, task.attempts, time.time() + self.lease])
+
+    def complete(self, task: CrawlTask):
+        self._complete(keys=self._task_keys(task), args=[task.id, task.attempts])
+
+    def fail(self, task: CrawlTask, error: str):
+        logging.error(f"Crawl task {task.id} failed (attempt {task.attempts}): {error}")
+        self._fail(keys=self._task_keys(task), args=[task.id, task.attempts, self.max_attempts])
+
+    def publish(self, task: CrawlTask, resumes: List[ResumeData]):
+        pipe = self._redis.pipeline()
+        for resume in resumes:
+            self._publish(
+                keys=[self._key('seen', task.job_id), self._key('results', task.job_id)],
+                args=[url_hash(resume.url), json.dumps(resume.to_dict(), ensure_ascii=False), self.ttl],
+                client=pipe,
+            )
+        pipe.execute()
+
+    def results(self, job_id: str, offset: int) -> Tuple[List[ResumeData], int]:
+        items = self._redis.lrange(self._key('results', job_id), offset, -1)
+        return [ResumeData(**json.loads(item)) for item in items], offset + len(items)
+
+    def finished(self, job_id: str) -> bool:
+        states = self._redis.hvals(self._key('job', job_id))
+        return not any(state in (b'queued', b'leased') for state in states)
+
+    def failed(self, job_id: str) -> List[CrawlTask]:
+        tasks = []
+        for task_id, state in self._redis.hgetall(self._key('job', job_id)).items():
+            data = self._redis.get(self._key('task', task_id.decode())) if state == b'failed' else None
+            if data is not None:
+                tasks.append(CrawlTask.from_json(data))
+        return sorted(tasks, key=lambda task: task.first_page)
+
+    def truncate(self, job_id: str, last_page: int):
+        key = self._key('job', job_id)
+        for task_id, state in self._redis.hgetall(key).items():
+            if state not in (b'queued', b'leased'):
+                continue
+            data = self._redis.get(self._key('task', task_id.decode()))
+            if data is not None and CrawlTask.from_json(data).first_page > last_page:
+                self._redis.hset(key, task_id, 'cancelled')
+                self._redis.zrem(self._leases, task_id)
+
+    def cancel(self, job_id: str):
+        key = self._key('job', job_id)
+        for task_id, state in self._redis.hgetall(key).items():
+            if state == b'queued':
+                self._redis.hset(key, task_id, 'cancelled')
+
+    def close(self):
+        self._redis.close()
+
+
+def open_crawl_queue(url: str, **kwargs) -> CrawlQueue:
+    """Open a queue from a URL: sqlite:///path/to/file.sqlite3 or redis://host:port/db"""
+    if url.startswith('sqlite:///'):
+        return SqliteCrawlQueue(url[len('sqlite:///'):], **kwargs)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCrawlQueue(url, **kwargs)
+    raise ValueError(f"Unknown crawl queue '{url}', expected sqlite:///<path> or redis://<host>")
+
+
+def run_distributed(queue: CrawlQueue, search: SearchSession, max_pages: int, pages_per_task: int,
+                    poll_interval: float = 0.5, timeout: Optional[float] = None,
+                    cancelled: Optional[Callable[[], bool]] = None) -> Iterator[ResumeData]:
+    """
+    Submit a search to the workers and yield its resumes as they are published.
+
+    Stops when every task is completed or given up. Returns early once
+    `cancelled()` is true and raises TimeoutError after `timeout` seconds,
+    so a search nobody works on does not wait forever; in both cases, as
+    when the generator is closed early, the tasks no worker has started
+    are cancelled. Raises RuntimeError after the last resume when tasks
+    were given up, naming their pages.
+    """
+    job_id = uuid.uuid4().hex
+    tasks = plan_tasks(job_id, search, max_pages, pages_per_task)
+    queue.submit(tasks)
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    offset = 0
+    done = False
+    try:
+        while not done:
+            if cancelled is not None and cancelled():
+                return
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Crawl workers did not finish the search in {timeout:.0f} s")
+            # Check before reading, so resumes published just before the last task completed are not missed
+            done = queue.finished(job_id)
+            resumes, offset = queue.results(job_id, offset)
+            yield from resumes
+            if not resumes and not done:
+                time.sleep(poll_interval)
+    finally:
+        if not done:
+            queue.cancel(job_id)
+
+    failed = queue.failed(job_id)
+    if failed:
+        pages = ", ".join(f"{task.first_page}-{task.first_page + task.pages - 1}" for task in failed)
+        raise RuntimeError(f"{len(failed)} of {len(tasks)} crawl tasks failed (pages {pages})")
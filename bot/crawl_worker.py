@@ -0,0 +1,159 @@
+"""
+Crawl worker: takes tasks from the shared crawl queue and runs them with WorkUaParser.
+
+Start any number of workers, on this machine or on others, against the queue
+the bot submits searches to (CRAWL_QUEUE). Each task is a range of results
+pages of one search; its resumes are published back to the queue.
+
+Usage:
+    python crawl_worker.py --queue sqlite:///crawl.sqlite3
+    python crawl_worker.py --queue redis://queue-host:6379/0 --engine http --concurrency 4
+"""
+from typing import Callable, List
+import argparse
+import functools
+import logging
+import os
+import threading
+
+from browser_profile import PROFILES
+from category_index import CategoryIndex
+from crawl_queue import CrawlQueue, CrawlTask, open_crawl_queue
+from driver_pool import DriverPool, create_driver
+from result_store import ResumeStore
+from retry_policy import LatencyTracker, RetryPolicy
+from work_au_parser import ResumeData, SiteParser, WorkUaParser
+
+
+class CrawlWorker:
+    """
+    Claims crawl tasks one at a time and runs each with a fresh parser.
+
+    Resumes are published in batches of `batch_size`, and every batch also
+    renews the task's lease, so a long task is not handed to another worker.
+    A task that reaches the last results page cancels the tasks planned
+    past it, and one that starts past it ends empty.
+    A task that raises is handed back with fail() for another attempt.
+
+    Args:
+        queue: CrawlQueue to take tasks from
+        parser_factory: callable taking a page count and returning a new SiteParser
+        batch_size: resumes per publish
+        idle_interval: seconds to wait when the queue is empty
+    """
+
+    def __init__(self, queue: CrawlQueue, parser_factory: Callable[[int], SiteParser],
+                 batch_size: int = 10, idle_interval: float = 1.0):
+        self.queue = queue
+        self.parser_factory = parser_factory
+        self.batch_size = batch_size
+        self.idle_interval = idle_interval
+
+    def run_task(self, task: CrawlTask) -> int:
+        """Crawl the task's pages, publish its resumes and return how many there were"""
+        search = task.search
+        count = 0
+        batch: List[ResumeData] = []
+        with self.parser_factory(task.pages) as parser:
+            parser.select_category(search.category)
+            parser.choose_profession(search.specialty)
+            parser.choose_location(search.location)
+            # Before apply_filters, so the task's first page is the one loaded
+            parser.open_page(task.first_page)
+            parser.apply_filters(search.filters)
+
+            for resume in parser.get_resumes_from_pages(task.pages):
+                batch.append(resume)
+                if len(batch) >= self.batch_size:
+                    self.queue.publish(task, batch)
+                    self.queue.renew(task)
+                    self._report_last_page(task, parser)
+                    count += len(batch)
+                    batch = []
+            self._report_last_page(task, parser)
+        if batch:
+            self.queue.publish(task, batch)
+            count += len(batch)
+        return count
+
+    def _report_last_page(self, task: CrawlTask, parser: SiteParser):
+        """Drop the search's tasks past its last page, as soon as the crawl has seen where it ends"""
+        if parser.last_page is not None:
+            self.queue.truncate(task.job_id, parser.last_page)
+
+    def run(self, stop: threading.Event):
+        """Work on tasks until `stop` is set"""
+        while not stop.is_set():
+            try:
+                task = self.queue.claim()
+            except Exception as e:
+                logging.error(f"Could not claim a crawl task: {str(e)}")
+                stop.wait(self.idle_interval)
+                continue
+            if task is None:
+                stop.wait(self.idle_interval)
+                continue
+
+            try:
+                count = self.run_task(task)
+            except Exception as e:
+                self.queue.fail(task, str(e))
+                continue
+            self.queue.complete(task)
+            logging.info(f"Crawl task {task.id} done: {count} resumes from pages "
+                         f"{task.first_page}-{task.first_page + task.pages - 1}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--queue', default=os.getenv('CRAWL_QUEUE'),
+                            help="sqlite:///<path> or redis://<host>:<port>/<db>, CRAWL_QUEUE by default")
+    arg_parser.add_argument('--engine', choices=WorkUaParser.ENGINES, default=os.getenv('PARSER_ENGINE', 'selenium'))
+    arg_parser.add_argument('--extraction', choices=WorkUaParser.EXTRACTION_MODES, default='listing')
+    arg_parser.add_argument('--workers', type=int, default=4, help="resume pages loaded at once per task")
+    arg_parser.add_argument('--concurrency', type=int, default=1, help="tasks run at once by this process")
+    arg_parser.add_argument('--categories', default=os.getenv('CATEGORY_INDEX_PATH', 'categories.json'))
+    arg_parser.add_argument('--profile', choices=list(PROFILES), default=os.getenv('BROWSER_PROFILE', 'lean'),
+                            help="browser profile of the selenium engine")
+    args = arg_parser.parse_args()
+    if not args.queue:
+        arg_parser.error("--queue or CRAWL_QUEUE is required")
+
+    logging.basicConfig(level=logging.INFO)
+    crawl_queue = open_crawl_queue(args.queue)
+    # Resumes are shared between the tasks this process runs
+    resume_cache = ResumeStore()
+    categories = CategoryIndex(args.categories)
+    # So are the learned timeouts and the circuit breaker: a throttled site pauses every task
+    retry_policy = RetryPolicy(latency=LatencyTracker(initial=WorkUaParser.WAIT_TIMEOUT))
+    # And so are warm browsers: a task leases one instead of starting Chrome for its few pages
+    driver_pool = None
+    if args.engine == 'selenium':
+        driver_pool = DriverPool(min_size=1, max_size=args.concurrency,
+                                 factory=functools.partial(create_driver, PROFILES[args.profile]))
+
+    def parser_factory(pages: int) -> SiteParser:
+        return WorkUaParser(engine=args.engine, workers=args.workers, max_pages=pages,
+                            extraction=args.extraction, resume_cache=resume_cache, categories=categories,
+                            retry_policy=retry_policy, driver_pool=driver_pool)
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=CrawlWorker(crawl_queue, parser_factory).run, args=(stop,),
+                         name=f'crawl-worker-{i}')
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        # Running tasks finish; unfinished ones are picked up again once their lease runs out
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
+        crawl_queue.close()
@@ -0,0 +1,242 @@
+from typing import Callable, Dict, List, Optional
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from telebot.apihelper import ApiTelegramException
+
+from exporters import export_filename, open_exporter
+from work_au_parser import ResumeData
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def is_full(self) -> bool:
+        """True once the bucket has refilled, i.e. it is no different from a new one"""
+        with self._lock:
+            return self._tokens + (time.monotonic() - self._updated) * self.rate >= self.capacity
+
+
+class TelegramRateLimits:
+    """Token buckets for Telegram's global and per-chat message limits"""
+
+    # Telegram allows about 30 messages/s per bot and 1 message/s per chat
+    GLOBAL_RATE = 30
+    CHAT_RATE = 1
+    CHAT_BURST = 3
+    # How often buckets of chats that went quiet are dropped
+    SWEEP_INTERVAL = 60
+
+    def __init__(self):
+        self.global_bucket = TokenBucket(self.GLOBAL_RATE, self.GLOBAL_RATE)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._swept = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, chat_id: int):
+        with self._lock:
+            if time.monotonic() - self._swept >= self.SWEEP_INTERVAL:
+                self._sweep()
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self._chat_buckets[chat_id] = TokenBucket(self.CHAT_RATE, self.CHAT_BURST)
+        bucket.acquire()
+        self.global_bucket.acquire()
+
+    def _sweep(self):
+        """Drop the buckets that refilled; a chat that comes back gets a new, equally full one"""
+        self._chat_buckets = {chat: bucket for chat, bucket in self._chat_buckets.items()
+                              if not bucket.is_full()}
+        self._swept = time.monotonic()
+
+
+rate_limits = TelegramRateLimits()
+
+
+def send_with_retries(limits: TelegramRateLimits, chat_id: int, send: Callable[[], None],
+                      retries: int = 3) -> bool:
+    """Call `send` respecting rate limits and Telegram's retry_after hints; False if it gave up"""
+    for _ in range(retries):
+        limits.acquire(chat_id)
+        try:
+            send()
+            return True
+        except ApiTelegramException as e:
+            if e.error_code != 429:
+                raise
+            retry_after = e.result_json.get('parameters', {}).get('retry_after', 1)
+            logging.warning(f"Telegram flood limit hit, retrying in {retry_after} s")
+            time.sleep(retry_after)
+    logging.error(f"Giving up sending message to chat {chat_id}")
+    return False
+
+
+class ResultDispatcher:
+    """
+    Streams resumes to a chat in batches as they are parsed.
+
+    A batch is sent once it holds `batch_size` links or its oldest link has
+    waited `max_delay` seconds, checked by a timer so a stalled crawl does not
+    hold back links it already found; call close() to send the remainder.
+    `on_sent` is called with every batch Telegram accepted, so callers can
+    tell what was delivered from what was dropped.
+    """
+
+    def __init__(self, bot, chat_id: int, batch_size: int = 10, max_delay: float = 5.0,
+                 limits: Optional[TelegramRateLimits] = None,
+                 on_sent: Optional[Callable[[List[ResumeData]], None]] = None):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.limits = limits or rate_limits
+        self.on_sent = on_sent
+        self.sent_count = 0
+        self._pending: List[ResumeData] = []
+        # Numbers batches, so a timer started for a batch already sent leaves the next one alone
+        self._batch = 0
+        self._timer: Optional[threading.Timer] = None
+        # Guards the pending batch; sends happen outside it, so add() is not held up by Telegram
+        self._lock = threading.Lock()
+        # Held while sending, so batches go out one at a time and in order
+        self._send_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, resume: ResumeData):
+        with self._lock:
+            if not self._pending:
+                self._batch += 1
+                self._timer = threading.Timer(self.max_delay, self._flush_stale, args=(self._batch,))
+                self._timer.daemon = True
+                self._timer.start()
+            self._pending.append(resume)
+            full = len(self._pending) >= self.batch_size
+
+        if full:
+            self.flush()
+
+    def _flush_stale(self, batch: int):
+        try:
+            with self._send_lock:
+                self._deliver(self._take(batch))
+        except Exception as e:
+            logging.error(f"Could not send links to chat {self.chat_id}: {str(e)}")
+
+    def _take(self, batch: Optional[int] = None) -> List[ResumeData]:
+        """Swap out the pending links, unless `batch` was given and is no longer the pending one"""
+        with self._lock:
+            if batch is not None and batch != self._batch:
+                return []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, []
+            return pending
+
+    def _deliver(self, batch: List[ResumeData]):
+        if not batch:
+            return
+        text = "Посилання:\n" + "\n".join(resume.url for resume in batch)
+        if not self.send(text):
+            return
+        self.sent_count += len(batch)
+        if self.on_sent is not None:
+            self.on_sent(batch)
+
+    def flush(self):
+        with self._send_lock:
+            self._deliver(self._take())
+
+    def close(self):
+        self.flush()
+
+    def send(self, text: str, retries: int = 3) -> bool:
+        """Send a message respecting rate limits and Telegram's retry_after hints; False if it gave up"""
+        return send_with_retries(
+            self.limits, self.chat_id,
+            lambda: self.bot.send_message(self.chat_id, text, disable_web_page_preview=True),
+            retries
+        )
+
+
+class DocumentDispatcher:
+    """
+    Streams resumes into an export file and sends it as one Telegram document on close.
+
+    Has the same add()/close() interface as ResultDispatcher; `sent_count` is
+    set once the document has been sent. Nothing is sent for an empty search.
+    """
+
+    # Telegram rejects documents larger than this from bots
+    MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+
+    def __init__(self, bot, chat_id: int, export_format: str = 'csv', compress: bool = False,
+                 name: str = "resumes", caption: Optional[str] = None,
+                 limits: Optional[TelegramRateLimits] = None):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.caption = caption
+        self.limits = limits or rate_limits
+        self.sent_count = 0
+        self.filename = export_filename(name, export_format, compress)
+        self._directory = tempfile.mkdtemp(prefix='export-')
+        self.path = os.path.join(self._directory, self.filename)
+        self.exporter = open_exporter(self.path, export_format, compress)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, resume: ResumeData):
+        self.exporter.write(resume)
+
+    def close(self):
+        try:
+            self.exporter.close()
+            if self.exporter.count:
+                self.send()
+        finally:
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+    def send(self, retries: int = 3):
+        size = os.path.getsize(self.path)
+        if size > self.MAX_DOCUMENT_BYTES:
+            raise ValueError(f"Export file is {size // (1024 * 1024)} MB, Telegram accepts up to 50 MB")
+
+        def send_document():
+            with open(self.path, 'rb') as f:
+                self.bot.send_document(self.chat_id, f, caption=self.caption, visible_file_name=self.filename)
+
+        if send_with_retries(self.limits, self.chat_id, send_document, retries):
+            self.sent_count = self.exporter.count
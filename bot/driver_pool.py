@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import logging
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from browser_profile import BrowserProfile, DEFAULT_PROFILE
+
+
+def create_driver(profile: BrowserProfile = DEFAULT_PROFILE) -> webdriver.Chrome:
+    """Start the headless Chrome used by WorkUaParser"""
+    driver = webdriver.Chrome(options=profile.chrome_options())
+    # Tabs opened later need the profile's request blocking installed too
+    driver.browser_profile = profile
+    profile.apply(driver)
+    return driver
+
+
+class DriverPool:
+    """
+    Pool of warm WebDriver instances shared across searches.
+
+    Drivers are health-checked when leased, reset (extra tabs closed, cookies
+    cleared) when returned, and recycled after `max_uses` leases or when the
+    lease ended with a WebDriver crash.
+    """
+
+    def __init__(self, min_size: int = 1, max_size: int = 4, max_uses: int = 50,
+                 factory: Callable[[], webdriver.Remote] = create_driver):
+        if not 0 <= min_size <= max_size:
+            raise ValueError("Pool size should satisfy 0 <= min_size <= max_size")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.factory = factory
+
+        self._idle: List[webdriver.Remote] = []
+        self._uses: Dict[int, int] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append(self._create())
+
+    def _create(self) -> webdriver.Remote:
+        """Start a driver for a slot that was already counted in _size"""
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        self._uses[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver: webdriver.Remote):
+        self._uses.pop(id(driver), None)
+        self._size -= 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting driver: {str(e)}")
+
+    @staticmethod
+    def is_healthy(driver: webdriver.Remote) -> bool:
+        """Check that the browser still answers commands"""
+        try:
+            driver.current_window_handle
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def reset(driver: webdriver.Remote):
+        """Bring a driver back to a clean single-tab state"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Remote:
+        """Take a healthy driver from the pool, starting one if the pool isn't full"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+
+                while self._idle:
+                    driver = self._idle.pop()
+                    if self.is_healthy(driver):
+                        self._uses[id(driver)] += 1
+                        return driver
+                    logging.warning("Discarding unhealthy driver")
+                    self._discard(driver)
+
+                if self._size < self.max_size:
+                    # Reserve the slot, the slow browser start happens outside the lock
+                    self._size += 1
+                    break
+
+                if not self._condition.wait(timeout):
+                    raise TimeoutError("No driver available in the pool")
+
+        driver = self._create()
+        self._uses[id(driver)] += 1
+        return driver
+
+    def release(self, driver: webdriver.Remote, broken: bool = False):
+        """Return a driver to the pool, recycling it if it is broken or worn out"""
+        with self._condition:
+            reusable = not broken and not self._closed and self._uses.get(id(driver), 0) < self.max_uses
+
+        if reusable:
+            # Resetting talks to the browser, so other threads keep using the pool meanwhile
+            try:
+                self.reset(driver)
+            except WebDriverException as e:
+                logging.warning(f"Driver reset failed, recycling it: {str(e)}")
+                reusable = False
+
+        with self._condition:
+            if reusable and not self._closed:
+                self._idle.append(driver)
+            else:
+                self._discard(driver)
+
+            missing = 0 if self._closed else max(0, self.min_size - self._size)
+            self._size += missing
+            self._condition.notify()
+
+        # Top the pool back up to its warm minimum
+        for _ in range(missing):
+            try:
+                new_driver = self._create()
+            except Exception as e:
+                # _create gave the slot back; the next release or acquire tries again
+                logging.error(f"Could not start a driver to refill the pool: {str(e)}")
+                continue
+            with self._condition:
+                self._idle.append(new_driver)
+                self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        """Quit every idle driver; leased ones are quit when released"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._condition.notify_all()
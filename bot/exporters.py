@@ -0,0 +1,159 @@
+"""
+Streaming exporters that write resumes to a file as the crawler produces them.
+
+JSONL and CSV can be gzip-compressed; Parquet (needs pyarrow) is written in
+row groups and compressed internally instead. Next to the resume's fields
+every row has the salary range parsed into numbers.
+"""
+from typing import Dict, Iterable, List, Type, Union
+import csv
+import gzip
+import json
+
+from work_au_parser import ResumeData
+
+FIELDS = list(ResumeData.FIELDS) + ['salary_from', 'salary_to']
+
+
+def export_row(resume: ResumeData) -> Dict[str, Union[str, int, None]]:
+    row = resume.to_dict()
+    row['salary_from'] = resume.salary_from
+    row['salary_to'] = resume.salary_to
+    return row
+
+
+class ResumeExporter:
+    """Base class: open the file on creation, write() resumes one by one, close() when done"""
+
+    extension = ""
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.compress = compress
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _open_text(self):
+        if self.compress:
+            return gzip.open(self.path, 'wt', encoding='utf-8', newline='')
+        return open(self.path, 'w', encoding='utf-8', newline='')
+
+    def write(self, resume: ResumeData):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class JsonlExporter(ResumeExporter):
+    """One JSON object per line"""
+
+    extension = "jsonl"
+
+    def __init__(self, path: str, compress: bool = False):
+        super().__init__(path, compress)
+        self._file = self._open_text()
+
+    def write(self, resume: ResumeData):
+        self._file.write(json.dumps(export_row(resume), ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+class CsvExporter(ResumeExporter):
+    """CSV with a header row, UTF-8 with BOM so spreadsheets detect the encoding"""
+
+    extension = "csv"
+
+    def __init__(self, path: str, compress: bool = False):
+        super().__init__(path, compress)
+        self._file = self._open_text()
+        self._file.write('\ufeff')
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def write(self, resume: ResumeData):
+        self._writer.writerow(export_row(resume))
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetExporter(ResumeExporter):
+    """Parquet written in row groups of `batch_size` resumes; needs pyarrow"""
+
+    extension = "parquet"
+
+    def __init__(self, path: str, compress: bool = False, batch_size: int = 1000):
+        super().__init__(path, compress)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+        self._pa = pyarrow
+        self._schema = pyarrow.schema(
+            [(name, pyarrow.string()) for name in ResumeData.FIELDS]
+            + [('salary_from', pyarrow.int64()), ('salary_to', pyarrow.int64())]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(
+            path, self._schema, compression='gzip' if compress else 'snappy'
+        )
+        self.batch_size = batch_size
+        self._batch: List[ResumeData] = []
+
+    def write(self, resume: ResumeData):
+        self._batch.append(resume)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        rows = [export_row(resume) for resume in self._batch]
+        columns = {name: [row[name] for row in rows] for name in FIELDS}
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+        self._batch = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+EXPORTERS: Dict[str, Type[ResumeExporter]] = {
+    'jsonl': JsonlExporter,
+    'csv': CsvExporter,
+    'parquet': ParquetExporter,
+}
+
+
+def export_filename(name: str, export_format: str, compress: bool = False) -> str:
+    """File name with the extension of the format, plus .gz for compressed JSONL and CSV"""
+    exporter = EXPORTERS[export_format]
+    suffix = ".gz" if compress and exporter is not ParquetExporter else ""
+    return f"{name}.{exporter.extension}{suffix}"
+
+
+def open_exporter(path: str, export_format: str, compress: bool = False) -> ResumeExporter:
+    exporter = EXPORTERS.get(export_format)
+    if exporter is None:
+        raise ValueError(f"Unknown export format '{export_format}', expected one of {list(EXPORTERS)}")
+    return exporter(path, compress)
+
+
+def export(resumes: Iterable[ResumeData], path: str, export_format: str, compress: bool = False) -> int:
+    """Stream resumes into a file and return how many were written"""
+    with open_exporter(path, export_format, compress) as exporter:
+        for resume in resumes:
+            exporter.write(resume)
+    return exporter.count
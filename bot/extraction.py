@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from typing import Dict, List
+from urllib.parse import urljoin
+
+
+@dataclass(frozen=True)
+class ExtractionSpec:
+    """
+    Declarative description of what to read from a page.
+
+    `items` is an XPath selecting the repeated elements (cards, links); every
+    entry of `fields` is a string XPath expression evaluated relative to one
+    item. The first `skip` items are ignored. A field named 'url' is made
+    absolute, and items whose 'url' is empty are dropped.
+    """
+    items: str
+    fields: Dict[str, str]
+    skip: int = 0
+
+
+CATEGORY_SPEC = ExtractionSpec(
+    items="//li/a[starts-with(@href, '/resumes-')]",
+    fields={
+        'name': "normalize-space(.)",
+        'url': "string(@href)",
+    },
+)
+
+RESUME_CARD_SPEC = ExtractionSpec(
+    items="//div[contains(@class, 'card') and contains(@class, 'resume-link')]",
+    fields={
+        'url': "string(.//h2/a/@href)",
+        'update_date': "string(.//time/@datetime)",
+        'name': "normalize-space(.//p[contains(@class, 'mt-xs')]/span[contains(@class, 'strong-600')][1])",
+        'specialization': "normalize-space(.//h2/a)",
+        'salary': "normalize-space(.//h2/following-sibling::*[contains(., 'грн')][1])",
+    },
+)
+
+# Fallback when no result cards are recognised: every resume link on the page.
+# Category links (/resumes/by-...) are among them and are dropped by the caller
+RESUME_LINK_SPEC = ExtractionSpec(
+    items="//a[starts-with(@href, '/resumes/')]",
+    fields={
+        'url': "string(@href)",
+        'update_date': "string(ancestor::*[contains(concat(' ', normalize-space(@class), ' '), ' card ')][1]"
+                       "//time/@datetime)",
+    },
+    skip=1,
+)
+
+# rel=next is preferred; the last pagination item is the "next" arrow otherwise
+NEXT_PAGE_SPEC = ExtractionSpec(
+    items="//link[@rel='next'] | //ul[contains(@class, 'pagination')]/li[last()]/a",
+    fields={'url': "string(@href)"},
+)
+
+RESUME_DETAIL_SPEC = ExtractionSpec(
+    items="/html",
+    fields={
+        'update_date': "string(//time/@datetime)",
+        'name': "normalize-space(//div[1]/div/div/h1[contains(@class, 'mt-0') and contains(@class, 'mb-0')])",
+        'title': "normalize-space(//div[1]/div/div/h2[1])",
+    },
+)
+
+# Results page: cards, link fallback and the next page, read together
+RESULTS_PAGE_SPECS = {
+    'cards': RESUME_CARD_SPEC,
+    'links': RESUME_LINK_SPEC,
+    'next_page': NEXT_PAGE_SPEC,
+}
+
+
+# Evaluates a dict of ExtractionSpecs in the page and returns plain JSON, so a
+# whole page costs a single WebDriver command
+EXTRACT_JS = """
+const specs = arguments[0];
+const result = {};
+for (const [name, spec] of Object.entries(specs)) {
+    const items = document.evaluate(spec.items, document, null,
+                                    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const rows = [];
+    for (let i = spec.skip; i < items.snapshotLength; i++) {
+        const item = items.snapshotItem(i);
+        const row = {};
+        for (const [field, expr] of Object.entries(spec.fields)) {
+            row[field] = document.evaluate(expr, item, null, XPathResult.STRING_TYPE, null)
+                .stringValue.trim() || null;
+        }
+        if ('url' in spec.fields) {
+            if (!row.url) continue;
+            row.url = new URL(row.url, document.baseURI).href;
+        }
+        rows.push(row);
+    }
+    result[name] = rows;
+}
+return result;
+"""
+
+
+def _spec_to_json(spec: ExtractionSpec) -> Dict:
+    return {'items': spec.items, 'fields': spec.fields, 'skip': spec.skip}
+
+
+def extract_with_driver(driver, specs: Dict[str, ExtractionSpec]) -> Dict[str, List[Dict]]:
+    """Evaluate specs in the driver's current page with one execute_script call"""
+    return driver.execute_script(EXTRACT_JS, {name: _spec_to_json(spec) for name, spec in specs.items()})
+
+
+def extract_from_tree(tree, specs: Dict[str, ExtractionSpec], base_url: str) -> Dict[str, List[Dict]]:
+    """Evaluate specs against a parsed lxml tree"""
+    result = {}
+    for name, spec in specs.items():
+        rows = []
+        for item in tree.xpath(spec.items)[spec.skip:]:
+            row = {field: str(item.xpath(expr)).strip() or None for field, expr in spec.fields.items()}
+            if 'url' in spec.fields:
+                if not row['url']:
+                    continue
+                row['url'] = urljoin(base_url, row['url'])
+            rows.append(row)
+        result[name] = rows
+    return result
@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+@dataclass(frozen=True)
+class CheckboxFilter:
+    """Checkbox on the results page and the query parameter it sets"""
+    xpath: str
+    param: str
+    value: str
+
+
+@dataclass(frozen=True)
+class SelectFilter:
+    """Drop-down on the results page and the query parameter it sets"""
+    xpath: str
+    param: str
+    # Maps user values to option values; None means the value is used as is
+    values: Optional[Dict[int, str]] = None
+
+    def option_value(self, value) -> Optional[str]:
+        if self.values is None:
+            return str(value)
+        return self.values.get(value)
+
+
+SALARY_VALUES = {
+    10000: "2",
+    15000: "3",
+    20000: "4",
+    30000: "5",
+    40000: "6",
+    50000: "7",
+    100000: "8"
+}
+
+# Declarative description of every work.ua resume filter. Both the click path
+# in WorkUaParser and build_search_url read from here.
+FILTER_SCHEMA = {
+    'search_params': {
+        'title_only': CheckboxFilter("//input[@id='f1-1']", 'f1', '1'),
+        'with_synonyms': CheckboxFilter("//input[@id='f2-2']", 'f2', '2'),
+        'any_word': CheckboxFilter("//input[@id='f3-3']", 'f3', '3'),
+    },
+    'employment': {
+        'full_time': CheckboxFilter("//*[@id='employment_selection']/ul[1]/li/label/input", 'employment', '74'),
+        'part_time': CheckboxFilter("//*[@id='employment_selection']/ul[2]/li/label/input", 'employment', '75'),
+    },
+    'age': {
+        'from': SelectFilter("//select[@id='agefrom_selection']", 'agefrom'),
+        'to': SelectFilter("//select[@id='ageto_selection']", 'ageto'),
+    },
+    'gender': {
+        'male': CheckboxFilter("//*[@id='gender_selection']/ul[1]/li/label/input", 'gender', '86'),
+        'female': CheckboxFilter("//*[@id='gender_selection']/ul[2]/li/label/input", 'gender', '87'),
+    },
+    'salary': {
+        'from': SelectFilter("//*[@id='salaryfrom_selection']", 'salaryfrom', SALARY_VALUES),
+        'to': SelectFilter("//*[@id='salaryto_selection']", 'salaryto', SALARY_VALUES),
+        'not_specified': CheckboxFilter("//*[@id='nosalary_selection']/label/input", 'nosalary', '1'),
+    },
+    'education': {
+        'higher': CheckboxFilter("//*[@id='education_selection']/li[1]/label/input", 'education', '1'),
+        'unfinished_higher': CheckboxFilter("//*[@id='education_selection']/li[2]/label/input", 'education', '2'),
+        'specialized_secondary': CheckboxFilter("//*[@id='education_selection']/li[3]/label/input", 'education', '3'),
+        'secondary': CheckboxFilter("//*[@id='education_selection']/li[4]/label/input", 'education', '4'),
+    },
+    'experience': {
+        'no_experience': CheckboxFilter("//*[@id='experience_selection']/li[1]/label/input", 'experience', '0'),
+        'up_to_1': CheckboxFilter("//*[@id='experience_selection']/li[2]/label/input", 'experience', '1'),
+        '1_to_2': CheckboxFilter("//*[@id='experience_selection']/li[3]/label/input", 'experience', '2'),
+        '2_to_5': CheckboxFilter("//*[@id='experience_selection']/li[4]/label/input", 'experience', '3'),
+        'more_than_5': CheckboxFilter("//*[@id='experience_selection']/li[5]/label/input", 'experience', '4'),
+    },
+}
+
+
+def compile_filters(filters: Dict) -> List[Tuple[str, str]]:
+    """
+    Turn the bot's filters dict into sorted query parameters.
+
+    Multi-value parameters (e.g. two employment types) are deduplicated and
+    joined with '+', the way work.ua itself encodes them.
+    """
+    params: Dict[str, set] = {}
+
+    for group, selected in filters.items():
+        schema = FILTER_SCHEMA.get(group)
+        if not schema or not selected:
+            continue
+
+        if isinstance(selected, dict):
+            items = selected.items()
+        else:
+            items = ((key, True) for key in selected)
+
+        for key, value in items:
+            spec = schema.get(key)
+            if isinstance(spec, CheckboxFilter):
+                if value:
+                    params.setdefault(spec.param, set()).add(spec.value)
+            elif isinstance(spec, SelectFilter):
+                option_value = spec.option_value(value)
+                if option_value:
+                    params.setdefault(spec.param, set()).add(option_value)
+
+    return [(param, '+'.join(sorted(values))) for param, values in sorted(params.items())]
+
+
+def build_search_url(category_url: str, profession: str = "", location: str = "",
+                     filters: Optional[Dict] = None) -> str:
+    """Compile category, profession, city and filters into one canonical search URL"""
+    query = compile_filters(filters or {})
+    if profession:
+        query.append(('search', profession.strip()))
+    if location:
+        query.append(('city', location.strip()))
+    query.sort()
+
+    if not query:
+        return category_url
+    separator = '&' if '?' in category_url else '?'
+    return category_url + separator + urlencode(query, safe='+')
@@ -0,0 +1,203 @@
+"""
+Local work.ua stand-in for load tests and benchmarks.
+
+Serves a category index, paginated search results and resume pages whose
+markup matches the selectors in extraction.py, with configurable latency.
+Pages recorded from work.ua with PageRecorder are served in place of the
+synthetic ones.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+import hashlib
+import html
+import json
+import os
+import threading
+import time
+
+MANIFEST = 'manifest.json'
+
+
+CATEGORIES = [
+    ("it", "IT, комп'ютери, інтернет"),
+    ("administration", "Адміністрація, керівництво середньої ланки"),
+    ("construction", "Будівництво, архітектура"),
+    ("accounting", "Бухгалтерія, аудит"),
+]
+
+
+class FixtureSite:
+    """
+    Threaded HTTP server with synthetic work.ua pages.
+
+    Args:
+        pages: results pages per search
+        resumes_per_page: result cards per page
+        latency: seconds every response is delayed by
+        incomplete_every: every n-th card has no date, so its detail page is needed (0 - never)
+        recordings: directory written by PageRecorder; recorded paths are served as recorded
+    """
+
+    def __init__(self, pages: int = 3, resumes_per_page: int = 14, latency: float = 0.05,
+                 incomplete_every: int = 0, port: int = 0, recordings: Optional[str] = None):
+        self.pages = pages
+        self.resumes_per_page = resumes_per_page
+        self.latency = latency
+        self.incomplete_every = incomplete_every
+        self.requests = 0
+        self.recordings = recordings
+        self.recorded: Dict[str, str] = {}
+        if recordings is not None:
+            with open(os.path.join(recordings, MANIFEST), encoding='utf-8') as f:
+                self.recorded = json.load(f)
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def category_url(self) -> str:
+        return f"{self.base_url}/resumes/by-category/"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if self.path in site.recorded:
+                    with open(os.path.join(site.recordings, site.recorded[self.path]), encoding='utf-8') as f:
+                        body = f.read()
+                elif url.path == '/resumes/by-category/':
+                    body = site.render_categories()
+                elif url.path.startswith('/resumes-'):
+                    page = int(query.get('page', ['1'])[0])
+                    if page > site.pages:
+                        # Like work.ua, pages past the last one do not exist
+                        self.send_error(404)
+                        return
+                    body = site.render_results(url.path, url.query, page)
+                elif url.path.startswith('/resumes/'):
+                    body = site.render_resume(int(url.path.strip('/').split('/')[-1]))
+                else:
+                    self.send_error(404)
+                    return
+
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @staticmethod
+    def _page(body: str, head: str = "") -> str:
+        return f"<!DOCTYPE html><html><head><meta charset='utf-8'>{head}</head><body>{body}</body></html>"
+
+    def render_categories(self) -> str:
+        items = "".join(
+            f"<li><a href='/resumes-{slug}/'>{html.escape(name)}</a></li>" for slug, name in CATEGORIES
+        )
+        return self._page(f"<ul>{items}</ul>")
+
+    def resume_id(self, page: int, position: int) -> int:
+        return page * 1000 + position
+
+    def render_results(self, path: str, query: str, page: int) -> str:
+        cards = []
+        for position in range(self.resumes_per_page):
+            resume_id = self.resume_id(page, position)
+            complete = not (self.incomplete_every and resume_id % self.incomplete_every == 0)
+            date = f"<time datetime='2024-05-{1 + position % 28:02d} 10:00:00'>{position} дн. тому</time>"
+            cards.append(
+                "<div class='card resume-link'>"
+                f"<h2><a href='/resumes/{resume_id}/'>Python developer {resume_id}</a></h2>"
+                f"<p class='h5'>{20000 + position * 1000} грн</p>"
+                f"<p class='mt-xs'><span class='strong-600'>Кандидат {resume_id}</span></p>"
+                f"{date if complete else ''}"
+                "</div>"
+            )
+
+        head = ""
+        if page < self.pages:
+            params = [part for part in query.split('&') if part and not part.startswith('page=')]
+            params.append(f"page={page + 1}")
+            head = f"<link rel='next' href='{path}?{'&'.join(params)}'>"
+        return self._page("<a href='/resumes/'>Резюме</a>" + "".join(cards), head)
+
+    def render_resume(self, resume_id: int) -> str:
+        position = resume_id % 1000
+        return self._page(
+            "<div><div><div>"
+            f"<h1 class='mt-0 mb-0'>Кандидат {resume_id}</h1>"
+            f"<h2>Python developer {resume_id}, {20000 + position * 1000} грн</h2>"
+            f"<time datetime='2024-05-{1 + position % 28:02d} 10:00:00'>травень</time>"
+            "</div></div></div>"
+        )
+
+
+class PageRecorder:
+    """
+    Saves pages fetched from work.ua so FixtureSite can replay them offline.
+
+    Pages are stored by path and query, with links to the live site made
+    relative so they resolve against the fixture server.
+    """
+
+    def __init__(self, directory: str, origin: str = "https://www.work.ua"):
+        self.directory = directory
+        self.origin = origin
+        self.manifest: Dict[str, str] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, url: str, page: str):
+        parsed = urlparse(url)
+        key = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        filename = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.html'
+        with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as f:
+            f.write(page.replace(self.origin, ""))
+        self.manifest[key] = filename
+
+    def close(self):
+        with open(os.path.join(self.directory, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    with FixtureSite() as fixture_site:
+        print(f"Serving work.ua stand-in at {fixture_site.category_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
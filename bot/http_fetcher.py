@@ -0,0 +1,109 @@
+from typing import List, Dict, Optional, Tuple
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+from extraction import extract_from_tree
+from retry_policy import LatencyTracker, RetryPolicy, ThrottledError
+from site_adapter import SiteAdapter
+from work_au_parser import ResumeData, ListingRow, WorkUaAdapter
+
+
+class TransientHTTPError(requests.HTTPError):
+    """5xx response that is worth retrying"""
+
+
+class PageNotFoundError(requests.HTTPError):
+    """404 response, e.g. for a results page past the last one"""
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds from a Retry-After header, if it holds a number"""
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpResumeFetcher:
+    """Browser-free engine: fetches a site's pages over HTTP and parses them with lxml"""
+
+    HEADERS = {
+        'User-Agent': (
+            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+            '(KHTML, like Gecko) Chrome/130.0 Safari/537.36'
+        ),
+        'Accept-Language': 'uk-UA,uk;q=0.9',
+    }
+    THROTTLE_STATUSES = (429, 503)
+    RETRY_ON = (requests.ConnectionError, requests.Timeout, TransientHTTPError)
+
+    def __init__(self, timeout: int = 10, pool_size: int = 10, policy: Optional[RetryPolicy] = None,
+                 adapter: Optional[SiteAdapter] = None):
+        """
+        Args:
+            timeout: request timeout until the policy has observed enough latencies
+            pool_size: connections kept open to the site
+            policy: RetryPolicy for timeouts, retries and throttling
+            adapter: SiteAdapter with the site's URLs and page layout, work.ua by default
+        """
+        self.timeout = timeout
+        self.adapter = adapter or WorkUaAdapter()
+        self.policy = policy or RetryPolicy(latency=LatencyTracker(initial=timeout))
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        http_adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', http_adapter)
+        self.session.mount('https://', http_adapter)
+
+    def close(self):
+        self.session.close()
+
+    def fetch(self, url: str, params: Optional[Dict] = None, attempts: Optional[int] = None) -> str:
+        """Download a page and return its HTML, retrying transient errors as the policy says"""
+        def attempt(timeout: float) -> str:
+            response = self.session.get(url, params=params, timeout=timeout)
+            if response.status_code in self.THROTTLE_STATUSES:
+                raise ThrottledError(f"{response.status_code} from {url}", retry_after(response))
+            if response.status_code >= 500:
+                raise TransientHTTPError(f"{response.status_code} from {url}", response=response)
+            if response.status_code == 404:
+                raise PageNotFoundError(f"404 from {url}", response=response)
+            response.raise_for_status()
+            return response.text
+
+        return self.policy.call(attempt, retry_on=self.RETRY_ON, attempts=attempts)
+
+    def fetch_tree(self, url: str, params: Optional[Dict] = None, attempts: Optional[int] = None):
+        """Download a page and return the parsed lxml tree"""
+        # Links are left relative, as the specs match on href prefixes; extract_from_tree resolves urls
+        return lxml_html.fromstring(self.fetch(url, params=params, attempts=attempts))
+
+    def get_categories(self) -> List[Dict[str, str]]:
+        """Get all available resume categories"""
+        base_url = self.adapter.base_url
+        categories = extract_from_tree(self.fetch_tree(base_url), {'categories': self.adapter.category_spec},
+                                       base_url)['categories']
+        return self.adapter.categories_from(categories)
+
+    def get_results_page(self, url: str) -> Tuple[List[ListingRow], Optional[str]]:
+        """Get listing rows and the next page url (None on the last page) from a results page"""
+        page = extract_from_tree(self.fetch_tree(url), self.adapter.results_page_specs, url)
+        return self.adapter.listing_rows(page)
+
+    def get_resume(self, url: str) -> Optional[ResumeData]:
+        """
+        Fetch a single resume page and extract its data.
+
+        Makes one attempt and returns None on failure; SiteParser re-queues
+        failed resumes itself, so they do not hold up the rest of the page.
+        """
+        try:
+            tree = self.fetch_tree(url, attempts=1)
+            fields = extract_from_tree(tree, {'resume': self.adapter.detail_spec}, url)['resume'][0]
+            return self.adapter.resume_from_detail(fields, url)
+        except Exception as e:
+            logging.error(f"Error parsing resume at {url}: {str(e)}")
+            return None
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+import logging
+import threading
+import uuid
+
+
+class JobLimitError(Exception):
+    """Raised when a user already runs the maximum number of jobs"""
+
+
+@dataclass
+class Job:
+    """Background search job"""
+    id: str
+    chat_id: int
+    status: str = 'queued'  # queued, running, done, failed, cancelled
+    progress: int = 0
+    _cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+
+class JobScheduler:
+    """
+    Runs long searches on a fixed pool of executors so the polling loop stays responsive.
+
+    Jobs are cooperative: the job function receives its Job and is expected
+    to check `job.cancelled` between units of work and update `job.progress`.
+    """
+
+    def __init__(self, executors: int = 4, per_user_limit: int = 1):
+        self.per_user_limit = per_user_limit
+        self._executor = ThreadPoolExecutor(max_workers=executors, thread_name_prefix='search')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, chat_id: int, func: Callable[[Job], None]) -> Job:
+        """Queue func(job) for the chat, raising JobLimitError if it is at its cap"""
+        with self._lock:
+            if len(self.active_jobs(chat_id)) >= self.per_user_limit:
+                raise JobLimitError(f"Chat {chat_id} already runs {self.per_user_limit} job(s)")
+            job = Job(id=uuid.uuid4().hex[:8], chat_id=chat_id)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], None]):
+        if job.cancelled:
+            job.status = 'cancelled'
+            self._forget(job)
+            return
+
+        job.status = 'running'
+        try:
+            func(job)
+            job.status = 'cancelled' if job.cancelled else 'done'
+        except Exception as e:
+            job.status = 'failed'
+            logging.error(f"Job {job.id} failed: {str(e)}")
+        finally:
+            self._forget(job)
+
+    def _forget(self, job: Job):
+        with self._lock:
+            self._jobs.pop(job.id, None)
+
+    def active_jobs(self, chat_id: int) -> List[Job]:
+        """Queued and running jobs of a chat"""
+        return [job for job in self._jobs.values() if job.chat_id == chat_id and not job.finished]
+
+    def cancel(self, chat_id: int) -> List[Job]:
+        """Ask every active job of the chat to stop; returns the affected jobs"""
+        with self._lock:
+            jobs = self.active_jobs(chat_id)
+        for job in jobs:
+            job.cancel()
+        return jobs
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=True)
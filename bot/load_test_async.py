@@ -0,0 +1,123 @@
+"""
+Load test for the async bot: a simulated Telegram update stream against the local fixture site.
+
+Every simulated recruiter walks the whole conversation (/start, site,
+specialty, city, category, apply) and the test waits until all searches
+have delivered their results. Outgoing Telegram calls are recorded instead
+of being sent.
+
+Usage:
+    python load_test_async.py --users 50 --pages 3 --latency 0.05
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+
+from telebot import types
+
+from async_bot import create_bot
+from async_parser import AsyncWorkUaParser
+from fixture_site import FixtureSite
+from work_au_parser import WorkUaAdapter
+
+FINAL_MESSAGES = ("Пошук завершено", "Не знайдено резюме", "Відбулася помилка", "Пошук скасовано")
+
+CONVERSATION = ["/start", "work.ua", "Python developer", "Київ", "1", "Застосувати фільтри"]
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> types.Update:
+    return types.Update.de_json({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Recruiter'},
+            'text': text,
+        },
+    })
+
+
+class Recorder:
+    """Stands in for the Telegram API: remembers what the bot sent and when"""
+
+    def __init__(self):
+        self.messages: Dict[int, List[str]] = {}
+        self.finished_at: Dict[int, float] = {}
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.messages.setdefault(chat_id, []).append(text)
+        if text.startswith(FINAL_MESSAGES):
+            self.finished_at[chat_id] = time.monotonic()
+            if len(self.finished_at) >= self.expected:
+                self.done.set()
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs):
+        pass
+
+
+async def run(users: int, site: FixtureSite, workers: int, max_pages: int, timeout: float) -> dict:
+    adapter_class = type('FixtureAdapter', (WorkUaAdapter,), {'base_url': site.category_url})
+    parser_class = type('FixtureParser', (AsyncWorkUaParser,), {'ADAPTER': adapter_class})
+    bot = create_bot("0:load-test", parser_class=parser_class, max_searches=users,
+                     workers=workers, max_pages=max_pages, requests_per_second=0)
+    recorder = Recorder()
+    recorder.expected = users
+    bot.send_message = recorder.send_message
+    bot.edit_message_text = recorder.edit_message_text
+
+    update_ids = itertools.count(1)
+    applied_at: Dict[int, float] = {}
+
+    async def recruiter(chat_id: int):
+        for text in CONVERSATION:
+            if text == "Застосувати фільтри":
+                applied_at[chat_id] = time.monotonic()
+            await bot.process_new_updates([make_update(next(update_ids), chat_id, text)])
+
+    started = time.monotonic()
+    await asyncio.gather(*(recruiter(chat_id) for chat_id in range(1, users + 1)))
+    try:
+        await asyncio.wait_for(recorder.done.wait(), timeout)
+    finally:
+        elapsed = time.monotonic() - started
+        await bot.close_searches()
+
+    latencies = [recorder.finished_at[c] - applied_at[c] for c in recorder.finished_at if c in applied_at]
+    links = sum(
+        text.count("\n") for chat in recorder.messages.values() for text in chat if text.startswith("Посилання:")
+    )
+    return {
+        'users': users,
+        'finished_searches': len(recorder.finished_at),
+        'wall_seconds': elapsed,
+        'searches_per_second': len(recorder.finished_at) / elapsed if elapsed else 0.0,
+        'search_latency_p50': statistics.median(latencies) if latencies else None,
+        'search_latency_max': max(latencies) if latencies else None,
+        'resumes_delivered': links,
+        'telegram_messages': sum(len(chat) for chat in recorder.messages.values()),
+        'site_requests': site.requests,
+    }
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--users', type=int, default=50)
+    arg_parser.add_argument('--pages', type=int, default=3)
+    arg_parser.add_argument('--resumes-per-page', type=int, default=14)
+    arg_parser.add_argument('--latency', type=float, default=0.05)
+    arg_parser.add_argument('--incomplete-every', type=int, default=5)
+    arg_parser.add_argument('--workers', type=int, default=4)
+    arg_parser.add_argument('--timeout', type=float, default=300)
+    args = arg_parser.parse_args()
+
+    with FixtureSite(pages=args.pages, resumes_per_page=args.resumes_per_page, latency=args.latency,
+                     incomplete_every=args.incomplete_every) as fixture_site:
+        report = asyncio.run(run(args.users, fixture_site, args.workers, args.pages, args.timeout))
+    print(json.dumps(report, indent=2))
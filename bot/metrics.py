@@ -0,0 +1,233 @@
+"""
+Scraping instrumentation: per-stage spans, counters and gauges.
+
+Every search records into its own SearchMetrics, which also feeds the
+process-wide registry exported in Prometheus text format by MetricsServer.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+import threading
+import time
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+JS_HEAP_JS = "return performance.memory ? performance.memory.usedJSHeapSize : null;"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def driver_rss(driver) -> Optional[int]:
+    """
+    Resident memory of a local driver's chromedriver and the Chrome processes it started, in bytes.
+
+    None without psutil (pip install psutil) or for a remote driver, whose processes run elsewhere.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is None:
+        return None
+    try:
+        root = psutil.Process(process.pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+
+    rss = 0
+    for child in processes:
+        try:
+            rss += child.memory_info().rss
+        except psutil.Error:
+            # Chrome starts and ends renderer processes all the time
+            pass
+    return rss
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe process-wide counters, gauges and duration histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        self._gauges: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        # name -> labels -> [bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = defaultdict(dict)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[name][_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms[name]
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(DURATION_BUCKETS) + 2)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in sorted(series.items()))
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in sorted(series.items()))
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in sorted(series.items()):
+                    for bound, count in zip(DURATION_BUCKETS, state):
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {state[-1]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {state[-2]}")
+                    lines.append(f"{name}_count{_format_labels(key)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class SearchMetrics:
+    """
+    Spans and counters of one search, mirrored into a MetricsRegistry.
+
+    Span durations go to the `parser_stage_seconds` histogram labelled by
+    stage, counters to `parser_<name>_total` and gauges to `parser_<name>`.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or REGISTRY
+        self.started = time.monotonic()
+        self.spans: Dict[str, List[float]] = {}  # stage -> [count, total seconds, max seconds]
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a stage; an exception escaping it is counted as an error of that stage"""
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.count('errors', stage=stage)
+            raise
+        finally:
+            self.record(stage, time.monotonic() - started)
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            span = self.spans.setdefault(stage, [0, 0.0, 0.0])
+            span[0] += 1
+            span[1] += seconds
+            span[2] = max(span[2], seconds)
+        self.registry.observe('parser_stage_seconds', seconds, stage=stage)
+
+    def count(self, name: str, amount: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+        self.registry.inc(f'parser_{name}_total', amount, **labels)
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+        self.registry.set_gauge(f'parser_{name}', value)
+
+    def sample_driver_memory(self, driver):
+        """
+        Record the memory of the driver's process tree and the JS heap of its current page.
+
+        Either is skipped when it cannot be read, see driver_rss and JS_HEAP_JS.
+        """
+        rss = driver_rss(driver)
+        if rss is not None:
+            self.gauge('driver_rss_bytes', rss)
+
+        try:
+            heap = driver.execute_script(JS_HEAP_JS)
+        except Exception:
+            return
+        if heap is not None:
+            self.gauge('driver_js_heap_bytes', heap)
+
+    def summary(self) -> str:
+        """Plain-text report of where the search spent its time"""
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda item: -item[1][1])
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+
+        lines = [f"Total: {time.monotonic() - self.started:.2f} s"]
+        lines.extend(
+            f"{stage}: {count}x, {total:.2f} s (max {longest:.2f} s)"
+            for stage, (count, total, longest) in spans
+        )
+        for (name, labels), value in counters:
+            label_text = ", ".join(f"{key}={label}" for key, label in labels)
+            lines.append(f"{name}{f' [{label_text}]' if label_text else ''}: {value:g}")
+        lines.extend(f"{name}: {value:,.2f}" for name, value in gauges)
+        return "\n".join(lines)
+
+
+class MetricsServer:
+    """Serves the registry as Prometheus text at /metrics from a background thread"""
+
+    def __init__(self, port: int, host: str = '127.0.0.1', registry: Optional[MetricsRegistry] = None):
+        registry = registry or REGISTRY
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                data = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
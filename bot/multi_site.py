@@ -0,0 +1,129 @@
+from typing import Callable, Dict, Iterator, List, Optional, Type
+import logging
+import queue
+import threading
+
+from site_adapter import SiteAdapter
+from work_au_parser import ResumeData, SiteParser, WorkUaAdapter, url_hash
+
+# Sites a search can run on; a new site adds its adapter here
+SITE_ADAPTERS: Dict[str, Type[SiteAdapter]] = {
+    WorkUaAdapter.name: WorkUaAdapter,
+}
+
+
+class MultiSiteSearch:
+    """
+    Runs one search on several sites in parallel and merges their results.
+
+    Each site gets its own SiteParser in its own thread, and resumes are
+    yielded as soon as any site produces them, so a slow site does not hold
+    up the others. A resume URL reached twice is yielded once. A site that
+    fails is logged and the rest carry on; the search fails only when every
+    site failed. Closing the generator stops every site's crawl.
+
+    The first site is the primary one: the search's category number refers
+    to its category list, and the other sites search the category of the
+    same name in their own lists.
+
+    Args:
+        parsers: site name -> callable returning a new SiteParser for it, in priority order
+        primary_categories: CategoryIndex of the primary site, to look category names up
+        queue_size: resumes buffered between the sites and the consumer
+    """
+
+    def __init__(self, parsers: Dict[str, Callable[[], SiteParser]], primary_categories=None,
+                 queue_size: int = 100):
+        if not parsers:
+            raise ValueError("No sites to search")
+        self.parsers = parsers
+        self.primary_categories = primary_categories
+        self.queue_size = queue_size
+
+    def _category_name(self, index: int) -> Optional[str]:
+        if self.primary_categories is None:
+            return None
+        categories = self.primary_categories.categories()
+        return categories[index - 1]["name"] if 1 <= index <= len(categories) else None
+
+    def stream(self, search) -> Iterator[ResumeData]:
+        """Yield the resumes every site finds for a SearchSession"""
+        sites = list(self.parsers)
+        category_name = self._category_name(search.category)
+        results: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        for position, site in enumerate(sites):
+            # The primary site selects by number, the others by name
+            by_name = category_name if position > 0 else None
+            threading.Thread(
+                target=self._crawl, args=(site, search, by_name, results, stop),
+                name=f'crawl-{site}', daemon=True
+            ).start()
+
+        remaining = len(sites)
+        errors: Dict[str, Exception] = {}
+        seen = set()
+        try:
+            while remaining:
+                site, item = results.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    errors[site] = item
+                else:
+                    h = url_hash(item.url)
+                    if h not in seen:
+                        seen.add(h)
+                        yield item
+        finally:
+            stop.set()
+
+        if len(errors) == len(sites):
+            raise RuntimeError("; ".join(f"{site}: {error}" for site, error in errors.items()))
+
+    def _crawl(self, site: str, search, category_name: Optional[str], results: queue.Queue,
+               stop: threading.Event):
+        """Run the search on one site, putting its resumes, then any error, then None on the queue"""
+        try:
+            with self.parsers[site]() as parser:
+                if category_name is not None:
+                    parser.select_category_by_name(category_name)
+                else:
+                    parser.select_category(search.category)
+                parser.choose_profession(search.specialty)
+                parser.choose_location(search.location)
+                parser.apply_filters(search.filters)
+
+                resumes = parser.get_resumes_from_pages()
+                try:
+                    for resume in resumes:
+                        if not self._put(results, (site, resume), stop):
+                            return
+                finally:
+                    resumes.close()
+        except Exception as e:
+            logging.error(f"Search on {site} failed: {str(e)}")
+            self._put(results, (site, e), stop)
+        finally:
+            self._put(results, (site, None), stop)
+
+    @staticmethod
+    def _put(results: queue.Queue, item, stop: threading.Event) -> bool:
+        """Put an item on the queue unless the consumer has stopped; False if it has"""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+def parse_sites(value: str) -> List[str]:
+    """Parse a comma-separated list of site names, rejecting unknown ones"""
+    sites = [site.strip() for site in value.split(',') if site.strip()]
+    unknown = [site for site in sites if site not in SITE_ADAPTERS]
+    if unknown or not sites:
+        raise ValueError(f"Unknown sites {unknown}, expected some of {list(SITE_ADAPTERS)}")
+    return sites
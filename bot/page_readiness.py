@@ -0,0 +1,59 @@
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Region whose changes mean the results were updated; the first selector that matches wins
+RESULTS_REGION_SELECTORS = ["#pjax-resume-list", "#pjax", "main", "body"]
+
+# Puts a MutationObserver on the results region. The marker lives on `window`,
+# so a full page load wipes it, which also counts as an update
+ARM_JS = """
+const region = arguments[0].map(selector => document.querySelector(selector)).find(Boolean);
+if (window.__pageUpdate) window.__pageUpdate.observer.disconnect();
+const marker = {changed: false, last: 0, observer: null};
+marker.observer = new MutationObserver(() => {
+    marker.changed = true;
+    marker.last = performance.now();
+});
+marker.observer.observe(region, {childList: true, subtree: true, attributes: true});
+window.__pageUpdate = marker;
+"""
+
+# Ready when the page was replaced, or the region changed and has been quiet
+# for arguments[0] ms and no loading overlay is shown
+CHECK_JS = """
+const marker = window.__pageUpdate;
+if (!marker) return document.readyState !== 'loading';
+if (!marker.changed || performance.now() - marker.last < arguments[0]) return false;
+return !document.querySelector('.loading-overlay');
+"""
+
+
+class PageUpdateWatcher:
+    """
+    Detects that a filter action updated the results without serializing the DOM.
+
+    Call arm() before the action and wait() after it. Each poll is a tiny
+    script returning a boolean instead of the whole page_source.
+    """
+
+    def __init__(self, driver, timeout: float, quiet_ms: int = 200, poll_frequency: float = 0.1):
+        self.driver = driver
+        self.timeout = timeout
+        self.quiet_ms = quiet_ms
+        self.poll_frequency = poll_frequency
+
+    def arm(self):
+        self.driver.execute_script(ARM_JS, RESULTS_REGION_SELECTORS)
+
+    def _ready(self, driver) -> bool:
+        try:
+            return bool(driver.execute_script(CHECK_JS, self.quiet_ms))
+        except WebDriverException:
+            # The document is being replaced; poll again once it is there
+            return False
+
+    def wait(self):
+        """Block until the results region changed and settled; raises TimeoutException otherwise"""
+        WebDriverWait(self.driver, self.timeout, poll_frequency=self.poll_frequency).until(self._ready)
+
@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import json
+import threading
+import time
+
+from resume_index import ResumeIndex
+from work_au_parser import ResumeData
+
+
+def normalize_query(category: Optional[int], specialty: str, location: str, filters: Dict) -> str:
+    """Canonical key of a search: stripped lower-case text, sorted deduplicated filter lists"""
+    normalized_filters = {}
+    for group, value in filters.items():
+        if isinstance(value, dict):
+            value = {k: v for k, v in value.items() if v not in (None, '', False)}
+        elif isinstance(value, (list, tuple, set)):
+            value = sorted(set(value))
+        if value:
+            normalized_filters[group] = value
+
+    return json.dumps(
+        [category, specialty.strip().lower(), location.strip().lower(), normalized_filters],
+        sort_keys=True, ensure_ascii=False
+    )
+
+
+class _Flight:
+    """Search currently being scraped, shared by every identical request"""
+
+    def __init__(self):
+        self.results: List[ResumeData] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = threading.Condition()
+        # Requests still reading the results; the scrape stops once there are none
+        self.consumers = 0
+        self.abandoned = threading.Event()
+
+
+class QueryCache:
+    """
+    Memoizes search results by normalized query.
+
+    Results are kept for `ttl` seconds, at most `max_entries` queries (least
+    recently used first out). Identical searches that arrive while one is
+    running don't start their own scrape: they follow the running one and
+    receive its results as they are produced.
+
+    The scrape runs on its own thread, so any request can stop reading
+    without failing the others; it is stopped only once every request
+    following it has stopped.
+    """
+
+    # Seconds between checks of a request's cancelled() while no results arrive
+    CANCEL_CHECK_INTERVAL = 0.5
+
+    def __init__(self, ttl: float = 600, max_entries: int = 100):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[ResumeData]]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._indexes: Dict[str, ResumeIndex] = {}
+        self._lock = threading.Lock()
+
+    def _get_fresh(self, key: str) -> Optional[List[ResumeData]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored, results = entry
+        if time.monotonic() - stored > self.ttl:
+            del self._entries[key]
+            self._indexes.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    def _store(self, key: str, results: List[ResumeData]):
+        self._entries[key] = (time.monotonic(), results)
+        self._entries.move_to_end(key)
+        self._indexes.pop(key, None)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._indexes.pop(evicted, None)
+
+    def index(self, key: str) -> Optional[ResumeIndex]:
+        """Index over the cached results of a finished search, built on first use; None if not cached"""
+        with self._lock:
+            results = self._get_fresh(key)
+            if results is None:
+                return None
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = ResumeIndex(results)
+            return index
+
+    def stream(self, key: str, produce: Callable[[Callable[[], bool]], Iterator[ResumeData]],
+               cancelled: Optional[Callable[[], bool]] = None) -> Iterator[ResumeData]:
+        """
+        Yield the results for key: from the cache, from a running identical search, or from a new one.
+
+        Args:
+            key: normalized query
+            produce: starts the scrape; called with a function that turns true once nobody reads the results
+            cancelled: checked while waiting for results, to stop reading even if none arrive
+        """
+        with self._lock:
+            cached = self._get_fresh(key)
+            if cached is not None:
+                self.hits += 1
+            else:
+                flight = self._flights.get(key)
+                if flight is None or flight.abandoned.is_set():
+                    self.misses += 1
+                    flight = self._flights[key] = _Flight()
+                    threading.Thread(target=self._run, args=(key, flight, produce),
+                                     name='query-flight', daemon=True).start()
+                else:
+                    self.shared += 1
+                flight.consumers += 1
+
+        if cached is not None:
+            yield from cached
+        else:
+            yield from self._follow(flight, cancelled)
+
+    def _run(self, key: str, flight: _Flight, produce: Callable[[Callable[[], bool]], Iterator[ResumeData]]):
+        """Scrape on the flight's thread, until the results end or nobody reads them any more"""
+        completed = False
+        results = None
+        try:
+            results = produce(flight.abandoned.is_set)
+            for resume in results:
+                if flight.abandoned.is_set():
+                    break
+                with flight.condition:
+                    flight.results.append(resume)
+                    flight.condition.notify_all()
+            else:
+                completed = True
+        except Exception as e:
+            flight.error = e
+        finally:
+            # Stop the scrape (and release its browser) as soon as it is abandoned
+            close = getattr(results, 'close', None)
+            if close is not None:
+                close()
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if completed:
+                    self._store(key, flight.results)
+            with flight.condition:
+                if not completed and flight.error is None:
+                    flight.error = RuntimeError("Identical search was stopped before it finished")
+                flight.done = True
+                flight.condition.notify_all()
+
+    def _follow(self, flight: _Flight, cancelled: Optional[Callable[[], bool]]):
+        position = 0
+        try:
+            while True:
+                with flight.condition:
+                    while position >= len(flight.results) and not flight.done:
+                        if cancelled is not None and cancelled():
+                            return
+                        flight.condition.wait(self.CANCEL_CHECK_INTERVAL)
+                    batch = flight.results[position:]
+                    done, error = flight.done, flight.error
+                position += len(batch)
+                yield from batch
+
+                if done and position >= len(flight.results):
+                    if error is not None:
+                        # Every reader gets its own exception; the scrape's error is their cause
+                        raise RuntimeError(str(error)) from error
+                    return
+        finally:
+            with self._lock:
+                flight.consumers -= 1
+                if flight.consumers == 0 and not flight.done:
+                    flight.abandoned.set()
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+import threading
+import time
+
+from resume_cache import CacheStatsMixin
+from work_au_parser import ResumeData, normalize_date, url_hash
+
+
+class ResumeStore(CacheStatsMixin):
+    """
+    In-memory store of parsed resumes shared between searches, keyed by 64-bit URL hash.
+
+    Has the get/put/record_fetch/stats interface of ResumeCache, so a parser
+    can use it as its resume_cache when no SQLite cache is configured. Like
+    there, a resume is served while it is younger than `ttl` seconds and its
+    update date matches the listing's. The least recently used resumes are
+    evicted above `max_entries`.
+    """
+
+    def __init__(self, ttl: float = 7 * 24 * 3600, max_entries: int = 50000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._init_stats()
+        # Each resume with the time it was stored
+        self._resumes: "OrderedDict[int, Tuple[ResumeData, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._resumes)
+
+    def __contains__(self, url: str) -> bool:
+        entry = self._resumes.get(url_hash(url))
+        return entry is not None and self._is_fresh(entry)
+
+    def __iter__(self) -> Iterator[ResumeData]:
+        with self._lock:
+            return iter([resume for resume, stored in self._resumes.values() if self._is_fresh((resume, stored))])
+
+    def _is_fresh(self, entry: Tuple[ResumeData, float]) -> bool:
+        return time.monotonic() - entry[1] <= self.ttl
+
+    def get(self, url: str, update_date: Optional[str] = None) -> Optional[ResumeData]:
+        """Return the stored resume if it is still fresh"""
+        key = url_hash(url)
+        with self._lock:
+            entry = self._resumes.get(key)
+            if entry is not None and not self._is_fresh(entry):
+                del self._resumes[key]
+                entry = None
+            if entry is None or (update_date is not None and normalize_date(update_date) != entry[0].update_date):
+                self.misses += 1
+                return None
+            self._resumes.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, resume: ResumeData) -> bool:
+        """Store a resume; returns False if a fresh one with the same URL was already stored"""
+        key = url_hash(resume.url)
+        with self._lock:
+            previous = self._resumes.get(key)
+            is_new = previous is None or not self._is_fresh(previous)
+            self._resumes[key] = (resume, time.monotonic())
+            self._resumes.move_to_end(key)
+            while len(self._resumes) > self.max_entries:
+                self._resumes.popitem(last=False)
+        return is_new
@@ -0,0 +1,109 @@
+from typing import Dict, Optional
+import json
+import sqlite3
+import threading
+import time
+
+from work_au_parser import ResumeData, normalize_date
+
+
+class CacheStatsMixin:
+    """
+    Hit/miss counters shared by ResumeCache and ResumeStore.
+
+    The parser reports how long uncached detail fetches took through
+    record_fetch, which stats() turns into the time the hits saved.
+    """
+
+    def _init_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.fetch_seconds = 0.0
+        self.fetches = 0
+
+    def record_fetch(self, seconds: float, count: int):
+        """Record how long uncached detail fetches took, to estimate the time hits save"""
+        self.fetch_seconds += seconds
+        self.fetches += count
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and the estimated detail fetch time saved by hits"""
+        average_fetch = self.fetch_seconds / self.fetches if self.fetches else 0.0
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'saved_seconds': self.hits * average_fetch,
+        }
+
+
+class ResumeCache(CacheStatsMixin):
+    """
+    On-disk cache of parsed resumes keyed by URL.
+
+    An entry is fresh while it is younger than `ttl` seconds and, when the
+    listing shows the resume's update date, while that date still matches.
+    The least recently used entries are evicted above `max_entries`.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._init_stats()
+        self._puts = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            "url TEXT PRIMARY KEY, update_date TEXT, data TEXT NOT NULL, "
+            "stored REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS resumes_accessed ON resumes (accessed)")
+        self._conn.commit()
+
+    def get(self, url: str, update_date: Optional[str] = None) -> Optional[ResumeData]:
+        """Return the cached resume if it is still fresh"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT update_date, data, stored FROM resumes WHERE url = ?", (url,)
+            ).fetchone()
+
+            if (row is None or now - row[2] > self.ttl
+                    or (update_date is not None and normalize_date(update_date) != row[0])):
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE resumes SET accessed = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+            self.hits += 1
+
+        return ResumeData(**json.loads(row[1]))
+
+    def put(self, resume: ResumeData):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resumes (url, update_date, data, stored, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (resume.url, resume.update_date, json.dumps(resume.to_dict(), ensure_ascii=False), now, now)
+            )
+            self._puts += 1
+            # Counting rows is a table scan, so only check the size periodically
+            if self._puts % 100 == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (size,) = self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()
+        if size > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM resumes WHERE url IN "
+                "(SELECT url FROM resumes ORDER BY accessed LIMIT ?)",
+                (size - self.max_entries,)
+            )
+
+    def close(self):
+        self._conn.close()
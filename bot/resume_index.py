@@ -0,0 +1,110 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set
+import re
+import time
+
+from work_au_parser import ResumeData
+
+WORD_RE = re.compile(r"\w+")
+DAY = 24 * 3600
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return WORD_RE.findall(text.lower()) if text else []
+
+
+def parse_refinement(text: str) -> Dict:
+    """
+    Parse refine arguments like 'від 30000 до 50000 днів 7 python django'.
+
+    'від'/'до' bound the salary, 'днів' keeps resumes updated within that many
+    days, and every other word has to appear in the specialization. Raises
+    ValueError when a keyword is not followed by a number.
+    """
+    query = {'salary_from': None, 'salary_to': None, 'updated_since': None, 'words': []}
+    keywords = {'від': 'salary_from', 'до': 'salary_to', 'днів': 'days'}
+    words = text.split()
+    position = 0
+    while position < len(words):
+        word = words[position].lower()
+        position += 1
+        if word not in keywords:
+            query['words'].append(word)
+            continue
+        if position == len(words) or not words[position].isdigit():
+            raise ValueError(f"'{word}' has to be followed by a number")
+        value = int(words[position])
+        position += 1
+        if keywords[word] == 'days':
+            query['updated_since'] = int(time.time()) - value * DAY
+        else:
+            query[keywords[word]] = value
+    return query
+
+
+class ResumeIndex:
+    """
+    Read-only index over the results of one search, for refining them without the site.
+
+    Resumes are ordered by update date, newest first, which is also the
+    ranking, so a date filter is a prefix of that order. Expected salaries
+    (the lower bound of a range) are kept sorted for range lookups, and the
+    words of specializations map to the resumes they appear in.
+    """
+
+    def __init__(self, resumes: Iterable[ResumeData]):
+        unique: Dict[str, ResumeData] = {}
+        for resume in resumes:
+            unique.setdefault(resume.url, resume)
+        # Resumes without a parsed date go last
+        self._resumes: List[ResumeData] = sorted(
+            unique.values(), key=lambda r: -r.updated if r.updated is not None else float('inf')
+        )
+        self._date_keys = [-r.updated if r.updated is not None else float('inf') for r in self._resumes]
+
+        salaries = sorted(
+            (self._salary(resume), position) for position, resume in enumerate(self._resumes)
+            if self._salary(resume) is not None
+        )
+        self._salary_keys = [salary for salary, _ in salaries]
+        self._salary_positions = [position for _, position in salaries]
+
+        self._tokens: Dict[str, Set[int]] = {}
+        for position, resume in enumerate(self._resumes):
+            for token in tokenize(resume.specialization):
+                self._tokens.setdefault(token, set()).add(position)
+
+    def __len__(self) -> int:
+        return len(self._resumes)
+
+    @staticmethod
+    def _salary(resume: ResumeData) -> Optional[int]:
+        return resume.salary_from if resume.salary_from is not None else resume.salary_to
+
+    def search(self, salary_from: Optional[int] = None, salary_to: Optional[int] = None,
+               updated_since: Optional[int] = None, words: Iterable[str] = (),
+               limit: Optional[int] = None) -> List[ResumeData]:
+        """
+        Resumes matching every given condition, freshest first.
+
+        Args:
+            salary_from, salary_to: inclusive bounds of the expected salary; resumes without one are left out
+            updated_since: Unix timestamp the resume has to be updated at or after
+            words: words that all have to appear in the specialization
+            limit: return at most this many resumes
+        """
+        candidates: Optional[Set[int]] = None
+        for token in tokenize(" ".join(words)):
+            matched = self._tokens.get(token, set())
+            candidates = matched if candidates is None else candidates & matched
+
+        if salary_from is not None or salary_to is not None:
+            start = bisect_left(self._salary_keys, salary_from) if salary_from is not None else 0
+            end = bisect_right(self._salary_keys, salary_to) if salary_to is not None else len(self._salary_keys)
+            matched = set(self._salary_positions[start:end])
+            candidates = matched if candidates is None else candidates & matched
+
+        end = bisect_right(self._date_keys, -updated_since) if updated_since is not None else len(self._resumes)
+        # Positions follow the freshness order, so sorting the candidates ranks them
+        positions = range(end) if candidates is None else [p for p in sorted(candidates) if p < end]
+        return [self._resumes[position] for position in positions[:limit]]
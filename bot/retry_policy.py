@@ -0,0 +1,173 @@
+from collections import deque
+from typing import Callable, Optional, Tuple, Type, TypeVar
+import logging
+import random
+import threading
+import time
+
+
+R = TypeVar('R')
+
+
+class ThrottledError(Exception):
+    """The site answered with a throttling status (429 or 503)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LatencyTracker:
+    """
+    Derives a timeout from recently observed latencies.
+
+    The timeout is `multiplier` times the `percentile` of the last `window`
+    samples, clamped to [min_timeout, max_timeout]; until `min_samples` are
+    collected the `initial` timeout is used. Timed-out attempts are recorded
+    too, so a slowing site raises the timeout instead of failing repeatedly.
+    """
+
+    def __init__(self, initial: float = 10.0, min_timeout: float = 2.0, max_timeout: float = 30.0,
+                 percentile: float = 0.95, multiplier: float = 2.0, window: int = 200, min_samples: int = 20):
+        self.initial = initial
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+
+    def timeout(self) -> float:
+        latency = self.quantile()
+        if latency is None:
+            return self.initial
+        return min(self.max_timeout, max(self.min_timeout, latency * self.multiplier))
+
+
+class CircuitBreaker:
+    """
+    Pauses all requests while the site is throttling or failing.
+
+    After `failure_threshold` consecutive failures, or on a throttling
+    response, the breaker opens and wait() blocks callers for `reset_timeout`
+    seconds (or the site's Retry-After). The next request then probes the
+    site: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.trips = 0
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    def wait(self):
+        """Block while the breaker is open"""
+        while True:
+            with self._lock:
+                delay = self._open_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._open(self.reset_timeout)
+
+    def trip(self, duration: Optional[float] = None):
+        """Open the breaker right away, e.g. on a 429 response"""
+        with self._lock:
+            self._open(duration or self.reset_timeout)
+
+    def _open(self, duration: float):
+        until = time.monotonic() + duration
+        if until > self._open_until:
+            self._open_until = until
+            self.trips += 1
+            logging.warning(f"Circuit breaker open for {duration:.1f} s")
+        self._failures = 0
+
+
+class RetryPolicy:
+    """
+    Adaptive timeouts, exponential backoff with full jitter and a circuit breaker.
+
+    Args:
+        max_attempts: attempts per call, and how many times a failed resume is re-queued
+        base_delay: backoff before the second attempt; doubles with every attempt
+        max_delay: upper bound of a single backoff
+        latency: LatencyTracker the timeouts come from
+        breaker: CircuitBreaker shared by every request to the site
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 latency: Optional[LatencyTracker] = None, breaker: Optional[CircuitBreaker] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.latency = latency or LatencyTracker()
+        self.breaker = breaker or CircuitBreaker()
+
+    def timeout(self) -> float:
+        return self.latency.timeout()
+
+    def backoff(self, attempt: int) -> float:
+        """Delay after the given (0-based) failed attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def record_success(self, seconds: float):
+        self.latency.record(seconds)
+        self.breaker.record_success()
+
+    def record_failure(self, seconds: float):
+        self.latency.record(seconds)
+        self.breaker.record_failure()
+
+    def call(self, func: Callable[[float], R], retry_on: Tuple[Type[Exception], ...] = (Exception,),
+             attempts: Optional[int] = None) -> R:
+        """
+        Call func(timeout) until it succeeds, re-raising the last error when out of attempts.
+
+        ThrottledError trips the breaker instead of counting as a plain failure.
+        """
+        attempts = attempts or self.max_attempts
+        for attempt in range(attempts):
+            self.breaker.wait()
+            started = time.monotonic()
+            try:
+                result = func(self.timeout())
+            except ThrottledError as e:
+                self.breaker.trip(e.retry_after)
+                if attempt + 1 == attempts:
+                    raise
+            except retry_on:
+                self.record_failure(time.monotonic() - started)
+                if attempt + 1 == attempts:
+                    raise
+            else:
+                self.record_success(time.monotonic() - started)
+                return result
+            time.sleep(self.backoff(attempt))
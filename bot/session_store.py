@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Optional
+import json
+import sqlite3
+import threading
+import time
+
+
+def empty_filters() -> Dict:
+    return {
+        'search_params': [],
+        'employment': [],
+        'age': {},
+        'gender': [],
+        'salary': {},
+        'education': [],
+        'experience': []
+    }
+
+
+@dataclass
+class SearchSession:
+    """Search being built by one chat"""
+    specialty: str = ""
+    location: str = ""
+    category: Optional[int] = None
+    filters: Dict = field(default_factory=empty_filters)
+    # Query cache key of the chat's latest search, which /refine narrows down
+    last_query: Optional[str] = None
+
+    def add_filter(self, group: str, value: str):
+        """Add a value to a list filter, ignoring repeats"""
+        if value not in self.filters[group]:
+            self.filters[group].append(value)
+
+
+class MemorySessionStore:
+    """Per-chat sessions kept in process memory, evicted after `ttl` seconds of inactivity"""
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self._sessions: Dict[int, SearchSession] = {}
+        self._touched: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, chat_id: int) -> SearchSession:
+        """Return the chat's session, starting a new one if there is none"""
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(chat_id)
+            if session is None:
+                session = self._sessions[chat_id] = SearchSession()
+            self._touched[chat_id] = time.monotonic()
+            return session
+
+    def save(self, chat_id: int, session: SearchSession):
+        with self._lock:
+            self._sessions[chat_id] = session
+            self._touched[chat_id] = time.monotonic()
+
+    def reset(self, chat_id: int) -> SearchSession:
+        """Start a fresh search for the chat"""
+        session = SearchSession()
+        self.save(chat_id, session)
+        return session
+
+    def _evict_expired(self):
+        deadline = time.monotonic() - self.ttl
+        for chat_id in [c for c, touched in self._touched.items() if touched < deadline]:
+            del self._sessions[chat_id]
+            del self._touched[chat_id]
+
+
+class SqliteSessionStore:
+    """Per-chat sessions persisted in SQLite, so they survive bot restarts"""
+
+    def __init__(self, path: str, ttl: float = 3600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "chat_id INTEGER PRIMARY KEY, data TEXT NOT NULL, touched REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, chat_id: int) -> SearchSession:
+        """Return the chat's session, starting a new one if there is none"""
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE touched < ?", (time.time() - self.ttl,))
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+            self._conn.commit()
+
+        if row is None:
+            return self.reset(chat_id)
+        return SearchSession(**json.loads(row[0]))
+
+    def save(self, chat_id: int, session: SearchSession):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (chat_id, data, touched) VALUES (?, ?, ?)",
+                (chat_id, json.dumps(asdict(session), ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def reset(self, chat_id: int) -> SearchSession:
+        """Start a fresh search for the chat"""
+        session = SearchSession()
+        self.save(chat_id, session)
+        return session
+
+    def close(self):
+        self._conn.close()
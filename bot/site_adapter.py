@@ -0,0 +1,69 @@
+"""
+Site adapters: what the crawl engine (SiteParser) needs to know about one job site.
+
+An adapter says where the category list is, how a search is compiled into a
+URL, what to read from results and resume pages and how to turn that into
+listing rows and resumes. Page reads are ExtractionSpecs, so the same
+adapter works with both the selenium and the http engine. Driver pooling,
+concurrency, caching, retries and pagination stay in the engine.
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from extraction import ExtractionSpec
+
+if TYPE_CHECKING:
+    # work_au_parser imports this module, so its types are only imported for annotations
+    from work_au_parser import ListingRow, ResumeData
+
+
+class SiteAdapter:
+    """
+    Base class of site adapters; a new site sets these attributes and overrides the methods.
+
+    Attributes:
+        name: site name shown to users, e.g. 'work.ua'
+        base_url: page with the list of resume categories
+        all_resumes_url: search root used when no category applies
+        filter_schema: CheckboxFilter/SelectFilter specs per filter group, for the click filter mode
+        category_spec: reads categories (name, url) from base_url
+        results_page_specs: read together from every results page; handed to listing_rows
+        detail_spec: reads one resume page; its single row is handed to resume_from_detail
+        results_ready_xpath: element that is present once a results page has loaded
+        detail_ready_xpath: element that is present once a resume page has loaded
+        search_input_xpath, city_input_xpath: inputs typed into in the click filter mode
+    """
+
+    name = ""
+    base_url = ""
+    all_resumes_url = ""
+    filter_schema: Dict = {}
+    category_spec: Optional[ExtractionSpec] = None
+    results_page_specs: Dict[str, ExtractionSpec] = {}
+    detail_spec: Optional[ExtractionSpec] = None
+    results_ready_xpath = ""
+    detail_ready_xpath = ""
+    search_input_xpath = ""
+    city_input_xpath = ""
+
+    def search_url(self, category_url: Optional[str], profession: str, location: str, filters: Dict) -> str:
+        """Compile a search into the URL of its first results page"""
+        raise NotImplementedError
+
+    def listing_rows(self, page: Dict[str, List[Dict]]) -> Tuple[List["ListingRow"], Optional[str]]:
+        """Turn what results_page_specs read into listing rows and the next page url"""
+        raise NotImplementedError
+
+    def resume_from_detail(self, fields: Dict[str, Optional[str]], url: str) -> "ResumeData":
+        """Build a resume from the fields detail_spec read"""
+        raise NotImplementedError
+
+    def page_url(self, search_url: str, page: int) -> str:
+        """URL of the given (1-based) results page of a search"""
+        raise NotImplementedError
+
+    def categories_from(self, rows: List[Dict]) -> List[Dict]:
+        """Number the categories category_spec read, starting at 1"""
+        return [
+            {"name": row["name"], "url": row["url"], "index": idx + 1}
+            for idx, row in enumerate(rows)
+        ]
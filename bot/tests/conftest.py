@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Modules in bot/ import each other by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_site import FixtureSite
+from work_au_parser import ResumeData, WorkUaAdapter
+
+
+def resume(number: int, day: int = 1) -> ResumeData:
+    """Resume number `number` of work.ua, updated on May `day`, 2024"""
+    return ResumeData(f"2024-05-{day:02d} 10:00:00", f"Кандидат {number}", "Python developer", "20000 грн",
+                      f"https://www.work.ua/resumes/{number}/")
+
+
+class Bot:
+    """Stands in for TeleBot, keeping the text of every message sent"""
+
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.messages.append(text)
+
+
+class AsyncBot(Bot):
+    """Stands in for AsyncTeleBot"""
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.messages.append(text)
+
+
+def fixture_adapter_class(site: FixtureSite):
+    """WorkUaAdapter pointed at a FixtureSite"""
+    return type('FixtureAdapter', (WorkUaAdapter,), {'base_url': site.category_url})
+
+
+def fixture_adapter(site: FixtureSite) -> WorkUaAdapter:
+    return fixture_adapter_class(site)()
@@ -0,0 +1,46 @@
+import asyncio
+
+from async_parser import AsyncWorkUaParser
+from conftest import fixture_adapter_class
+from fixture_site import FixtureSite
+from result_store import ResumeStore
+from work_au_parser import ListingRow
+
+PAGES = 2
+RESUMES_PER_PAGE = 4
+
+
+def fixture_parser(site: FixtureSite):
+    return type('FixtureParser', (AsyncWorkUaParser,), {'ADAPTER': fixture_adapter_class(site)})
+
+
+async def crawl(parser_class, **options):
+    async with parser_class(**options) as parser:
+        await parser.select_category(1)
+        return [resume async for resume in parser.get_resumes_from_pages()]
+
+
+def test_crawl_uses_the_resume_cache():
+    cache = ResumeStore()
+    with FixtureSite(pages=PAGES, resumes_per_page=RESUMES_PER_PAGE, latency=0, incomplete_every=2) as site:
+        parser_class = fixture_parser(site)
+        first = asyncio.run(crawl(parser_class, resume_cache=cache))
+        requests = site.requests
+        second = asyncio.run(crawl(parser_class, resume_cache=cache))
+
+        assert len(first) == PAGES * RESUMES_PER_PAGE
+        assert [r.url for r in second] == [r.url for r in first]
+        # Only the category and results pages are loaded again; detail pages come from the cache
+        assert site.requests - requests == 1 + PAGES
+
+
+def test_rows_are_resolved_once_per_search():
+    async def resolve():
+        async with AsyncWorkUaParser() as parser:
+            row = ListingRow("https://www.work.ua/resumes/1/", update_date="2024-05-01 10:00:00",
+                             name="Кандидат", specialization="Python developer", salary="20000 грн")
+            return await parser._resolve_rows([row, row]), await parser._resolve_rows([row])
+
+    first_page, second_page = asyncio.run(resolve())
+    assert [r.url for r in first_page] == ["https://www.work.ua/resumes/1/"]
+    assert second_page == []
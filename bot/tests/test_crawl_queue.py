@@ -0,0 +1,127 @@
+import shutil
+import threading
+
+import pytest
+
+from conftest import fixture_adapter, resume
+from crawl_queue import SqliteCrawlQueue, plan_tasks, run_distributed
+from crawl_worker import CrawlWorker
+from fixture_site import FixtureSite
+from session_store import SearchSession
+from work_au_parser import WorkUaParser
+
+needs_chrome = pytest.mark.skipif(
+    not shutil.which('chromedriver') or not any(map(shutil.which, ('google-chrome', 'chromium', 'chromium-browser'))),
+    reason="Chrome and chromedriver are not installed",
+)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SqliteCrawlQueue(str(tmp_path / 'crawl.sqlite3'), max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def run_worker(queue, crawl, stop: threading.Event) -> threading.Thread:
+    """Thread claiming tasks and handing them to crawl(task), which returns resumes or raises"""
+    def work():
+        while not stop.is_set():
+            task = queue.claim()
+            if task is None:
+                stop.wait(0.01)
+                continue
+            try:
+                queue.publish(task, crawl(task))
+            except Exception as e:
+                queue.fail(task, str(e))
+            else:
+                queue.complete(task)
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_deadline_without_workers(queue):
+    resumes = run_distributed(queue, SearchSession(category=1), max_pages=2, pages_per_task=1,
+                              poll_interval=0.01, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        list(resumes)
+    # Nobody claimed the tasks, so they are dropped
+    assert queue.claim() is None
+
+
+def test_cancelled_while_waiting(queue):
+    checks = []
+
+    def cancelled():
+        checks.append(None)
+        return len(checks) > 3
+
+    resumes = run_distributed(queue, SearchSession(category=1), max_pages=2, pages_per_task=1,
+                              poll_interval=0.01, cancelled=cancelled)
+    assert list(resumes) == []
+    assert len(checks) == 4
+    assert queue.claim() is None
+
+
+def test_failed_tasks_are_reported(queue):
+    def crawl(task):
+        if task.first_page == 2:
+            raise RuntimeError("page did not load")
+        return [resume(task.first_page)]
+
+    stop = threading.Event()
+    worker = run_worker(queue, crawl, stop)
+    urls = []
+    try:
+        with pytest.raises(RuntimeError, match=r"1 of 3 crawl tasks failed \(pages 2-2\)"):
+            for found in run_distributed(queue, SearchSession(category=1), max_pages=3, pages_per_task=1,
+                                         poll_interval=0.01, timeout=5):
+                urls.append(found.url)
+    finally:
+        stop.set()
+        worker.join()
+    assert sorted(urls) == [resume(1).url, resume(3).url]
+
+
+@pytest.mark.parametrize('engine', ['http', pytest.param('selenium', marks=needs_chrome)])
+def test_tasks_past_the_last_page_end_empty(queue, engine):
+    with FixtureSite(pages=2, resumes_per_page=3, latency=0) as site:
+        adapter = fixture_adapter(site)
+        worker = CrawlWorker(queue, lambda pages: WorkUaParser(engine=engine, adapter=adapter, max_pages=pages),
+                             idle_interval=0.01)
+        stop = threading.Event()
+        thread = threading.Thread(target=worker.run, args=(stop,), daemon=True)
+        thread.start()
+        try:
+            resumes = list(run_distributed(queue, SearchSession(category=1), max_pages=5, pages_per_task=1,
+                                           poll_interval=0.01, timeout=10))
+        finally:
+            stop.set()
+            thread.join()
+
+    assert sorted(r.url for r in resumes) == sorted(
+        f"{site.base_url}/resumes/{site.resume_id(page, position)}/" for page in (1, 2) for position in range(3)
+    )
+
+
+def test_stale_attempt_cannot_complete_or_fail(tmp_path):
+    queue = SqliteCrawlQueue(str(tmp_path / 'crawl.sqlite3'), lease=0, max_attempts=3)
+    try:
+        queue.submit(plan_tasks('job', SearchSession(category=1), max_pages=1, pages_per_task=1))
+        stale = queue.claim()
+        # The lease ran out at once, so another worker gets the task
+        current = queue.claim()
+        assert (stale.attempts, current.attempts) == (1, 2)
+
+        queue.complete(stale)
+        queue.fail(stale, "lease ran out")
+        assert not queue.finished('job')
+
+        queue.complete(current)
+        assert queue.finished('job')
+        assert queue.failed('job') == []
+    finally:
+        queue.close()
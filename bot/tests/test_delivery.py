@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+from telebot.asyncio_helper import ApiTelegramException
+
+from async_delivery import AsyncResultDispatcher, AsyncTelegramRateLimits
+from conftest import AsyncBot, Bot, resume
+from delivery import ResultDispatcher, TelegramRateLimits
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_batch_is_sent_when_full():
+    bot = Bot()
+    with ResultDispatcher(bot, 1, batch_size=2, max_delay=60, limits=TelegramRateLimits()) as dispatcher:
+        dispatcher.add(resume(1))
+        assert bot.messages == []
+        dispatcher.add(resume(2))
+        assert len(bot.messages) == 1
+    assert dispatcher.sent_count == 2
+
+
+def test_stale_batch_is_sent_without_another_resume():
+    bot = Bot()
+    with ResultDispatcher(bot, 1, batch_size=10, max_delay=0.05, limits=TelegramRateLimits()) as dispatcher:
+        dispatcher.add(resume(1))
+        # The crawl stalls here: no add() comes to notice the delay
+        assert wait_for(lambda: bot.messages)
+        assert resume(1).url in bot.messages[0]
+        dispatcher.add(resume(2))
+    assert len(bot.messages) == 2
+    assert dispatcher.sent_count == 2
+
+
+def test_async_stale_batch_is_sent_without_another_resume():
+    bot = AsyncBot()
+
+    async def run():
+        async with AsyncResultDispatcher(bot, 1, AsyncTelegramRateLimits(), max_delay=0.05) as dispatcher:
+            await dispatcher.add(resume(1))
+            await asyncio.sleep(0.2)
+            assert len(bot.messages) == 1
+            await dispatcher.add(resume(2))
+        return dispatcher
+
+    dispatcher = asyncio.run(run())
+    assert len(bot.messages) == 2
+    assert dispatcher.sent_count == 2
+
+
+def test_async_undelivered_batch_is_not_counted():
+    class FloodedBot(AsyncBot):
+        async def send_message(self, chat_id, text, **kwargs):
+            raise ApiTelegramException('sendMessage', None, {
+                'error_code': 429, 'description': "Too Many Requests", 'parameters': {'retry_after': 0},
+            })
+
+    async def run():
+        async with AsyncResultDispatcher(FloodedBot(), 1, AsyncTelegramRateLimits(), max_delay=60) as dispatcher:
+            await dispatcher.add(resume(1))
+            assert not await dispatcher.send("Посилання")
+        return dispatcher
+
+    assert asyncio.run(run()).sent_count == 0
+
+
+def test_buckets_of_quiet_chats_are_dropped():
+    limits = TelegramRateLimits()
+    limits.SWEEP_INTERVAL = 0
+    limits.acquire(1)
+    assert 1 in limits._chat_buckets
+    # Chat 1's bucket refills meanwhile and goes on the next sweep
+    limits._chat_buckets[1]._updated -= TelegramRateLimits.CHAT_BURST / TelegramRateLimits.CHAT_RATE
+    limits.acquire(2)
+    assert list(limits._chat_buckets) == [2]
+
+
+def test_add_is_not_held_up_by_a_slow_send():
+    class SlowBot(Bot):
+        def __init__(self):
+            super().__init__()
+            self.sending = threading.Event()
+            self.go_on = threading.Event()
+
+        def send_message(self, chat_id, text, **kwargs):
+            self.sending.set()
+            self.go_on.wait(5)
+            super().send_message(chat_id, text, **kwargs)
+
+    bot = SlowBot()
+    with ResultDispatcher(bot, 1, batch_size=10, max_delay=0.01, limits=TelegramRateLimits()) as dispatcher:
+        dispatcher.add(resume(1))
+        assert bot.sending.wait(5)
+        # The timer is sending the first batch; the next resume is queued without waiting for it
+        dispatcher.add(resume(2))
+        assert dispatcher._pending == [resume(2)]
+        bot.go_on.set()
+    assert dispatcher.sent_count == 2
@@ -0,0 +1,45 @@
+import pytest
+
+from driver_pool import DriverPool
+
+
+class Driver:
+    current_window_handle = 'main'
+
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class Factory:
+    """Starts fake drivers until fail() is called"""
+
+    def __init__(self):
+        self.failing = False
+
+    def fail(self):
+        self.failing = True
+
+    def __call__(self):
+        if self.failing:
+            raise RuntimeError("chromedriver did not start")
+        return Driver()
+
+
+def test_failed_refill_does_not_escape_release():
+    factory = Factory()
+    pool = DriverPool(min_size=1, max_size=2, factory=factory)
+    driver = pool.acquire()
+    factory.fail()
+
+    pool.release(driver, broken=True)
+
+    assert driver.quit_called
+    # The slot reserved for the refill is given back
+    assert pool._size == 0
+    with pytest.raises(RuntimeError, match="chromedriver did not start"):
+        pool.acquire()
+    assert pool._size == 0
+    pool.close()
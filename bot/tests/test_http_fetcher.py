@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from conftest import fixture_adapter
+from fixture_site import CATEGORIES, MANIFEST, FixtureSite
+from http_fetcher import HttpResumeFetcher
+from work_au_parser import WorkUaParser
+
+PAGES = 2
+RESUMES_PER_PAGE = 4
+
+
+@pytest.fixture
+def site():
+    with FixtureSite(pages=PAGES, resumes_per_page=RESUMES_PER_PAGE, latency=0, incomplete_every=2) as site:
+        yield site
+
+
+@pytest.fixture
+def fetcher(site):
+    fetcher = HttpResumeFetcher(adapter=fixture_adapter(site))
+    yield fetcher
+    fetcher.close()
+
+
+def test_categories(site, fetcher):
+    categories = fetcher.get_categories()
+
+    assert [cat['name'] for cat in categories] == [name for _, name in CATEGORIES]
+    assert [cat['index'] for cat in categories] == list(range(1, len(CATEGORIES) + 1))
+    assert categories[0]['url'] == f"{site.base_url}/resumes-{CATEGORIES[0][0]}/"
+
+
+def test_listing_rows_from_cards(site, fetcher):
+    category_url = fetcher.get_categories()[0]['url']
+    rows, next_url = fetcher.get_results_page(category_url)
+
+    assert [row.url for row in rows] == [
+        f"{site.base_url}/resumes/{site.resume_id(1, position)}/" for position in range(RESUMES_PER_PAGE)
+    ]
+    assert next_url == f"{category_url}?page=2"
+    # Every second card has no date and needs its detail page
+    assert [row.to_resume() is not None for row in rows] == [False, True, False, True]
+    assert rows[1].name == f"Кандидат {site.resume_id(1, 1)}"
+    assert rows[1].salary == "21000 грн"
+
+    rows, next_url = fetcher.get_results_page(next_url)
+    assert len(rows) == RESUMES_PER_PAGE
+    assert next_url is None
+
+
+def test_link_fallback_without_cards(tmp_path):
+    # A results page whose cards are not recognised: rows come from resume links
+    page = ("<html><body><a href='/resumes/'>Резюме</a>"
+            "<a href='/resumes/by-category/'>Категорії</a>"
+            "<a href='/resumes/7/'>Python developer</a>"
+            "<a href='/resumes/8/'>Java developer</a></body></html>")
+    (tmp_path / 'page.html').write_text(page, encoding='utf-8')
+    (tmp_path / MANIFEST).write_text(json.dumps({'/resumes-it/': 'page.html'}), encoding='utf-8')
+
+    with FixtureSite(latency=0, recordings=str(tmp_path)) as site:
+        fetcher = HttpResumeFetcher(adapter=fixture_adapter(site))
+        rows, next_url = fetcher.get_results_page(f"{site.base_url}/resumes-it/")
+        fetcher.close()
+
+    assert [row.url for row in rows] == [f"{site.base_url}/resumes/7/", f"{site.base_url}/resumes/8/"]
+    assert next_url is None
+
+
+def test_resume_detail(site, fetcher):
+    url = f"{site.base_url}/resumes/{site.resume_id(1, 2)}/"
+    resume = fetcher.get_resume(url)
+
+    assert resume.url == url
+    assert resume.name == f"Кандидат {site.resume_id(1, 2)}"
+    assert resume.specialization == f"Python developer {site.resume_id(1, 2)}"
+    assert (resume.salary_from, resume.salary_to) == (22000, 22000)
+    assert resume.update_date == "2024-05-03 10:00:00"
+
+
+def test_parser_crawls_every_page(site):
+    with WorkUaParser(engine='http', adapter=fixture_adapter(site), max_pages=5) as parser:
+        parser.select_category(1)
+        resumes = list(parser.get_resumes_from_pages())
+
+    assert len(resumes) == PAGES * RESUMES_PER_PAGE
+    assert len({resume.url for resume in resumes}) == len(resumes)
+    assert all(resume.update_date for resume in resumes)
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from metrics import MetricsRegistry, SearchMetrics
+
+psutil = pytest.importorskip('psutil')
+
+
+class Service:
+    def __init__(self, process):
+        self.process = process
+
+
+class Driver:
+    def __init__(self, process):
+        self.service = Service(process)
+
+    def execute_script(self, script):
+        return 1024
+
+
+def test_driver_memory_covers_the_process_tree():
+    # The "driver" is this test process and the "browser" its child
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        metrics = SearchMetrics(MetricsRegistry())
+        metrics.sample_driver_memory(Driver(psutil.Process(os.getpid())))
+        own = psutil.Process().memory_info().rss
+        assert metrics.gauges['driver_rss_bytes'] > own
+        assert metrics.gauges['driver_js_heap_bytes'] == 1024
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,104 @@
+import threading
+
+from conftest import resume
+from query_cache import QueryCache
+
+
+class Scrape:
+    """Produces resumes one at a time, each after release() is called"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.calls = 0
+        self.closed = threading.Event()
+        self.stopped = None
+        self._ready = threading.Semaphore(0)
+
+    def release(self, times: int = 1):
+        for _ in range(times):
+            self._ready.release()
+
+    def __call__(self, stopped):
+        self.calls += 1
+        self.stopped = stopped
+        try:
+            for number in range(self.count):
+                self._ready.acquire()
+                yield resume(number)
+        finally:
+            self.closed.set()
+
+
+def test_follower_keeps_the_scrape_when_the_first_request_stops():
+    cache = QueryCache()
+    scrape = Scrape(3)
+    first = cache.stream('key', scrape)
+    second = cache.stream('key', scrape)
+
+    scrape.release()
+    assert next(first) == resume(0)
+    assert next(second) == resume(0)
+    first.close()
+
+    scrape.release(2)
+    assert list(second) == [resume(1), resume(2)]
+    assert scrape.calls == 1
+    assert not scrape.stopped()
+    # The finished scrape is cached for the next identical search
+    assert list(cache.stream('key', scrape)) == [resume(0), resume(1), resume(2)]
+
+
+def test_scrape_stops_once_every_request_stopped():
+    cache = QueryCache()
+    scrape = Scrape(3)
+    first = cache.stream('key', scrape)
+    second = cache.stream('key', scrape)
+
+    scrape.release()
+    next(first)
+    next(second)
+    first.close()
+    second.close()
+
+    assert scrape.stopped()
+    scrape.release()
+    assert scrape.closed.wait(5)
+    assert cache.index('key') is None
+
+
+def test_cancelled_request_stops_waiting():
+    cache = QueryCache()
+    cache.CANCEL_CHECK_INTERVAL = 0.01
+    scrape = Scrape(1)
+
+    assert list(cache.stream('key', scrape, cancelled=lambda: True)) == []
+    assert scrape.stopped()
+    scrape.release()
+
+
+def test_error_reaches_every_request():
+    cache = QueryCache()
+    started = threading.Event()
+
+    def failing(stopped):
+        started.wait(5)
+        raise ValueError("site is down")
+        yield
+
+    first = cache.stream('key', failing)
+    second = cache.stream('key', failing)
+    errors = []
+
+    def read(results):
+        try:
+            list(results)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=read, args=(results,)) for results in (first, second)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ["site is down", "site is down"]
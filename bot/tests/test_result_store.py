@@ -0,0 +1,25 @@
+import time
+
+from conftest import resume
+from result_store import ResumeStore
+
+
+def test_expired_resumes_are_not_served():
+    store = ResumeStore(ttl=0.01)
+    store.put(resume(1))
+    time.sleep(0.02)
+
+    assert store.get(resume(1).url) is None
+    assert resume(1).url not in store
+    assert store.stats()['misses'] == 1
+    # An expired resume stored again counts as new
+    assert store.put(resume(1))
+
+
+def test_fresh_resume_is_served_while_its_date_matches():
+    store = ResumeStore()
+    store.put(resume(1))
+
+    assert store.get(resume(1).url, update_date="2024-05-01 10:00:00") == resume(1)
+    assert store.get(resume(1).url, update_date="2024-06-01 10:00:00") is None
+    assert (store.stats()['hits'], store.stats()['misses']) == (1, 1)
@@ -0,0 +1,35 @@
+from conftest import Bot, resume
+from delivery import ResultDispatcher, TelegramRateLimits
+from watch_store import WatchRun
+from work_au_parser import url_hash
+
+
+def test_only_delivered_resumes_are_recorded():
+    run = WatchRun({url_hash(resume(1).url)}, high_water="2024-05-01 10:00:00", stop_after=0)
+    results = [resume(1), resume(2, day=2), resume(3, day=3), resume(4, day=4)]
+
+    with ResultDispatcher(Bot(), 1, batch_size=1, limits=TelegramRateLimits(), on_sent=run.delivered) as dispatcher:
+        for found in run.new_resumes(results):
+            if found == resume(3, day=3):
+                break  # /cancel before this one is added
+            dispatcher.add(found)
+
+    assert run.observed == [url_hash(resume(1).url), url_hash(resume(2).url)]
+    assert run.high_water == "2024-05-02 10:00:00"
+    assert run.new_count == 1
+
+
+def test_batches_telegram_gave_up_on_are_not_recorded():
+    run = WatchRun(set(), stop_after=0)
+
+    class GivingUp(ResultDispatcher):
+        def send(self, text: str, retries: int = 3) -> bool:
+            return False
+
+    with GivingUp(Bot(), 1, limits=TelegramRateLimits(), on_sent=run.delivered) as dispatcher:
+        for found in run.new_resumes([resume(1), resume(2)]):
+            dispatcher.add(found)
+
+    assert run.observed == []
+    assert run.high_water is None
+    assert dispatcher.sent_count == 0
@@ -0,0 +1,19 @@
+import pytest
+
+from work_au_parser import split_specialization_and_salary
+
+
+@pytest.mark.parametrize('title, expected', [
+    ("Python developer, 30 000 грн", ("Python developer", "30 000 грн")),
+    ("Python developer, 30\u00a0000\u00a0грн", ("Python developer", "30\u00a0000\u00a0грн")),
+    ("Frontend, React, $1500", ("Frontend, React", "$1500")),
+    ("Аналітик, від 20 000", ("Аналітик", "від 20 000")),
+    ("Тестувальник, 20 000 – 30 000", ("Тестувальник", "20 000 – 30 000")),
+    ("Бухгалтер, 1С", ("Бухгалтер, 1С", "")),
+    ("Бухгалтер, 1С 8.3", ("Бухгалтер, 1С 8.3", "")),
+    ("Менеджер з продажу, B2B", ("Менеджер з продажу, B2B", "")),
+    ("Оператор, 24/7", ("Оператор, 24/7", "")),
+    ("Python developer", ("Python developer", "")),
+])
+def test_split_specialization_and_salary(title, expected):
+    assert split_specialization_and_salary(title) == expected
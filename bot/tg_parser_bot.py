@@ -1,30 +1,84 @@
+import copy
+import functools
+import logging
 import os
 import telebot
 from telebot import types
-from work_au_parser import WorkUaParser
+from work_au_parser import SiteParser, WorkUaAdapter
+from multi_site import SITE_ADAPTERS, MultiSiteSearch, parse_sites
+from crawl_queue import open_crawl_queue, run_distributed
+from delivery import DocumentDispatcher, ResultDispatcher, rate_limits, send_with_retries
+from driver_pool import DriverPool, create_driver
+from browser_profile import PROFILES
+from session_store import MemorySessionStore, SqliteSessionStore
+from job_queue import JobScheduler, JobLimitError
+from resume_cache import ResumeCache
+from result_store import ResumeStore
+from query_cache import QueryCache, normalize_query
+from retry_policy import LatencyTracker, RetryPolicy
+from resume_index import parse_refinement
+from category_index import CategoryIndex
+from metrics import MetricsServer, SearchMetrics
+from watch_store import WatchRun, WatchScheduler, WatchStore
 from dotenv import load_dotenv
 
 load_dotenv()
 
 API_TOKEN = os.getenv('API_TOKEN')
+PARSER_ENGINE = os.getenv('PARSER_ENGINE', 'selenium')
+PARSER_WORKERS = int(os.getenv('PARSER_WORKERS', '4'))
+PARSER_MAX_PAGES = int(os.getenv('PARSER_MAX_PAGES', '5'))
+PARSER_EXTRACTION = os.getenv('PARSER_EXTRACTION', 'listing')
+DRIVER_POOL_MIN = int(os.getenv('DRIVER_POOL_MIN', '1'))
+DRIVER_POOL_MAX = int(os.getenv('DRIVER_POOL_MAX', '4'))
+BROWSER_PROFILE = PROFILES[os.getenv('BROWSER_PROFILE', 'lean')]
+SESSION_DB = os.getenv('SESSION_DB')
+SEARCH_EXECUTORS = int(os.getenv('SEARCH_EXECUTORS', '4'))
+MAX_SEARCHES_PER_USER = int(os.getenv('MAX_SEARCHES_PER_USER', '1'))
+RESUME_CACHE_DB = os.getenv('RESUME_CACHE_DB')
+QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', '600'))
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '100'))
+CATEGORY_INDEX_PATH = os.getenv('CATEGORY_INDEX_PATH', 'categories.json')
+WATCH_DB = os.getenv('WATCH_DB', 'watches.sqlite3')
+WATCH_INTERVAL_HOURS = float(os.getenv('WATCH_INTERVAL_HOURS', '24'))
+METRICS_PORT = os.getenv('METRICS_PORT')
+RESULTS_FORMAT = os.getenv('RESULTS_FORMAT', 'links')
+RESULTS_GZIP = os.getenv('RESULTS_GZIP', '').lower() in ('1', 'true', 'yes')
+CRAWL_QUEUE = os.getenv('CRAWL_QUEUE')
+CRAWL_PAGES_PER_TASK = int(os.getenv('CRAWL_PAGES_PER_TASK', '1'))
+CRAWL_TIMEOUT = float(os.getenv('CRAWL_TIMEOUT', '1800'))
+SEARCH_SITES = parse_sites(os.getenv('SEARCH_SITES', WorkUaAdapter.name))
+ADMIN_CHAT_IDS = {int(chat_id) for chat_id in os.getenv('ADMIN_CHAT_IDS', '').split(',') if chat_id.strip()}
+# Resumes between progress updates of the status message
+PROGRESS_STEP = 10
+# Most resumes sent in reply to /refine
+REFINE_LIMIT = int(os.getenv('REFINE_LIMIT', '50'))
 
 if API_TOKEN is None:
     raise ValueError("API_TOKEN не знайден в .env файлі")
 
-bot = telebot.TeleBot(API_TOKEN)
-
-specialty = ""
-location = ""
-category = None
-filters = {
-    'search_params': [],
-    'employment': [],
-    'age': {},
-    'gender': [],
-    'salary': {},
-    'education': [],
-    'experience': []
+bot = telebot.TeleBot(API_TOKEN, num_threads=4)
+
+driver_pool = None
+if PARSER_ENGINE == 'selenium':
+    driver_pool = DriverPool(min_size=DRIVER_POOL_MIN, max_size=DRIVER_POOL_MAX,
+                             factory=functools.partial(create_driver, BROWSER_PROFILE))
+
+sessions = SqliteSessionStore(SESSION_DB) if SESSION_DB else MemorySessionStore()
+# Without a SQLite cache, resumes are still shared between searches in memory
+resume_cache = ResumeCache(RESUME_CACHE_DB) if RESUME_CACHE_DB else ResumeStore()
+category_index = CategoryIndex(CATEGORY_INDEX_PATH)
+category_index.categories()  # Warm up the index in the background if it is stale
+query_cache = QueryCache(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_SIZE)
+# One retry policy per site, so timeouts learned and breaker trips carry over between searches
+retry_policies = {
+    site: RetryPolicy(latency=LatencyTracker(initial=SiteParser.WAIT_TIMEOUT)) for site in SEARCH_SITES
 }
+scheduler = JobScheduler(executors=SEARCH_EXECUTORS, per_user_limit=MAX_SEARCHES_PER_USER)
+watch_store = WatchStore(WATCH_DB)
+metrics_server = MetricsServer(int(METRICS_PORT)) if METRICS_PORT else None
+# With a crawl queue, searches are crawled by crawl_worker.py processes instead of this one
+crawl_queue = open_crawl_queue(CRAWL_QUEUE) if CRAWL_QUEUE else None
 
 
 @bot.message_handler(commands=['start'])
@@ -37,7 +91,8 @@ def send_welcome(message):
 @bot.message_handler(func=lambda message: message.text in ["work.ua", "rabota.us"])
 def site_selection(message):
     site = message.text
-    if site == "work.ua":
+    if site in SITE_ADAPTERS:
+        sessions.reset(message.chat.id)
         msg = bot.send_message(message.chat.id, "Введіть спеціальність для пошуку (наприклад, Python developer):")
         bot.register_next_step_handler(msg, get_specialty)
     else:
@@ -45,16 +100,18 @@ def site_selection(message):
 
 
 def get_specialty(message):
-    global specialty
-    specialty = message.text
+    session = sessions.get(message.chat.id)
+    session.specialty = message.text
+    sessions.save(message.chat.id, session)
     msg = bot.send_message(message.chat.id, "Введіть місто для пошуку (наприклад, Київ):")
     bot.register_next_step_handler(msg, get_location)
 
 
 def get_location(message):
-    global location
-    location = message.text
-    bot.send_message(message.chat.id, f"Спеціальність: {specialty}\nЛокація: {location}")
+    session = sessions.get(message.chat.id)
+    session.location = message.text
+    sessions.save(message.chat.id, session)
+    bot.send_message(message.chat.id, f"Спеціальність: {session.specialty}\nЛокація: {session.location}")
     bot.send_message(message.chat.id, "Тепер оберіть категорію для пошуку кандидатів.")
     send_category_options(message)
 
@@ -62,49 +119,23 @@ def get_location(message):
 def send_category_options(message):
     categories_text = (
         "Будь ласка, оберіть категорію для пошуку кандидатів (вкажіть номер):\n\n"
-        "1. IT, комп'ютери, інтернет\n"
-        "2. Адміністрація, керівництво середньої ланки\n"
-        "3. Будівництво, архітектура\n"
-        "4. Бухгалтерія, аудит\n"
-        "5. Готельно-ресторанний бізнес, туризм\n"
-        "6. Дизайн, творчість\n"
-        "7. ЗМІ, видавництво, поліграфія\n"
-        "8. Краса, фітнес, спорт\n"
-        "9. Культура, музика, шоу-бізнес\n"
-        "10. Логістика, склад, ЗЕД\n"
-        "11. Маркетинг, реклама, PR\n"
-        "12. Медицина, фармацевтика\n"
-        "13. Нерухомість\n"
-        "14. Освіта, наука\n"
-        "15. Охорона, безпека\n"
-        "16. Продаж, закупівля\n"
-        "17. Робочі спеціальності, виробництво\n"
-        "18. Роздрібна торгівля\n"
-        "19. Секретаріат, діловодство, АГВ\n"
-        "20. Сільське господарство, агробізнес\n"
-        "21. Страхування\n"
-        "22. Сфера обслуговування\n"
-        "23. Телекомунікації та зв'язок\n"
-        "24. Топменеджмент, керівництво вищої ланки\n"
-        "25. Транспорт, автобізнес\n"
-        "26. Управління персоналом, HR\n"
-        "27. Фінанси, банк\n"
-        "28. Юриспруденція\n"
-        "29. Інші сфери діяльності\n"
+        + category_index.menu_text()
     )
     msg = bot.send_message(message.chat.id, categories_text)
     bot.register_next_step_handler(msg, set_category)
 
 
 def set_category(message):
-    global category
     try:
         category = int(message.text)
-        if 1 <= category <= 29:
+        if 1 <= category <= len(category_index):
+            session = sessions.get(message.chat.id)
+            session.category = category
+            sessions.save(message.chat.id, session)
             bot.send_message(message.chat.id, f"Категорія встановлена: {category}")
             send_filter_options(message)
         else:
-            bot.send_message(message.chat.id, "Будь ласка, оберіть номер категорії від 1 до 29.")
+            bot.send_message(message.chat.id, f"Будь ласка, оберіть номер категорії від 1 до {len(category_index)}.")
             send_category_options(message)
     except ValueError:
         bot.send_message(message.chat.id, "Будь ласка, введіть номер категорії.")
@@ -140,21 +171,27 @@ def filter_search_params(message):
 
 @bot.message_handler(func=lambda message: message.text == "Пошук лише в заголовку")
 def set_title_only(message):
-    filters['search_params'].append('title_only')
+    session = sessions.get(message.chat.id)
+    session.add_filter('search_params', 'title_only')
+    sessions.save(message.chat.id, session)
     bot.send_message(message.chat.id, "Пошук лише в заголовку увімкнено.")
     send_filter_options(message)
 
 
 @bot.message_handler(func=lambda message: message.text == "Пошук з синонімами")
 def set_with_synonyms(message):
-    filters['search_params'].append('with_synonyms')
+    session = sessions.get(message.chat.id)
+    session.add_filter('search_params', 'with_synonyms')
+    sessions.save(message.chat.id, session)
     bot.send_message(message.chat.id, "Пошук з синонімами увімкнено.")
     send_filter_options(message)
 
 
 @bot.message_handler(func=lambda message: message.text == "Пошук будь-яке з слів")
 def set_any_word(message):
-    filters['search_params'].append('any_word')
+    session = sessions.get(message.chat.id)
+    session.add_filter('search_params', 'any_word')
+    sessions.save(message.chat.id, session)
     bot.send_message(message.chat.id, "Пошук будь-яке з слів увімкнено.")
     send_filter_options(message)
 
@@ -171,14 +208,18 @@ def filter_employment_type(message):
 
 @bot.message_handler(func=lambda message: message.text == "Повна зайнятість")
 def set_full_time(message):
-    filters['employment'].append('full_time')
+    session = sessions.get(message.chat.id)
+    session.add_filter('employment', 'full_time')
+    sessions.save(message.chat.id, session)
     bot.send_message(message.chat.id, "Повна зайнятість обрана.")
     send_filter_options(message)
 
 
 @bot.message_handler(func=lambda message: message.text == "Неповна зайнятість")
 def set_part_time(message):
-    filters['employment'].append('part_time')
+    session = sessions.get(message.chat.id)
+    session.add_filter('employment', 'part_time')
+    sessions.save(message.chat.id, session)
     bot.send_message(message.chat.id, "Неповна зайнятість обрана.")
     send_filter_options(message)
 
@@ -191,7 +232,9 @@ def filter_age_range(message):
 
 def set_min_age(message):
     try:
-        filters['age']['from'] = int(message.text)
+        session = sessions.get(message.chat.id)
+        session.filters['age']['from'] = int(message.text)
+        sessions.save(message.chat.id, session)
         msg = bot.send_message(message.chat.id, "Введіть максимальний вік:")
         bot.register_next_step_handler(msg, set_max_age)
     except ValueError:
@@ -200,8 +243,10 @@ def set_min_age(message):
 
 def set_max_age(message):
     try:
-        filters['age']['to'] = int(message.text)
-        bot.send_message(message.chat.id, f"Діапазон віку встановлений: {filters['age']['from']} - {filters['age']['to']}")
+        session = sessions.get(message.chat.id)
+        session.filters['age']['to'] = int(message.text)
+        sessions.save(message.chat.id, session)
+        bot.send_message(message.chat.id, f"Діапазон віку встановлений: {session.filters['age'].get('from')} - {session.filters['age']['to']}")
         send_filter_options(message)
     except ValueError:
         bot.send_message(message.chat.id, "Будь ласка, введіть числове значення.")
@@ -217,7 +262,9 @@ def filter_gender(message):
 
 def set_gender(message):
     gender = 'male' if message.text == "Чоловіча" else 'female'
-    filters['gender'].append(gender)
+    session = sessions.get(message.chat.id)
+    session.add_filter('gender', gender)
+    sessions.save(message.chat.id, session)
     bot.send_message(message.chat.id, f"Стать обрана: {message.text}")
     send_filter_options(message)
 
@@ -230,7 +277,9 @@ def filter_salary(message):
 
 def set_min_salary(message):
     try:
-        filters['salary']['from'] = int(message.text)
+        session = sessions.get(message.chat.id)
+        session.filters['salary']['from'] = int(message.text)
+        sessions.save(message.chat.id, session)
         msg = bot.send_message(message.chat.id, "Введіть максимальну зарплату:")
         bot.register_next_step_handler(msg, set_max_salary)
     except ValueError:
@@ -239,8 +288,10 @@ def set_min_salary(message):
 
 def set_max_salary(message):
     try:
-        filters['salary']['to'] = int(message.text)
-        bot.send_message(message.chat.id, f"Діапазон зарплати встановлений: {filters['salary']['from']} - {filters['salary']['to']}")
+        session = sessions.get(message.chat.id)
+        session.filters['salary']['to'] = int(message.text)
+        sessions.save(message.chat.id, session)
+        bot.send_message(message.chat.id, f"Діапазон зарплати встановлений: {session.filters['salary'].get('from')} - {session.filters['salary']['to']}")
         send_filter_options(message)
     except ValueError:
         bot.send_message(message.chat.id, "Будь ласка, введіть числове значення.")
@@ -256,7 +307,9 @@ def filter_education(message):
 
 def set_education(message):
     education_level = 'higher' if message.text == "Вища освіта" else 'secondary'
-    filters['education'].append(education_level)
+    session = sessions.get(message.chat.id)
+    session.add_filter('education', education_level)
+    sessions.save(message.chat.id, session)
     bot.send_message(message.chat.id, f"Рівень освіти обраний: {message.text}")
     send_filter_options(message)
 
@@ -268,23 +321,242 @@ def unsupported_message(message):
 
 @bot.message_handler(func=lambda message: message.text == "Застосувати фільтри")
 def apply_filters(message):
-    bot.send_message(message.chat.id, "Застосовуємо фільтри та починаємо фільтрацію...")
-    global category, specialty, location, filters
+    session = sessions.get(message.chat.id)
+    if session.category is None:
+        bot.send_message(message.chat.id, "Пошук не налаштований або застарів. Почніть з команди /start.")
+        return
+
+    # The chat may start building its next search while this one runs
+    search = copy.deepcopy(session)
+    # Identical searches share one scrape and its cached results
+    key = normalize_query(search.category, search.specialty, search.location, search.filters)
     try:
-        with WorkUaParser() as parser:
-            parser.select_category(category)
-            parser.choose_profession(specialty)
-            parser.choose_location(location)
-            parser.apply_filters(filters)
+        job = scheduler.submit(message.chat.id, lambda job: run_search(job, search, key))
+    except JobLimitError:
+        bot.send_message(message.chat.id, "Попередній пошук ще виконується. Дочекайтеся його або скасуйте командою /cancel.")
+        return
 
-            resumes = parser.get_resumes_from_pages()
+    # Kept in the session, so /refine forgets it when the session expires
+    session.last_query = key
+    sessions.save(message.chat.id, session)
 
-        if resumes:
-            for resume in resumes:
-                bot.send_message(message.chat.id, f"Посилання: {resume.url}")
-        else:
-            bot.send_message(message.chat.id, "Не знайдено резюме по вказаним параметрам")
+    bot.send_message(message.chat.id, f"Пошук #{job.id} поставлено в чергу. Скасувати: /cancel")
+
+
+@bot.message_handler(commands=['cancel'])
+def cancel_search(message):
+    jobs = scheduler.cancel(message.chat.id)
+    if jobs:
+        bot.send_message(message.chat.id, "Скасовуємо пошук " + ", ".join(f"#{job.id}" for job in jobs))
+    else:
+        bot.send_message(message.chat.id, "Немає активних пошуків.")
+
+
+@bot.message_handler(commands=['watch'])
+def add_watch(message):
+    session = sessions.get(message.chat.id)
+    if session.category is None:
+        bot.send_message(message.chat.id, "Спочатку налаштуйте пошук, почавши з команди /start.")
+        return
+
+    watch = watch_store.add(message.chat.id, copy.deepcopy(session), WATCH_INTERVAL_HOURS * 3600)
+    bot.send_message(
+        message.chat.id,
+        f"Пошук збережено як відстеження #{watch.id}. Кожні {WATCH_INTERVAL_HOURS:g} год. "
+        f"надсилатимемо лише нові резюме. Список: /watches, видалити: /unwatch {watch.id}"
+    )
+
+
+@bot.message_handler(commands=['watches'])
+def list_watches(message):
+    watches = watch_store.for_chat(message.chat.id)
+    if not watches:
+        bot.send_message(message.chat.id, "Немає збережених відстежень. Налаштуйте пошук і надішліть /watch.")
+        return
+
+    lines = [
+        f"#{watch.id}: {watch.search.specialty}, {watch.search.location}, категорія {watch.search.category}"
+        for watch in watches
+    ]
+    bot.send_message(message.chat.id, "Відстеження:\n" + "\n".join(lines))
+
+
+@bot.message_handler(commands=['unwatch'])
+def remove_watch(message):
+    try:
+        watch_id = int(message.text.split()[1])
+    except (IndexError, ValueError):
+        bot.send_message(message.chat.id, "Вкажіть номер відстеження, наприклад: /unwatch 3")
+        return
+
+    if watch_store.remove(message.chat.id, watch_id):
+        bot.send_message(message.chat.id, f"Відстеження #{watch_id} видалено.")
+    else:
+        bot.send_message(message.chat.id, f"Відстеження #{watch_id} не знайдено.")
+
+
+@bot.message_handler(commands=['refine'])
+def refine_search(message):
+    key = sessions.get(message.chat.id).last_query
+    index = query_cache.index(key) if key else None
+    if index is None:
+        bot.send_message(message.chat.id, "Немає збережених результатів пошуку. Запустіть пошук і дочекайтеся його завершення.")
+        return
+
+    try:
+        query = parse_refinement(message.text.partition(' ')[2])
+    except ValueError:
+        bot.send_message(message.chat.id, "Приклад уточнення: /refine від 30000 до 50000 днів 7 python")
+        return
+
+    resumes = index.search(**query)
+    if not resumes:
+        bot.send_message(message.chat.id, f"Серед {len(index)} резюме останнього пошуку немає відповідних.")
+        return
+
+    with ResultDispatcher(bot, message.chat.id) as dispatcher:
+        for resume in resumes[:REFINE_LIMIT]:
+            dispatcher.add(resume)
+    bot.send_message(message.chat.id, f"Відповідають {len(resumes)} з {len(index)} резюме, найсвіжіші першими, "
+                                      f"надіслано {min(len(resumes), REFINE_LIMIT)}.")
+
+
+def site_parser(site, metrics=None):
+    """Parser for one of SEARCH_SITES with the bot's engine settings"""
+    # The category index holds work.ua's list, which is also the bot's category menu
+    return SiteParser(adapter=SITE_ADAPTERS[site](), engine=PARSER_ENGINE, workers=PARSER_WORKERS,
+                      max_pages=PARSER_MAX_PAGES, driver_pool=driver_pool,
+                      resume_cache=resume_cache, extraction=PARSER_EXTRACTION,
+                      retry_policy=retry_policies[site],
+                      categories=category_index if site == WorkUaAdapter.name else None, metrics=metrics)
+
+
+def scrape(search, metrics=None, cancelled=None):
+    """
+    Run the parser for a search and yield its resumes, from every site in SEARCH_SITES.
+
+    `cancelled` is checked while waiting for crawl workers, which may publish nothing for a long time.
+    """
+    if crawl_queue is not None:
+        yield from run_distributed(crawl_queue, search, PARSER_MAX_PAGES, CRAWL_PAGES_PER_TASK,
+                                   timeout=CRAWL_TIMEOUT, cancelled=cancelled)
+        return
+
+    if len(SEARCH_SITES) > 1:
+        parsers = {site: functools.partial(site_parser, site, metrics) for site in SEARCH_SITES}
+        yield from MultiSiteSearch(parsers, primary_categories=category_index).stream(search)
+        return
+
+    with site_parser(SEARCH_SITES[0], metrics) as parser:
+        parser.select_category(search.category)
+        parser.choose_profession(search.specialty)
+        parser.choose_location(search.location)
+        parser.apply_filters(search.filters)
+
+        yield from parser.get_resumes_from_pages()
+
+
+def result_dispatcher(job, search):
+    """Links streamed in batches, or a single export file when RESULTS_FORMAT names a format"""
+    if RESULTS_FORMAT == 'links':
+        return ResultDispatcher(bot, job.chat_id)
+    return DocumentDispatcher(bot, job.chat_id, RESULTS_FORMAT, compress=RESULTS_GZIP,
+                              name=f"resumes-{job.id}",
+                              caption=f"Пошук #{job.id}: {search.specialty}, {search.location}")
+
+
+def report_progress(job, status):
+    """Show the search's progress in its status message; a failed edit is logged, not raised"""
+    text = f"Пошук #{job.id}: знайдено {job.progress} резюме..."
+    try:
+        send_with_retries(rate_limits, job.chat_id,
+                          lambda: bot.edit_message_text(text, job.chat_id, status.message_id))
     except Exception as e:
-        bot.send_message(message.chat.id, f"Відбулася помилка при парсингу: {e}")
+        logging.warning(f"Could not update the progress of search #{job.id}: {str(e)}")
 
-bot.polling()
+
+def run_search(job, search, key):
+    """Run one search under its query cache key in a scheduler executor, streaming results and progress to the chat"""
+    chat_id = job.chat_id
+    status = bot.send_message(chat_id, f"Пошук #{job.id}: застосовуємо фільтри та починаємо фільтрацію...")
+    reported = 0
+    metrics = SearchMetrics()
+    try:
+        with result_dispatcher(job, search) as dispatcher:
+            for resume in query_cache.stream(key, lambda stopped: scrape(search, metrics, stopped),
+                                             cancelled=lambda: job.cancelled):
+                if job.cancelled:
+                    break
+                dispatcher.add(resume)
+                job.progress += 1
+
+                if job.progress - reported >= PROGRESS_STEP:
+                    reported = job.progress
+                    report_progress(job, status)
+
+        if job.cancelled:
+            bot.send_message(chat_id, f"Пошук #{job.id} скасовано.")
+        elif not dispatcher.sent_count:
+            bot.send_message(chat_id, "Не знайдено резюме по вказаним параметрам")
+        else:
+            bot.send_message(chat_id, f"Пошук #{job.id} завершено, знайдено {dispatcher.sent_count} резюме.")
+    except Exception as e:
+        bot.send_message(chat_id, f"Відбулася помилка при парсингу: {e}")
+
+    if chat_id in ADMIN_CHAT_IDS:
+        # A search answered from the query cache or by crawl workers has no stages of its own
+        if metrics.spans:
+            report = metrics.summary()
+        elif crawl_queue is not None:
+            report = "Пошук виконано воркерами, статистика етапів у їхніх логах."
+        else:
+            report = "Результати взято з кешу запитів."
+        bot.send_message(chat_id, f"Статистика пошуку #{job.id}:\n{report}")
+
+
+def run_watch(job, watch):
+    """Re-run a saved search and send only the resumes it has not delivered before"""
+    # Crawl workers publish pages out of order, so their results cannot be cut short
+    stop_after = 0 if crawl_queue is not None else WatchRun.STOP_AFTER
+    run = WatchRun(watch_store.seen(watch.id), watch.high_water, stop_after)
+    # Not shared through query_cache: stopping early has to stop this scrape's pagination
+    resumes = scrape(watch.search, cancelled=lambda: job.cancelled)
+    failed = False
+    try:
+        # Only resumes that reached the chat are recorded, so cut-off ones come again next run
+        with ResultDispatcher(bot, watch.chat_id, on_sent=run.delivered) as dispatcher:
+            for resume in run.new_resumes(resumes):
+                if job.cancelled:
+                    break
+                dispatcher.add(resume)
+                job.progress += 1
+    except Exception as e:
+        logging.error(f"Watch {watch.id} failed: {str(e)}")
+        failed = True
+    finally:
+        resumes.close()
+
+    watch_store.record_run(watch.id, run.observed, run.high_water)
+    if run.new_count and not failed:
+        bot.send_message(watch.chat_id, f"Відстеження #{watch.id}: {run.new_count} нових резюме.")
+
+
+watch_scheduler = WatchScheduler(
+    watch_store, lambda watch: scheduler.submit(watch.chat_id, lambda job: run_watch(job, watch))
+)
+watch_scheduler.start()
+if metrics_server is not None:
+    metrics_server.start()
+
+try:
+    bot.polling(non_stop=True)
+finally:
+    watch_scheduler.stop()
+    if metrics_server is not None:
+        metrics_server.stop()
+    scheduler.shutdown()
+    watch_store.close()
+    if crawl_queue is not None:
+        crawl_queue.close()
+    if driver_pool is not None:
+        driver_pool.close()
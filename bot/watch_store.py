@@ -0,0 +1,228 @@
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Set
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from job_queue import JobLimitError
+from session_store import SearchSession
+from work_au_parser import ResumeData, url_hash
+
+
+@dataclass
+class Watch:
+    """Saved search that is re-run periodically"""
+    id: int
+    chat_id: int
+    search: SearchSession
+    interval: float
+    next_run: float
+    high_water: Optional[str] = None  # Newest update date delivered so far
+
+
+class WatchStore:
+    """
+    Saved searches and the resumes each of them has already delivered, in SQLite.
+
+    Seen resumes are kept as (watch, 64-bit URL hash) pairs in a table without
+    rowids, about 20 bytes per resume, and are forgotten after `seen_ttl`
+    seconds without being seen again.
+    """
+
+    def __init__(self, path: str, seen_ttl: float = 90 * 24 * 3600):
+        self.seen_ttl = seen_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS watches ("
+            "id INTEGER PRIMARY KEY, chat_id INTEGER NOT NULL, search TEXT NOT NULL, "
+            "interval REAL NOT NULL, next_run REAL NOT NULL, high_water TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS watches_next_run ON watches (next_run)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "watch_id INTEGER NOT NULL, url_hash INTEGER NOT NULL, seen REAL NOT NULL, "
+            "PRIMARY KEY (watch_id, url_hash)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _watch(row) -> Watch:
+        watch_id, chat_id, search, interval, next_run, high_water = row
+        return Watch(watch_id, chat_id, SearchSession(**json.loads(search)), interval, next_run, high_water)
+
+    def add(self, chat_id: int, search: SearchSession, interval: float) -> Watch:
+        """Save a search; its first run is due immediately"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO watches (chat_id, search, interval, next_run) VALUES (?, ?, ?, ?)",
+                (chat_id, json.dumps(asdict(search), ensure_ascii=False), interval, now)
+            )
+            self._conn.commit()
+        return Watch(cursor.lastrowid, chat_id, search, interval, now)
+
+    def remove(self, chat_id: int, watch_id: int) -> bool:
+        """Delete a chat's watch with its seen-set; False if the chat has no such watch"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM watches WHERE id = ? AND chat_id = ?", (watch_id, chat_id)
+            )
+            if cursor.rowcount:
+                self._conn.execute("DELETE FROM seen WHERE watch_id = ?", (watch_id,))
+            self._conn.commit()
+        return bool(cursor.rowcount)
+
+    def for_chat(self, chat_id: int) -> List[Watch]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, chat_id, search, interval, next_run, high_water "
+                "FROM watches WHERE chat_id = ? ORDER BY id", (chat_id,)
+            ).fetchall()
+        return [self._watch(row) for row in rows]
+
+    def due(self, now: Optional[float] = None) -> List[Watch]:
+        """Watches whose next run time has passed, most overdue first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, chat_id, search, interval, next_run, high_water "
+                "FROM watches WHERE next_run <= ? ORDER BY next_run", (now or time.time(),)
+            ).fetchall()
+        return [self._watch(row) for row in rows]
+
+    def reschedule(self, watch_id: int, next_run: float):
+        with self._lock:
+            self._conn.execute("UPDATE watches SET next_run = ? WHERE id = ?", (next_run, watch_id))
+            self._conn.commit()
+
+    def seen(self, watch_id: int) -> Set[int]:
+        """URL hashes the watch has already delivered"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url_hash FROM seen WHERE watch_id = ? AND seen >= ?",
+                (watch_id, time.time() - self.seen_ttl)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def record_run(self, watch_id: int, hashes: Iterable[int], high_water: Optional[str]):
+        """Mark resumes as seen by the watch and move its high-water mark"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO seen (watch_id, url_hash, seen) VALUES (?, ?, ?)",
+                [(watch_id, h, now) for h in hashes]
+            )
+            self._conn.execute(
+                "UPDATE watches SET high_water = ? WHERE id = ? AND (high_water IS NULL OR high_water < ?)",
+                (high_water, watch_id, high_water)
+            )
+            self._conn.execute(
+                "DELETE FROM seen WHERE watch_id = ? AND seen < ?", (watch_id, now - self.seen_ttl)
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class WatchRun:
+    """
+    Filters one run of a watch down to the resumes it has not delivered yet.
+
+    Results are ordered by update date, so once `stop_after` resumes in a row
+    were already seen and are not newer than the high-water mark, the rest of
+    the results are older still and the run stops, which stops pagination.
+    A few in a row are required because promoted resumes are pinned to the
+    top of the results regardless of their date. A `stop_after` of 0 never
+    stops, for results that do not arrive in date order.
+
+    New resumes are only recorded (in `observed`, the high-water mark and
+    `new_count`) once delivered() is called for them, so resumes a cancelled
+    or failed run never sent come again in the next one.
+    """
+
+    STOP_AFTER = 5
+
+    def __init__(self, seen: Set[int], high_water: Optional[str] = None, stop_after: int = STOP_AFTER):
+        self.seen = seen
+        self.high_water = high_water
+        self.stop_after = stop_after
+        self.observed: List[int] = []
+        self.new_count = 0
+        self.stopped_early = False
+
+    def new_resumes(self, resumes: Iterable[ResumeData]) -> Iterator[ResumeData]:
+        previous_high_water = self.high_water
+        seen_in_row = 0
+        for resume in resumes:
+            h = url_hash(resume.url)
+            if h not in self.seen:
+                self.seen.add(h)
+                seen_in_row = 0
+                yield resume
+                continue
+
+            self._observe(h, resume)
+
+            if previous_high_water is not None and (resume.update_date or "") <= previous_high_water:
+                seen_in_row += 1
+                if self.stop_after and seen_in_row >= self.stop_after:
+                    self.stopped_early = True
+                    return
+            else:
+                seen_in_row = 0
+
+    def delivered(self, resumes: Iterable[ResumeData]):
+        """Record new resumes that reached the chat"""
+        for resume in resumes:
+            self._observe(url_hash(resume.url), resume)
+            self.new_count += 1
+
+    def _observe(self, h: int, resume: ResumeData):
+        self.observed.append(h)
+        if resume.update_date and (self.high_water is None or resume.update_date > self.high_water):
+            self.high_water = resume.update_date
+
+
+class WatchScheduler:
+    """
+    Background thread that hands due watches to `submit`.
+
+    A watch whose chat is at its job limit (JobLimitError) stays due and is
+    retried on the next check; otherwise it is rescheduled one interval ahead.
+    """
+
+    def __init__(self, store: WatchStore, submit: Callable[[Watch], None], check_interval: float = 60):
+        self.store = store
+        self.submit = submit
+        self.check_interval = check_interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name='watch-scheduler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def run_due(self):
+        now = time.time()
+        for watch in self.store.due(now):
+            try:
+                self.submit(watch)
+            except JobLimitError:
+                continue
+            except Exception as e:
+                logging.error(f"Could not start watch {watch.id}: {str(e)}")
+            self.store.reschedule(watch.id, now + watch.interval)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+            except Exception as e:
+                logging.error(f"Watch scheduler check failed: {str(e)}")
+            self._stop.wait(self.check_interval)
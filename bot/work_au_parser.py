@@ -1,111 +1,546 @@
-from selenium import webdriver
 from selenium.webdriver import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
+from typing import Callable, List, Dict, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import calendar
+import hashlib
 import json
 import logging
+import re
+import sys
+import time
+
+from extraction import (
+    CATEGORY_SPEC,
+    RESULTS_PAGE_SPECS,
+    RESUME_DETAIL_SPEC,
+    extract_with_driver,
+)
+from filter_schema import FILTER_SCHEMA, CheckboxFilter, SelectFilter, build_search_url
+from browser_profile import BrowserProfile, DEFAULT_PROFILE
+from driver_pool import DriverPool, create_driver
+from metrics import SearchMetrics
+from page_readiness import PageUpdateWatcher
+from retry_policy import LatencyTracker, RetryPolicy
+from site_adapter import SiteAdapter
+from worker_pool import HostRateLimiter, ThroughputStats, chunked, fetch_ordered
+
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMATS = (DATE_FORMAT, "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d")
+# Amounts like '30 000' or '30\u00a0000', with any kind of space between thousands
+# HTTP status of the document loaded in the current tab, once it has been parsed
+PAGE_STATUS_JS = """
+const entry = performance.getEntriesByType('navigation')[0];
+return document.readyState !== 'loading' && entry ? entry.responseStatus || null : null;
+"""
+
+AMOUNT_RE = re.compile(r"\d[\d\s\u00a0\u202f]*")
+CURRENCY_RE = re.compile(r"грн|uah|usd|eur|\$|€", re.IGNORECASE)
+
+
+def url_hash(url: str) -> int:
+    """64-bit hash of a resume URL, for compact seen-sets"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+def parse_date(text: Optional[str]) -> Optional[int]:
+    """Parse an update date like '2024-05-01 10:00:00' into a Unix timestamp (UTC)"""
+    if not text:
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            return calendar.timegm(datetime.strptime(text.strip(), date_format).utctimetuple())
+        except ValueError:
+            continue
+    return None
+
+
+def format_date(timestamp: int) -> str:
+    return time.strftime(DATE_FORMAT, time.gmtime(timestamp))
+
+
+def normalize_date(text: Optional[str]) -> Optional[str]:
+    """Canonical form of an update date, so dates from cards and detail pages compare equal"""
+    timestamp = parse_date(text)
+    return format_date(timestamp) if timestamp is not None else text
+
+
+def parse_salary(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parse a salary like '30 000 грн', '20 000 – 30 000 грн' or 'від 20 000 грн'
+    into a (from, to) range; bounds that are not given are None.
+    """
+    if not text:
+        return None, None
+    amounts = [int(re.sub(r"\D", "", match)) for match in AMOUNT_RE.findall(text)]
+    if not amounts:
+        return None, None
+    if len(amounts) >= 2:
+        return amounts[0], amounts[1]
+    lowered = text.strip().lower()
+    if lowered.startswith(("від", "from")):
+        return amounts[0], None
+    if lowered.startswith(("до", "up to")):
+        return None, amounts[0]
+    return amounts[0], amounts[0]
+
+
+def looks_like_salary(text: str) -> bool:
+    """
+    True for text like '30 000 грн', '$1500' or 'від 20 000', False for '1С' or 'B2B'.
+
+    Text with an amount counts if it names a currency, or if the amount has at
+    least three digits and digits make up most of it.
+    """
+    digits = re.sub(r"\D", "", "".join(AMOUNT_RE.findall(text)))
+    if not digits:
+        return False
+    if CURRENCY_RE.search(text):
+        return True
+    longest = max(len(re.sub(r"\D", "", amount)) for amount in AMOUNT_RE.findall(text))
+    return longest >= 3 and len(digits) > len(re.sub(r"\s", "", text)) / 2
+
+
+def split_specialization_and_salary(text: str):
+    """
+    Split resume title like 'Python developer, 30 000 грн' into its two parts.
+
+    Only the part after the last comma is taken as the salary, and only if it
+    looks like one, so titles like 'Бухгалтер, 1С' or without a salary stay whole.
+    """
+    head, comma, tail = text.rpartition(',')
+    if comma and looks_like_salary(tail):
+        return head.strip(), tail.strip()
+    return text.strip(), ""
+
+
+def _intern(text: Optional[str]) -> Optional[str]:
+    return sys.intern(text) if text else text
 
 
-@dataclass
 class ResumeData:
-    """Data structure for storing resume information"""
-    update_date: str
-    name: str
-    specialization: str
-    salary: str
+    """
+    Data structure for storing resume information.
+
+    Kept compact for large crawls: the class is slotted, the update date is
+    stored as a Unix timestamp and the salary also as a numeric range, and
+    specializations and salaries, which repeat a lot, are interned. It is
+    built from and converted back to the same five string fields.
+    """
+
+    __slots__ = ('updated', 'name', 'specialization', 'salary', 'salary_from', 'salary_to', 'url', '_raw_date')
+    FIELDS = ('update_date', 'name', 'specialization', 'salary', 'url')
+
+    def __init__(self, update_date: Optional[str], name: str, specialization: str, salary: str, url: str):
+        self.updated = parse_date(update_date)
+        # Only kept when the date is in a format parse_date does not know
+        self._raw_date = update_date if self.updated is None else None
+        self.name = name
+        self.specialization = _intern(specialization)
+        self.salary = _intern(salary)
+        self.salary_from, self.salary_to = parse_salary(salary)
+        self.url = url
+
+    @property
+    def update_date(self) -> Optional[str]:
+        return format_date(self.updated) if self.updated is not None else self._raw_date
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """The five string fields; ResumeData(**resume.to_dict()) rebuilds the resume"""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, ResumeData):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(self.url)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"ResumeData({fields})"
+
+
+def resume_from_detail(fields: Dict[str, Optional[str]], url: str) -> ResumeData:
+    """Build ResumeData from fields read with RESUME_DETAIL_SPEC"""
+    specialization, salary = split_specialization_and_salary(fields['title'] or "")
+    return ResumeData(
+        update_date=fields['update_date'],
+        name=fields['name'],
+        specialization=specialization,
+        salary=salary,
+        url=url,
+    )
+
+
+def listing_rows_from_page(page: Dict[str, List[Dict]]) -> Tuple[List["ListingRow"], Optional[str]]:
+    """Turn fields read with RESULTS_PAGE_SPECS into listing rows and the next page url"""
+    if page['cards']:
+        rows = [ListingRow(**card) for card in page['cards']]
+    else:
+        rows = [
+            ListingRow(link['url'], link['update_date'])
+            for link in page['links']
+            if "/resumes/by-" not in link['url']  # Skip category links
+        ]
+    next_url = page['next_page'][0]['url'] if page['next_page'] else None
+    return rows, next_url
+
+
+class ListingRow(NamedTuple):
+    """Resume found on a results page, with whatever its card shows"""
     url: str
+    update_date: Optional[str] = None
+    name: Optional[str] = None
+    specialization: Optional[str] = None
+    salary: Optional[str] = None
 
+    def to_resume(self) -> Optional[ResumeData]:
+        """
+        Build ResumeData from the card alone.
 
-class WorkUaParser:
-    """Parser for work.ua website"""
+        Returns None when the date, name or specialization is missing and the
+        detail page has to be visited; a missing salary just means none is set.
+        """
+        if not (self.update_date and self.name and self.specialization):
+            return None
+        return ResumeData(
+            update_date=self.update_date,
+            name=self.name,
+            specialization=self.specialization,
+            salary=self.salary or "",
+            url=self.url,
+        )
 
-    BASE_URL = "https://www.work.ua/resumes/by-category/"
-    WAIT_TIMEOUT = 10
 
-    def __init__(self):
-        options = webdriver.ChromeOptions()
-        options.add_argument('--start-maximized')
-        options.add_argument('--headless')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
+class WorkUaAdapter(SiteAdapter):
+    """work.ua: category list, URL filter scheme and the layout of result cards and resume pages"""
+
+    name = "work.ua"
+    base_url = "https://www.work.ua/resumes/by-category/"
+    all_resumes_url = "https://www.work.ua/resumes/"
+    filter_schema = FILTER_SCHEMA
+    category_spec = CATEGORY_SPEC
+    results_page_specs = RESULTS_PAGE_SPECS
+    detail_spec = RESUME_DETAIL_SPEC
+    results_ready_xpath = RESULTS_PAGE_SPECS['links'].items
+    detail_ready_xpath = "//time"
+    search_input_xpath = '//*[@id="search"]'
+    city_input_xpath = '//*[@id="city"]'
+
+    def search_url(self, category_url: Optional[str], profession: str, location: str, filters: Dict) -> str:
+        return build_search_url(category_url or self.all_resumes_url, profession, location, filters)
+
+    def listing_rows(self, page: Dict[str, List[Dict]]) -> Tuple[List[ListingRow], Optional[str]]:
+        return listing_rows_from_page(page)
+
+    def page_url(self, search_url: str, page: int) -> str:
+        if page <= 1:
+            return search_url
+        separator = '&' if '?' in search_url else '?'
+        return f"{search_url}{separator}page={page}"
+
+    def resume_from_detail(self, fields: Dict[str, Optional[str]], url: str) -> ResumeData:
+        return resume_from_detail(fields, url)
+
+
+class RowResolutionMixin:
+    """
+    Row bookkeeping shared by SiteParser and AsyncWorkUaParser.
+
+    Remembers the URL hashes of the resumes already produced, so a resume
+    repeated on a page or across pages is fetched and yielded once, serves
+    rows from their card or the resume cache, and re-queues resumes whose
+    detail page failed until `retry_policy.max_attempts`. The parser fetches
+    the missing detail pages, sync or async, between _split_rows and
+    _merge_fetched, and needs `extraction`, `workers`, `resume_cache`,
+    `retry_policy` and `metrics` attributes.
+    """
+
+    def _init_row_resolution(self):
+        # Resumes whose detail page failed, fetched again after a backoff
+        self._retry_queue: List[str] = []
+        self._attempts: Dict[str, int] = {}
+        # URL hashes of the resumes already produced, so each is fetched and yielded once
+        self._produced: Set[int] = set()
+
+    def _split_rows(self, rows: List[ListingRow]) -> Tuple[List[ListingRow], Dict[str, ResumeData], List[str]]:
+        """New rows, the resumes already known for them by URL, and the URLs whose detail page is needed"""
+        rows = self._new_rows(rows)
+        found: Dict[str, ResumeData] = {}
+        missing = []
+        for row in rows:
+            resume = row.to_resume() if self.extraction == 'listing' else None
+            if resume is not None:
+                found[row.url] = resume
+                self.metrics.count('resumes', source='listing')
+                continue
+
+            cached = self.resume_cache.get(row.url, row.update_date) if self.resume_cache else None
+            if cached is not None:
+                found[row.url] = cached
+                self.metrics.count('resumes', source='cache')
+            else:
+                missing.append(row.url)
+        return rows, found, missing
+
+    def _merge_fetched(self, rows: List[ListingRow], found: Dict[str, ResumeData], missing: List[str],
+                       fetched: List[ResumeData], elapsed: float) -> List[ResumeData]:
+        """Add the fetched resumes, re-queue the missing ones that failed and return the rows' resumes in order"""
+        if missing:
+            if self.resume_cache is not None:
+                self.resume_cache.record_fetch(elapsed, len(missing))
+            self.metrics.count('resumes', len(fetched), source='detail')
+            for resume in fetched:
+                if self.resume_cache is not None:
+                    self.resume_cache.put(resume)
+                found[resume.url] = resume
+            self._requeue([url for url in missing if url not in found])
+
+        resumes = [found[row.url] for row in rows if row.url in found]
+        self._produced.update(url_hash(resume.url) for resume in resumes)
+        return resumes
 
-        self.driver = webdriver.Chrome(options=options)
-        self.wait = WebDriverWait(self.driver, self.WAIT_TIMEOUT)
+    def _new_rows(self, rows: List[ListingRow]) -> List[ListingRow]:
+        """Drop rows of resumes already produced or queued for a retry, and repeats within `rows`"""
+        queued = set(self._retry_queue)
+        unique: Dict[str, ListingRow] = {}
+        for row in rows:
+            if row.url not in unique and row.url not in queued and url_hash(row.url) not in self._produced:
+                unique[row.url] = row
+        return list(unique.values())
+
+    def _requeue(self, urls: List[str]):
+        """Queue failed resumes for another attempt, dropping those out of attempts"""
+        for url in urls:
+            attempts = self._attempts.get(url, 0) + 1
+            self._attempts[url] = attempts
+            if attempts < self.retry_policy.max_attempts:
+                self._retry_queue.append(url)
+                self.metrics.count('retries', stage='extract_resume')
+            else:
+                self.metrics.count('errors', stage='extract_resume')
+                logging.error(f"Giving up on resume {url} after {attempts} attempts")
+
+    def _next_retry_batch(self) -> Tuple[List[ListingRow], float]:
+        """Take up to `workers` re-queued resumes as rows, with the backoff to wait before fetching them"""
+        urls, self._retry_queue = self._retry_queue[:self.workers], self._retry_queue[self.workers:]
+        delay = self.retry_policy.backoff(max(self._attempts[url] for url in urls) - 1)
+        return [ListingRow(url) for url in urls], delay
+
+
+class SiteParser(RowResolutionMixin):
+    """
+    Crawl engine for the job site described by a SiteAdapter.
+
+    The adapter knows the site's URLs and page layout; the engine drives the
+    browser or HTTP session, the worker tabs or threads, the resume cache,
+    retries and pagination. Subclasses bind a site by setting ADAPTER.
+    """
+
+    ADAPTER = None
+    WAIT_TIMEOUT = 10
+    ENGINES = ('selenium', 'http')
+    FILTER_MODES = ('url', 'click')
+    EXTRACTION_MODES = ('listing', 'detail')
+
+    def __init__(self, engine: str = 'selenium', filter_mode: str = 'url',
+                 workers: int = 4, requests_per_second: float = 5.0, max_pages: int = 5,
+                 driver_pool: Optional[DriverPool] = None, resume_cache=None,
+                 extraction: str = 'listing', categories=None,
+                 profile: Optional[BrowserProfile] = None,
+                 metrics: Optional[SearchMetrics] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 adapter: Optional[SiteAdapter] = None):
+        """
+        Args:
+            engine: 'selenium' drives a headless Chrome, 'http' fetches and
+                parses pages without a browser
+            filter_mode: 'url' loads the filtered results with one request,
+                'click' clicks every filter on the page (selenium only)
+            workers: how many resume pages are loaded at once (tabs for
+                selenium, threads for http)
+            requests_per_second: per-host limit on started resume requests
+            max_pages: how many results pages get_resumes_from_pages walks
+            driver_pool: lease a warm driver from this pool instead of
+                starting (and quitting) a private Chrome
+            resume_cache: ResumeCache that lets resumes whose listing row is
+                unchanged skip their detail page
+            extraction: 'listing' builds resumes from the result cards and
+                visits a detail page only when a card lacks a field,
+                'detail' always visits detail pages
+            categories: CategoryIndex used to resolve category indices to
+                URLs without loading the category page
+            profile: BrowserProfile for a private Chrome; pooled drivers
+                use the profile they were created with
+            metrics: SearchMetrics that receives stage timings and counters
+            retry_policy: RetryPolicy for timeouts, retries and throttling;
+                by default timeouts start at WAIT_TIMEOUT and then follow
+                observed page latencies
+            adapter: SiteAdapter of the site to crawl; defaults to an
+                instance of the class's ADAPTER
+        """
+        adapter = adapter or (self.ADAPTER() if self.ADAPTER is not None else None)
+        if adapter is None:
+            raise ValueError("No site adapter given")
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        if filter_mode not in self.FILTER_MODES:
+            raise ValueError(f"Unknown filter mode '{filter_mode}', expected one of {self.FILTER_MODES}")
+        if extraction not in self.EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode '{extraction}', expected one of {self.EXTRACTION_MODES}")
+
+        self.adapter = adapter
+        self.engine = engine
+        self.filter_mode = filter_mode
+        self.extraction = extraction
+        self.workers = workers
+        self.max_pages = max_pages
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.stats = ThroughputStats()
+        self.driver = None
+        self.driver_pool = driver_pool
+        self.resume_cache = resume_cache
+        self.categories = categories
+        self.http = None
+        self.metrics = metrics or SearchMetrics()
+        self.retry_policy = retry_policy or RetryPolicy(latency=LatencyTracker(initial=self.WAIT_TIMEOUT))
+        self._init_row_resolution()
+
+        # Search state used by the http engine, which has no page to type into
+        self.category_url = None
+        self.profession = ""
+        self.location = ""
+        self.filters = {}
+        self.start_page = 1
+        # Set once apply_filters has loaded the search, after which open_page navigates right away
+        self._search_opened = False
+        # Number of the search's last results page, once a page without a next link was read
+        self.last_page: Optional[int] = None
+
+        if engine == 'http':
+            from http_fetcher import HttpResumeFetcher
+            self.http = HttpResumeFetcher(timeout=self.WAIT_TIMEOUT, pool_size=max(10, workers),
+                                          policy=self.retry_policy, adapter=adapter)
+        else:
+            with self.metrics.span('driver_start'):
+                if driver_pool is not None:
+                    self.driver = driver_pool.acquire()
+                else:
+                    self.driver = create_driver(profile or DEFAULT_PROFILE)
+            self.wait = WebDriverWait(self.driver, self.WAIT_TIMEOUT)
+            self.page_watcher = PageUpdateWatcher(self.driver, self.WAIT_TIMEOUT)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.driver.quit()
+        if self.driver is not None:
+            if self.driver_pool is not None:
+                self.driver_pool.release(
+                    self.driver, broken=isinstance(exc_val, WebDriverException)
+                )
+            else:
+                self.driver.quit()
+        if self.http is not None:
+            self.http.close()
 
 
     def get_categories(self) -> List[Dict[str, str]]:
         """Get all available resume categories"""
-        self.driver.get(self.BASE_URL)
-        categories = self.driver.find_elements(By.XPATH, "//li/a[starts-with(@href, '/resumes-')]")
+        with self.metrics.span('get_categories'):
+            if self.http is not None:
+                return self.http.get_categories()
 
-        return [
-            {"name": cat.text, "url": cat.get_attribute("href"), "index": idx + 1}
-            for idx, cat in enumerate(categories)
-        ]
+            self.driver.get(self.adapter.base_url)
+            categories = extract_with_driver(self.driver, {'categories': self.adapter.category_spec})['categories']
+
+        return self.adapter.categories_from(categories)
 
     def select_category(self, category_index: int):
         """Select category by its index"""
-        categories = self.get_categories()
-        if 1 <= category_index <= len(categories):
-            selected_category = categories[category_index - 1]
-            self.driver.get(selected_category["url"])
-        else:
-            raise ValueError(f"Category index should be between 1 and {len(categories)}")
-
+        with self.metrics.span('select_category'):
+            url = self.categories.url_for(category_index) if self.categories is not None else None
+            if url is None:
+                categories = self.get_categories()
+                if not 1 <= category_index <= len(categories):
+                    raise ValueError(f"Category index should be between 1 and {len(categories)}")
+                url = categories[category_index - 1]["url"]
+
+            self.category_url = url
+            if self.driver is not None:
+                self.driver.get(self.category_url)
+
+    def select_category_by_name(self, name: str):
+        """
+        Select the category with this name in the site's own list.
 
-    def wait_and_find_element(self, by, value, timeout=WAIT_TIMEOUT):
-        """Wait for element to be present and return it"""
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located((by, value))
-        )
+        Used when one search runs on several sites, whose category lists are
+        numbered differently; without a match the whole site is searched.
+        """
+        with self.metrics.span('select_category'):
+            wanted = name.strip().lower()
+            categories = self.categories.categories() if self.categories is not None else self.get_categories()
+            url = next((cat["url"] for cat in categories if cat["name"].strip().lower() == wanted and cat["url"]),
+                       None)
+            if url is None:
+                logging.warning(f"No category '{name}' on {self.adapter.name}, searching all resumes")
+                url = self.adapter.all_resumes_url
+
+            self.category_url = url
+            if self.driver is not None:
+                self.driver.get(self.category_url)
+
+
+    def wait_and_find_element(self, by, value, timeout=None):
+        """Wait for element to be present and return it; the timeout defaults to the adaptive one"""
+        try:
+            return WebDriverWait(self.driver, timeout or self.retry_policy.timeout()).until(
+                EC.presence_of_element_located((by, value))
+            )
+        except TimeoutException:
+            self.metrics.count('selector_errors', selector=value)
+            raise
 
-    def wait_and_find_elements(self, by, value, timeout=WAIT_TIMEOUT):
-        """Wait for elements to be present and return them"""
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_all_elements_located((by, value))
-        )
+    def wait_and_find_elements(self, by, value, timeout=None):
+        """Wait for elements to be present and return them; the timeout defaults to the adaptive one"""
+        try:
+            return WebDriverWait(self.driver, timeout or self.retry_policy.timeout()).until(
+                EC.presence_of_all_elements_located((by, value))
+            )
+        except TimeoutException:
+            self.metrics.count('selector_errors', selector=value)
+            raise
 
     def wait_for_page_update(self):
-        """Wait for page update after filter change"""
+        """Wait for page update after filter change; the watcher must be armed before the change"""
+        self.page_watcher.timeout = self.retry_policy.timeout()
         try:
-            # Store the current page source
-            old_page = self.driver.page_source
-
-            # Wait for page source to change
-            def page_changed(driver):
-                return driver.page_source != old_page
-
-            WebDriverWait(self.driver, self.WAIT_TIMEOUT).until(page_changed)
-
-            # Wait for the loading overlay to disappear (if exists)
-            try:
-                WebDriverWait(self.driver, 3).until_not(
-                    EC.presence_of_element_located((By.CLASS_NAME, "loading-overlay"))
-                )
-            except TimeoutException:
-                pass  # Ignore if no loading overlay found
-
-
+            with self.metrics.span('wait_for_page_update'):
+                self.page_watcher.wait()
         except TimeoutException:
+            self.metrics.count('timeouts', stage='wait_for_page_update')
             logging.warning("Page update timeout - continuing anyway")
 
 
     def choose_profession(self, profession: str):
-        self.driver.find_element(By.XPATH, '//*[@id="search"]').send_keys(profession)
+        self.profession = profession
+        if self.driver is None or self.filter_mode == 'url':
+            return
+        self.driver.find_element(By.XPATH, self.adapter.search_input_xpath).send_keys(profession)
 
     def choose_location(self, location: str):
-        city_input = self.driver.find_element(By.XPATH, '//*[@id="city"]')
+        self.location = location
+        if self.driver is None or self.filter_mode == 'url':
+            return
+        city_input = self.driver.find_element(By.XPATH, self.adapter.city_input_xpath)
         city_input.click()
         city_input.send_keys(Keys.CONTROL, 'a')
         city_input.send_keys(Keys.DELETE)
@@ -113,42 +548,69 @@ class WorkUaParser:
 
     def handle_filter_action(self, action_func):
         """
-        Execute a filter action and wait for page update
+        Execute a filter action and wait for page update.
+
+        A failing action is retried with backoff; when the retries run out the
+        error is raised, so a search never silently runs without a filter.
 
         Args:
             action_func: Function that performs the filter action
         """
-        try:
+        def attempt(timeout: float):
+            # Watch the results region before it can change
+            self.page_watcher.arm()
             # Execute the filter action
             action_func()
             # Wait for page to update
             self.wait_for_page_update()
-        except Exception as e:
-            logging.error(f"Error during filter action: {str(e)}")
 
-
-    def apply_filters(self, filters: Dict):
         try:
-            if 'search_params' in filters:
-                self.apply_search_filters(filters['search_params'])
-
-            if 'employment' in filters:
-                self.apply_employment_filters(filters['employment'])
-
-            if 'age' in filters:
-                self.apply_age_filters(filters['age'])
+            self.retry_policy.call(attempt, retry_on=(WebDriverException,))
+        except WebDriverException as e:
+            self.metrics.count('errors', stage='filter_action')
+            logging.error(f"Error during filter action: {str(e)}")
+            raise
 
-            if 'gender' in filters:
-                self.apply_gender_filters(filters['gender'])
 
-            if 'salary' in filters:
-                self.apply_salary_filters(filters['salary'])
+    def build_search_url(self) -> str:
+        """Compile the current category, profession, city and filters into a search URL"""
+        if self.category_url is None:
+            raise ValueError("Category is not selected")
+        return self.adapter.search_url(self.category_url, self.profession, self.location, self.filters)
 
-            if 'education' in filters:
-                self.apply_education_filters(filters['education'])
+    def apply_filters(self, filters: Dict):
+        """
+        Apply search filters.
 
-            if 'experience' in filters:
-                self.apply_experience_filters(filters['experience'])
+        In 'url' filter mode the whole search is compiled into one URL and
+        loaded with a single request; in 'click' mode every filter is clicked
+        on the page and waited for, as a fallback if the URL scheme changes.
+        """
+        self.filters = filters
+        if self.driver is None:
+            return
+
+        if self.filter_mode == 'url':
+            # A page given to open_page beforehand is loaded directly, without loading page 1 first
+            with self.metrics.span('apply_filters'):
+                self.driver.get(self.adapter.page_url(self.build_search_url(), self.start_page))
+            self._search_opened = True
+            return
+
+        appliers = [
+            ('search_params', self.apply_search_filters),
+            ('employment', self.apply_employment_filters),
+            ('age', self.apply_age_filters),
+            ('gender', self.apply_gender_filters),
+            ('salary', self.apply_salary_filters),
+            ('education', self.apply_education_filters),
+            ('experience', self.apply_experience_filters),
+        ]
+        try:
+            for group, apply in appliers:
+                if group in filters:
+                    with self.metrics.span(apply.__name__):
+                        apply(filters[group])
 
         except TimeoutException as e:
             logging.error(f"Timeout while applying filters: {str(e)}")
@@ -156,6 +618,27 @@ class WorkUaParser:
         except Exception as e:
             logging.error(f"Error applying filters: {str(e)}")
             raise
+        self._search_opened = True
+        if self.start_page > 1:
+            self._load_start_page()
+
+    def open_page(self, page: int):
+        """
+        Start the crawl at the given results page instead of the first one.
+
+        Lets a search be split into page ranges crawled separately. Called
+        before apply_filters, the page is loaded as part of applying them (in
+        url filter mode without loading page 1 first); called after, it is
+        loaded right away.
+        """
+        self.start_page = page
+        if self._search_opened and page > 1:
+            self._load_start_page()
+
+    def _load_start_page(self):
+        if self.driver is not None:
+            with self.metrics.span('open_page'):
+                self.driver.get(self.adapter.page_url(self.build_search_url(), self.start_page))
 
     def is_checkbox_selected(self, xpath: str) -> bool:
         """
@@ -170,186 +653,298 @@ class WorkUaParser:
         checkbox = self.wait_and_find_element(By.XPATH, xpath)
         return checkbox.is_selected()
 
-    def apply_search_filters(self, search_params: List[str]):
-        search_params_map = {
-            'title_only': "//input[@id='f1-1']",
-            'with_synonyms': "//input[@id='f2-2']",
-            'any_word': "//input[@id='f3-3']"
-        }
-        for param in search_params:
-            if param in search_params_map:
-                xpath = search_params_map[param]
-                if not self.is_checkbox_selected(xpath):
-                    self.handle_filter_action(
-                        lambda: self.wait_and_find_element(By.XPATH, xpath).click()
-                    )
+    def apply_checkbox_filters(self, group: str, selected: List[str]):
+        """Click every not yet selected checkbox of a filter group"""
+        schema = self.adapter.filter_schema.get(group, {})
+        for key in selected:
+            spec = schema.get(key)
+            if isinstance(spec, CheckboxFilter) and not self.is_checkbox_selected(spec.xpath):
+                self.handle_filter_action(
+                    lambda: self.wait_and_find_element(By.XPATH, spec.xpath).click()
+                )
 
+    def apply_select_filter(self, spec: SelectFilter, value):
+        """Pick an option in a filter drop-down"""
+        option_value = spec.option_value(value)
+        if option_value:
+            self.handle_filter_action(
+                lambda: Select(self.wait_and_find_element(
+                    By.XPATH, spec.xpath
+                )).select_by_value(option_value)
+            )
+
+    def apply_search_filters(self, search_params: List[str]):
+        self.apply_checkbox_filters('search_params', search_params)
 
     def apply_employment_filters(self, employment: List[str]):
-        employment_map = {
-            'full_time': "//*[@id='employment_selection']/ul[1]/li/label/input",
-            'part_time': "//*[@id='employment_selection']/ul[2]/li/label/input"
-        }
-        for emp_type in employment:
-            if emp_type in employment_map:
-                xpath = employment_map[emp_type]
-                # Check if already selected
-                if not self.is_checkbox_selected(xpath):
-                    self.handle_filter_action(
-                        lambda: self.wait_and_find_element(By.XPATH, xpath).click()
-                    )
+        self.apply_checkbox_filters('employment', employment)
 
     def apply_age_filters(self, age: Dict[str, int]):
-        if 'from' in age:
-            self.handle_filter_action(
-                lambda: Select(self.wait_and_find_element(
-                    By.XPATH, "//select[@id='agefrom_selection']"
-                )).select_by_value(str(age['from']))
-            )
-        if 'to' in age:
-            self.handle_filter_action(
-                lambda: Select(self.wait_and_find_element(
-                    By.XPATH, "//select[@id='ageto_selection']"
-                )).select_by_value(str(age['to']))
-            )
+        schema = self.adapter.filter_schema.get('age', {})
+        for bound in ('from', 'to'):
+            if bound in age and bound in schema:
+                self.apply_select_filter(schema[bound], age[bound])
 
     def apply_gender_filters(self, gender: List[str]):
-        gender_map = {
-            'male': "//*[@id='gender_selection']/ul[1]/li/label/input",
-            'female': "//*[@id='gender_selection']/ul[2]/li/label/input"
-        }
-        for g in gender:
-            if g in gender_map:
-                xpath = gender_map[g]
-                # Check if already selected
-                if not self.is_checkbox_selected(xpath):
-                    self.handle_filter_action(
-                        lambda: self.wait_and_find_element(By.XPATH, xpath).click()
-                    )
+        self.apply_checkbox_filters('gender', gender)
 
     def apply_salary_filters(self, salary: Dict[str, str]):
-        salary_value_map = {
-            10000: "2",
-            15000: "3",
-            20000: "4",
-            30000: "5",
-            40000: "6",
-            50000: "7",
-            100000: "8"
-        }
-
-        # Если указан диапазон зарплаты "от"
-        if 'from' in salary:
-            from_value = salary_value_map.get(salary['from'])  # Преобразуем значение зарплаты в ключ словаря
-            if from_value:
-                self.handle_filter_action(
-                    lambda: Select(self.wait_and_find_element(
-                        By.XPATH, "//*[@id='salaryfrom_selection']"
-                    )).select_by_value(from_value)
-                )
-
-        # Если указан диапазон зарплаты "до"
-        if 'to' in salary:
-            to_value = salary_value_map.get(salary['to'])  # Преобразуем значение зарплаты в ключ словаря
-            if to_value:
-                self.handle_filter_action(
-                    lambda: Select(self.wait_and_find_element(
-                        By.XPATH, "//*[@id='salaryto_selection']"
-                    )).select_by_value(to_value)
-                )
+        schema = self.adapter.filter_schema.get('salary', {})
+        for bound in ('from', 'to'):
+            if bound in salary and bound in schema:
+                self.apply_select_filter(schema[bound], salary[bound])
 
         # Если указано, что зарплата "не указана"
         if salary.get('not_specified'):
-            xpath = "//*[@id='nosalary_selection']/label/input"
-            if not self.is_checkbox_selected(xpath):
-                self.handle_filter_action(
-                    lambda: self.wait_and_find_element(By.XPATH, xpath).click()
-                )
+            self.apply_checkbox_filters('salary', ['not_specified'])
 
     def apply_education_filters(self, education: List[str]):
-        education_map = {
-            'higher': "//*[@id='education_selection']/li[1]/label/input",
-            'unfinished_higher': "//*[@id='education_selection']/li[2]/label/input",
-            'specialized_secondary': "//*[@id='education_selection']/li[3]/label/input",
-            'secondary': "//*[@id='education_selection']/li[4]/label/input"
-        }
-        for edu_type in education:
-            if edu_type in education_map:
-                xpath = education_map[edu_type]
-                # Check if already selected
-                if not self.is_checkbox_selected(xpath):
-                    self.handle_filter_action(
-                        lambda: self.wait_and_find_element(By.XPATH, xpath).click()
-                    )
+        self.apply_checkbox_filters('education', education)
 
     def apply_experience_filters(self, experience: List[str]):
-        experience_map = {
-            'no_experience': "//*[@id='experience_selection']/li[1]/label/input",
-            'up_to_1': "//*[@id='experience_selection']/li[2]/label/input",
-            '1_to_2': "//*[@id='experience_selection']/li[3]/label/input",
-            '2_to_5': "//*[@id='experience_selection']/li[4]/label/input",
-            'more_than_5': "//*[@id='experience_selection']/li[5]/label/input"
-        }
-        for exp_type in experience:
-            if exp_type in experience_map:
-                xpath = experience_map[exp_type]
-                # Check if already selected
-                if not self.is_checkbox_selected(xpath):
-                    self.handle_filter_action(
-                        lambda: self.wait_and_find_element(By.XPATH, xpath).click()
-                    )
-
-    def get_resumes_from_pages(self) -> List[ResumeData]:
-        """Get all resumes from the current page"""
-        resume_links = self.wait_and_find_elements(By.XPATH, "//a[starts-with(@href, '/resumes/')]")[1:]
-        resumes = []
+        self.apply_checkbox_filters('experience', experience)
 
-        for link in resume_links:
-            url = link.get_attribute("href")
-            if not url or "/resumes/by-" in url:  # Skip category links
-                continue
+    def get_resumes_from_pages(self, max_pages: Optional[int] = None) -> Iterator[ResumeData]:
+        """
+        Walk the results pages and yield resumes as they are parsed.
 
-            # Store the current window handle
-            main_window = self.driver.current_window_handle
+        The next results page is prefetched while the current page's resumes
+        are being parsed. The generator must be consumed while the parser is open.
 
-            # Open resume in new window
-            self.driver.execute_script(f"window.open('{url}', '_blank');")
+        Args:
+            max_pages: page limit, defaults to the one given to the constructor
+        """
+        max_pages = max_pages or self.max_pages
+        if self.http is not None:
+            yield from self._iter_resumes_over_http(max_pages)
+            return
 
-            # Switch to the new window
-            self.driver.switch_to.window(self.driver.window_handles[-1])
+        from http_fetcher import PageNotFoundError
 
+        page = 1
+        while True:
             try:
-                # Extract resume data with waits
-                update_date = self.wait_and_find_element(By.XPATH, "//time").get_attribute("datetime")
-                name = self.wait_and_find_element(By.XPATH, "//div[1]/div/div/h1[contains(@class, 'mt-0') and contains(@class, 'mb-0')]").text
-                specialization_and_salary = self.wait_and_find_element(By.XPATH, "//div[1]/div/div/h2[1]").text
-
-                resume = ResumeData(
-                    update_date=update_date,
-                    name=name,
-                    specialization=specialization_and_salary.split(',')[0],
-                    salary=specialization_and_salary.split(',')[1].strip(),
-                    url=url,
-                )
-                resumes.append(resume)
-
+                rows, next_url = self._read_results_page()
+            except PageNotFoundError:
+                # A page range starting past the end of the results is empty
+                if page > 1 or self.start_page == 1:
+                    raise
+                self.last_page = self.start_page - 1
+                return
+            if next_url is None:
+                self._note_last_page(page, rows)
+            if page >= max_pages:
+                next_url = None
+
+            # Start loading the next page in a background tab right away
+            next_window = self._open_tab(next_url) if next_url else None
+
+            started = time.monotonic()
+            count = 0
+            # Open a batch of tabs at once so the browser loads them in parallel,
+            # then harvest them one by one in the original order
+            for batch in chunked(rows, self.workers):
+                resumes = self._resolve_rows(batch, self._get_resumes_in_tabs)
+                count += len(resumes)
+                yield from resumes
+
+            # Resumes that failed on this page get another try before moving on;
+            # on the last page keep trying until they succeed or run out of attempts
+            while self._retry_queue:
+                resumes = self._retry_failed(self._get_resumes_in_tabs)
+                count += len(resumes)
+                yield from resumes
+                if next_window is not None:
+                    break
+
+            self._record_throughput(count, time.monotonic() - started)
+
+            if next_window is None:
+                break
+
+            self.driver.close()
+            self.driver.switch_to.window(next_window)
+            page += 1
+
+    def _note_last_page(self, page: int, rows: List[ListingRow]):
+        """Remember the search's last page, given the crawl's page number that has no next link"""
+        # A page without results is past the end rather than the last one
+        self.last_page = self.start_page + page - (1 if rows else 2)
+
+    def _read_results_page(self) -> Tuple[List[ListingRow], Optional[str]]:
+        """Read listing rows and the next page url of the current results page in one round trip"""
+        from http_fetcher import PageNotFoundError
+
+        attempts = []
+
+        def loaded(driver):
+            # A 404 page never shows the results, so stop waiting as soon as it is parsed
+            if driver.find_elements(By.XPATH, self.adapter.results_ready_xpath):
+                return 'results'
+            return driver.execute_script(PAGE_STATUS_JS) == 404 and 'missing'
+
+        def read(timeout: float):
+            if attempts:
+                self.driver.refresh()
+            attempts.append(timeout)
+            try:
+                state = WebDriverWait(self.driver, timeout).until(loaded)
+            except TimeoutException:
+                self.metrics.count('selector_errors', selector=self.adapter.results_ready_xpath)
+                raise
+            if state == 'missing':
+                raise PageNotFoundError(f"404 Not Found for url: {self.driver.current_url}")
+            return extract_with_driver(self.driver, self.adapter.results_page_specs)
+
+        with self.metrics.span('read_results_page'):
+            page = self.retry_policy.call(read, retry_on=(TimeoutException,))
+        self.metrics.sample_driver_memory(self.driver)
+        return self.adapter.listing_rows(page)
+
+    def _resolve_rows(self, rows: List[ListingRow],
+                      fetch: Callable[[List[str]], List[ResumeData]]) -> List[ResumeData]:
+        """
+        Turn listing rows into resumes, in order.
+
+        In listing mode rows whose card has every field are used as is. Rows
+        whose URL and update date match the resume cache are served from it;
+        only the rest are passed to `fetch` to load their detail pages. Those
+        that fail to load are re-queued instead of dropped (see _retry_failed).
+        Resumes repeated on the page, on an earlier page or waiting for a retry
+        are skipped.
+        """
+        rows, found, missing = self._split_rows(rows)
+        fetched: List[ResumeData] = []
+        started = time.monotonic()
+        if missing:
+            with self.metrics.span('fetch_resumes'):
+                fetched = fetch(missing)
+        return self._merge_fetched(rows, found, missing, fetched, time.monotonic() - started)
+
+    def _retry_failed(self, fetch: Callable[[List[str]], List[ResumeData]]) -> List[ResumeData]:
+        """Fetch the re-queued resumes again after a backoff; those failing again are re-queued"""
+        if not self._retry_queue:
+            return []
+        rows, delay = self._next_retry_batch()
+        time.sleep(delay)
+        return self._resolve_rows(rows, fetch)
+
+    def _open_tab(self, url: str) -> str:
+        """Open url in a new background tab and return its window handle"""
+        self.retry_policy.breaker.wait()
+        self.rate_limiter.wait(url)
+        profile = getattr(self.driver, 'browser_profile', None)
+        blocking = profile is not None and profile.blocked_url_patterns
+
+        known_handles = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", 'about:blank' if blocking else url)
+        handle = next(h for h in self.driver.window_handles if h not in known_handles)
+
+        if blocking:
+            # CDP request blocking is per tab, so install it before the page starts loading
+            current = self.driver.current_window_handle
+            self.driver.switch_to.window(handle)
+            profile.apply(self.driver)
+            self.driver.execute_script("window.location.href = arguments[0];", url)
+            self.driver.switch_to.window(current)
+        return handle
+
+    def _record_throughput(self, count: int, elapsed: float):
+        self.stats.count += count
+        self.stats.elapsed += elapsed
+        self.metrics.gauge('resumes_per_second', self.stats.per_second)
+        logging.info(f"Parsed {self.stats.count} resumes at {self.stats.per_second:.2f} resumes/s "
+                     f"with {self.workers} workers")
+        if self.resume_cache is not None:
+            cache_stats = self.resume_cache.stats()
+            logging.info(f"Resume cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                         f"~{cache_stats['saved_seconds']:.1f} s of fetching saved")
+
+    def _get_resumes_in_tabs(self, urls: List[str]) -> List[ResumeData]:
+        """Load a batch of resumes in parallel tabs and extract them in order"""
+        # Store the current window handle
+        main_window = self.driver.current_window_handle
+
+        # Open resumes in new windows
+        tabs = [(url, self._open_tab(url)) for url in urls]
 
+        resumes = []
+        for url, handle in tabs:
+            self.driver.switch_to.window(handle)
+            started = time.monotonic()
+            try:
+                resumes.append(self._extract_resume(url))
+                self.retry_policy.record_success(time.monotonic() - started)
             except Exception as e:
+                # Failed resumes are re-queued by _resolve_rows
+                self.retry_policy.record_failure(time.monotonic() - started)
                 logging.error(f"Error parsing resume at {url}: {str(e)}")
-
             finally:
-                # Close the resume window and switch back to main window
+                # Close the resume window
                 self.driver.close()
-                self.driver.switch_to.window(main_window)
 
+        self.driver.switch_to.window(main_window)
         return resumes
 
-    def save_to_json(self, resumes: List[ResumeData], filename: str):
-        """Save parsed resumes to JSON file"""
+    def _extract_resume(self, url: str) -> ResumeData:
+        """Extract resume data from the current window"""
+        self.wait_and_find_element(By.XPATH, self.adapter.detail_ready_xpath)
+        fields = extract_with_driver(self.driver, {'resume': self.adapter.detail_spec})['resume'][0]
+        return self.adapter.resume_from_detail(fields, url)
+
+    def _iter_resumes_over_http(self, max_pages: int) -> Iterator[ResumeData]:
+        """Walk the results pages using the http engine"""
+        from http_fetcher import PageNotFoundError
+
+        def fetch(urls: List[str]) -> List[ResumeData]:
+            return fetch_ordered(urls, self.http.get_resume, self.workers,
+                                 rate_limiter=self.rate_limiter, stats=self.stats)
+
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            first_url = self.adapter.page_url(self.build_search_url(), self.start_page)
+            pending = prefetcher.submit(self.http.get_results_page, first_url)
+            page = 1
+            while pending is not None:
+                with self.metrics.span('read_results_page'):
+                    try:
+                        rows, next_url = pending.result()
+                    except PageNotFoundError:
+                        # A page range starting past the end of the results is empty
+                        if page > 1 or self.start_page == 1:
+                            raise
+                        self.last_page = self.start_page - 1
+                        return
+                pending = None
+                if next_url is None:
+                    self._note_last_page(page, rows)
+                if next_url and page < max_pages:
+                    pending = prefetcher.submit(self.http.get_results_page, next_url)
+
+                yield from self._resolve_rows(rows, fetch)
+                while self._retry_queue:
+                    yield from self._retry_failed(fetch)
+                    if pending is not None:
+                        break
+                self.metrics.gauge('resumes_per_second', self.stats.per_second)
+                page += 1
+
+    def save_to_json(self, resumes: Iterable[ResumeData], filename: str):
+        """
+        Save parsed resumes to a JSON array file, writing them one at a time.
+
+        See exporters.py for JSONL, CSV and Parquet.
+        """
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(
-                [vars(resume) for resume in resumes],
-                f,
-                ensure_ascii=False,
-                indent=2
-            )
\ No newline at end of file
+            f.write('[')
+            count = 0
+            for resume in resumes:
+                item = json.dumps(resume.to_dict(), ensure_ascii=False, indent=2)
+                f.write((',\n  ' if count else '\n  ') + item.replace('\n', '\n  '))
+                count += 1
+            f.write('\n]' if count else ']')
+
+
+class WorkUaParser(SiteParser):
+    """Parser for work.ua website"""
+
+    ADAPTER = WorkUaAdapter
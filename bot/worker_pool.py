@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+from urllib.parse import urlparse
+import logging
+import threading
+import time
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host so that at most `rate` start per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        """Block until a request to the url's host is allowed"""
+        if not self.interval:
+            return
+
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+@dataclass
+class ThroughputStats:
+    """How many items a fetch produced and how fast"""
+    count: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+
+def fetch_ordered(urls: Iterable[str], fetch: Callable[[str], Optional[R]], workers: int,
+                  rate_limiter: Optional[HostRateLimiter] = None,
+                  stats: Optional[ThroughputStats] = None) -> List[R]:
+    """
+    Fetch urls with a bounded pool of worker threads.
+
+    Results are returned in the order of `urls`; None results (failed fetches)
+    are dropped.
+    """
+    def limited_fetch(url: str):
+        if rate_limiter is not None:
+            rate_limiter.wait(url)
+        return fetch(url)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = [result for result in executor.map(limited_fetch, urls) if result is not None]
+
+    if stats is not None:
+        stats.count += len(results)
+        stats.elapsed += time.monotonic() - started
+        logging.info(f"Fetched {stats.count} resumes at {stats.per_second:.2f} resumes/s "
+                     f"with {workers} workers")
+
+    return results
+
+
+def chunked(items: List[T], size: int) -> Iterable[List[T]]:
+    """Split a list into consecutive chunks of at most `size` items"""
+    for start in range(0, len(items), max(1, size)):
+        yield items[start:start + size]